@@ -5,7 +5,14 @@ from sqlalchemy import engine_from_config, pool
 
 from app.core.config import settings
 from app.db.base import Base
-from app.db.models import GeneratedContent, Source, Transcript, Validation  # noqa: F401
+from app.db.models import (  # noqa: F401
+    ChunkSummary,
+    GeneratedContent,
+    PipelineCheckpoint,
+    Source,
+    Transcript,
+    Validation,
+)
 
 config = context.config
 config.set_main_option("sqlalchemy.url", settings.sync_database_url)
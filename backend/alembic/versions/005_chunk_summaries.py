@@ -0,0 +1,39 @@
+"""Add chunk_summaries table for persisted map-stage output
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "005"
+down_revision: Union[str, None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "chunk_summaries",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("transcript_id", sa.UUID(), nullable=False),
+        sa.Column("chunk_index", sa.Integer(), nullable=False),
+        sa.Column("chunk_hash", sa.String(length=64), nullable=False),
+        sa.Column("map_model", sa.String(length=100), nullable=False),
+        sa.Column("prompt_version", sa.String(length=20), nullable=False),
+        sa.Column("summary", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(["transcript_id"], ["transcripts.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "transcript_id", "chunk_index", "chunk_hash", "map_model", "prompt_version"
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("chunk_summaries")
@@ -0,0 +1,38 @@
+"""Add composite (created_at, id) index on sources for keyset pagination
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "006"
+down_revision: Union[str, None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Built concurrently so writes to sources are not blocked during the build;
+# CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_sources_created_at_id",
+            "sources",
+            ["created_at", "id"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_sources_created_at_id",
+            table_name="sources",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,41 @@
+"""Add indexed content_digest to sources for upload / web page dedup
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "007"
+down_revision: Union[str, None] = "006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The index is built concurrently (outside the migration transaction) so
+# writes to sources are not blocked during the build.
+
+
+def upgrade() -> None:
+    op.add_column("sources", sa.Column("content_digest", sa.String(length=64), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_sources_content_digest",
+            "sources",
+            ["content_digest"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_sources_content_digest",
+            table_name="sources",
+            postgresql_concurrently=True,
+        )
+    op.drop_column("sources", "content_digest")
@@ -0,0 +1,44 @@
+"""Add result_key / cached_from to generated_content for the result cache
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "008"
+down_revision: Union[str, None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Like 006 and 007, the index is built concurrently so writes are not blocked.
+
+
+def upgrade() -> None:
+    op.add_column(
+        "generated_content", sa.Column("result_key", sa.String(length=64), nullable=True)
+    )
+    op.add_column("generated_content", sa.Column("cached_from", sa.UUID(), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_generated_content_result_key",
+            "generated_content",
+            ["result_key"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_generated_content_result_key",
+            table_name="generated_content",
+            postgresql_concurrently=True,
+        )
+    op.drop_column("generated_content", "cached_from")
+    op.drop_column("generated_content", "result_key")
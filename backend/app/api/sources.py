@@ -1,15 +1,33 @@
+import base64
+import hashlib
+import json
+import logging
 import os
 import shutil
 import uuid
-
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile
-from sqlalchemy import func, select, update
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Literal
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select, text, true, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.dependencies import get_async_session
 from app.core.rate_limit import limiter
 from app.db.models import GeneratedContent, Source, Validation
+from app.db.session import async_session_factory
 from app.schemas.source import (
     CreateSourceRequest,
     ErrorInfo,
@@ -19,12 +37,22 @@ from app.schemas.source import (
     SourceListResponse,
     SourceResponse,
 )
+from app.services.live_stream import format_sse, sse_events
+from app.services.progress import (
+    TERMINAL_STATUSES,
+    get_live_progress,
+    subscribe_progress,
+)
 from app.workers.tasks import process_source_task, regenerate_task
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/api/sources", tags=["sources"])
 
-MAX_UPLOAD_BYTES = 10 * 1024 * 1024  # 10 MB
-READ_CHUNK_SIZE = 64 * 1024  # 64 KB
+EVENTS_KEEPALIVE_SEC = 15.0
+EXACT_COUNT_BELOW = 100_000
+
+READ_CHUNK_SIZE = 1024 * 1024  # 1 MB
 
 MAGIC_BYTES = {
     "pdf": b"%PDF",
@@ -32,57 +60,126 @@ MAGIC_BYTES = {
 }
 
 
-async def _read_limited(file: UploadFile, limit: int) -> bytes:
-    """Read upload in chunks; raise 413 before exceeding RAM budget."""
-    chunks: list[bytes] = []
-    received = 0
-    while True:
-        chunk = await file.read(READ_CHUNK_SIZE)
-        if not chunk:
-            break
-        received += len(chunk)
-        if received > limit:
-            raise HTTPException(
-                status_code=413,
-                detail=f"File too large. Max {limit} bytes ({limit // 1024 // 1024} MB).",
-            )
-        chunks.append(chunk)
-    return b"".join(chunks)
-
+async def _save_upload(
+    file: UploadFile, path: str, source_type: str, limit: int
+) -> tuple[int, str]:
+    """Stream an upload to ``path`` chunk by chunk; return (size, sha256 hex).
 
-def _verify_magic(contents: bytes, source_type: str) -> bool:
+    Memory stays at one chunk whatever the file size: the magic bytes are
+    checked on the first chunk, the size limit as bytes arrive (413 before
+    exceeding it) and the digest is updated while writing.
+    """
     magic = MAGIC_BYTES.get(source_type, b"")
-    return contents[: len(magic)] == magic
+    digest = hashlib.sha256()
+    received = 0
+
+    with open(path, "wb") as out:
+
+        def _write(chunk: bytes) -> None:
+            digest.update(chunk)
+            out.write(chunk)
+
+        while chunk := await file.read(READ_CHUNK_SIZE):
+            if received == 0 and chunk[: len(magic)] != magic:
+                raise HTTPException(
+                    status_code=422,
+                    detail="File content does not match declared type",
+                )
+            received += len(chunk)
+            if received > limit:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"File too large. Max {limit} bytes ({limit // 1024 // 1024} MB).",
+                )
+            await run_in_threadpool(_write, chunk)
+
+    if received == 0:
+        raise HTTPException(
+            status_code=422,
+            detail="File content does not match declared type",
+        )
+    return received, digest.hexdigest()
 
 
 @router.get("", response_model=SourceListResponse)
 async def list_sources(
     limit: int = Query(default=20, ge=1, le=100),
-    offset: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None),
+    count: Literal["none", "estimate", "exact"] = Query(default="estimate"),
     session: AsyncSession = Depends(get_async_session),
 ):
-    total_result = await session.execute(select(func.count(Source.id)))
-    total = total_result.scalar_one()
-
-    result = await session.execute(
-        select(Source)
-        .order_by(Source.created_at.desc())
-        .offset(offset)
-        .limit(limit)
+    """History feed, newest first, paginated by an opaque ``cursor``.
+
+    Pages seek on (created_at, id) via ix_sources_created_at_id instead of
+    OFFSET.  ``total`` is only computed for the first page: ``estimate``
+    reads the planner's row estimate, ``exact`` runs count(*).
+    """
+    query = (
+        select(
+            Source.id, Source.title, Source.source_type, Source.status, Source.created_at
+        )
+        .order_by(Source.created_at.desc(), Source.id.desc())
+        .limit(limit + 1)
     )
-    sources = result.scalars().all()
+    if cursor is not None:
+        created_at, last_id = _decode_cursor(cursor)
+        query = query.where(
+            tuple_(Source.created_at, Source.id) < tuple_(created_at, last_id)
+        )
+    rows = (await session.execute(query)).all()
 
     items = [
         SourceListItem(
-            source_id=s.id,
-            title=s.title,
-            source_type=s.source_type,
-            status=s.status,
-            created_at=s.created_at,
+            source_id=r.id,
+            title=r.title,
+            source_type=r.source_type,
+            status=r.status,
+            created_at=r.created_at,
         )
-        for s in sources
+        for r in rows[:limit]
     ]
-    return SourceListResponse(items=items, total=total)
+    response = SourceListResponse(items=items)
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        response.next_cursor = _encode_cursor(last.created_at, last.id)
+
+    if cursor is None and count != "none":
+        response.total, response.total_is_estimate = await _count_sources(session, count)
+    return response
+
+
+def _encode_cursor(created_at: datetime, source_id: uuid.UUID) -> str:
+    raw = f"{created_at.isoformat()}|{source_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, source_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), uuid.UUID(source_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=422,
+            detail={"error": {"code": "invalid_cursor", "message": "Invalid pagination cursor"}},
+        ) from None
+
+
+async def _count_sources(session: AsyncSession, mode: str) -> tuple[int, bool]:
+    """Row count of sources and whether it is an estimate.
+
+    The estimate is pg_class.reltuples, kept current by autovacuum/ANALYZE;
+    below EXACT_COUNT_BELOW rows (or before the first ANALYZE, when it is
+    -1) an exact count is cheap and used instead.
+    """
+    if mode == "estimate":
+        estimate = await session.scalar(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'sources'::regclass")
+        )
+        if estimate is not None and estimate >= EXACT_COUNT_BELOW:
+            return int(estimate), True
+    total = await session.scalar(select(func.count()).select_from(Source))
+    return total, False
 
 
 @router.post("", status_code=201, response_model=SourceResponse)
@@ -127,29 +224,28 @@ async def upload_source(
             detail=f"Unsupported file type: {ext}. Allowed: .pdf, .epub",
         )
 
-    contents = await _read_limited(file, MAX_UPLOAD_BYTES)
-
-    if not _verify_magic(contents, source_type):
-        raise HTTPException(
-            status_code=422,
-            detail="File content does not match declared type",
-        )
-
     source_id = uuid.uuid4()
     work_dir = os.path.join(settings.tmp_dir, str(source_id))
     os.makedirs(work_dir, exist_ok=True)
     file_path = os.path.join(work_dir, safe_name)
 
-    with open(file_path, "wb") as f:
-        f.write(contents)
-
     try:
-        source = Source(id=source_id, source_type=source_type, file_path=file_path)
+        size, sha256 = await _save_upload(
+            file, file_path, source_type, settings.max_upload_bytes
+        )
+        logger.info("Stored upload %s: %d bytes, sha256=%s", source_id, size, sha256)
+
+        source = Source(
+            id=source_id,
+            source_type=source_type,
+            file_path=file_path,
+            content_digest=sha256,
+        )
         session.add(source)
         await session.commit()
         await session.refresh(source)
         process_source_task.delay(str(source.id))
-    except Exception:
+    except BaseException:
         shutil.rmtree(work_dir, ignore_errors=True)
         raise
 
@@ -164,24 +260,114 @@ async def upload_source(
 @router.get("/{source_id}", response_model=SourceResponse)
 async def get_source(
     source_id: uuid.UUID,
+    request: Request,
+    response: Response,
     session: AsyncSession = Depends(get_async_session),
 ):
-    result = await session.execute(select(Source).where(Source.id == source_id))
-    source = result.scalar_one_or_none()
-    if not source:
+    """Source status and, once finished, its content.
+
+    Responses carry an ETag derived from ``updated_at``, ``regen_count`` and
+    any live Redis progress; a matching ``If-None-Match`` is answered with
+    304 after a single primary-key lookup, without loading the content.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        result = await session.execute(
+            select(Source.status, Source.updated_at, Source.regen_count).where(
+                Source.id == source_id
+            )
+        )
+        row = result.one_or_none()
+        if row is not None:
+            live = await _live_progress(source_id, row.status)
+            etag = _source_etag(row.updated_at, row.regen_count, live)
+            if _etag_matches(if_none_match, etag):
+                return Response(
+                    status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"}
+                )
+
+    view = await _load_source_view(session, source_id)
+    if view is None:
         raise HTTPException(
             status_code=404,
             detail={"error": {"code": "source_not_found", "message": "Source not found"}},
         )
+    source, content_payload, validation_report, cached_from = view
+    live = await _live_progress(source.id, source.status)
+    response.headers["ETag"] = _source_etag(source.updated_at, source.regen_count, live)
+    response.headers["Cache-Control"] = "no-cache"
+    return _build_source_response(
+        source, content_payload, validation_report, live, from_cache=cached_from is not None
+    )
+
+
+def _source_etag(updated_at: datetime, regen_count: int, live: dict | None) -> str:
+    tag = f"{int(updated_at.timestamp() * 1_000_000):x}-{regen_count}"
+    if live:
+        digest = hashlib.sha1(json.dumps(live, sort_keys=True).encode()).hexdigest()
+        tag += f"-{digest[:12]}"
+    return f'"{tag}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = {c.strip().removeprefix("W/") for c in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+async def _live_progress(source_id: uuid.UUID, status: str) -> dict | None:
+    if status in TERMINAL_STATUSES:
+        return None
+    return await get_live_progress(source_id)
+
+
+async def _load_source_view(
+    session: AsyncSession, source_id: uuid.UUID
+) -> tuple[Source, dict | None, dict | None, uuid.UUID | None] | None:
+    """Source row, content payload, latest validation report and the
+    result-cache origin of the payload, in one query."""
+    latest_validation = (
+        select(Validation.report_json)
+        .where(Validation.source_id == Source.id)
+        .order_by(Validation.created_at.desc())
+        .limit(1)
+        .lateral()
+    )
+    result = await session.execute(
+        select(
+            Source,
+            GeneratedContent.content_payload,
+            latest_validation.c.report_json,
+            GeneratedContent.cached_from,
+        )
+        .outerjoin(GeneratedContent, GeneratedContent.source_id == Source.id)
+        .outerjoin(latest_validation, true())
+        .where(Source.id == source_id)
+    )
+    row = result.one_or_none()
+    return tuple(row) if row is not None else None
+
+
+def _build_source_response(
+    source: Source,
+    content_payload: dict | None,
+    validation_report: dict | None,
+    live: dict | None,
+    from_cache: bool = False,
+) -> SourceResponse:
+    status = source.status
+    progress_json = source.progress_json
+    if live:
+        status = live.get("status", status)
+        progress_json = live.get("progress_json", progress_json)
 
     response = SourceResponse(
         source_id=source.id,
         source_type=source.source_type,
-        status=source.status,
+        status=status,
     )
 
-    if source.progress_json:
-        response.progress = ProgressInfo(**source.progress_json)
+    if progress_json:
+        response.progress = ProgressInfo(**progress_json)
 
     if source.status == "failed":
         response.error = ErrorInfo(
@@ -190,27 +376,119 @@ async def get_source(
         )
 
     if source.status in ("approved", "needs_review"):
-        gc_result = await session.execute(
-            select(GeneratedContent).where(GeneratedContent.source_id == source.id)
-        )
-        gc = gc_result.scalar_one_or_none()
-        if gc:
-            response.content_payload = gc.content_payload
+        response.content_payload = content_payload
+        response.from_cache = from_cache
 
     if source.status == "needs_review":
-        val_result = await session.execute(
-            select(Validation)
-            .where(Validation.source_id == source.id)
-            .order_by(Validation.created_at.desc())
-            .limit(1)
-        )
-        val = val_result.scalar_one_or_none()
-        if val:
-            response.validation_report = val.report_json
+        response.validation_report = validation_report
 
     return response
 
 
+async def _source_response(session: AsyncSession, source_id: uuid.UUID) -> SourceResponse:
+    source, content_payload, validation_report, cached_from = await _load_source_view(
+        session, source_id
+    )
+    live = await _live_progress(source.id, source.status)
+    return _build_source_response(
+        source, content_payload, validation_report, live, from_cache=cached_from is not None
+    )
+
+
+@router.get("/{source_id}/events")
+async def source_events(
+    source_id: uuid.UUID,
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Server-Sent Events replacing polling of GET /api/sources/{id}.
+
+    Each ``source`` event carries a SourceResponse.  The first is the current
+    state; workers' progress flushes arrive over Redis pub/sub and are
+    applied to it without touching the database.  The full response
+    (content, validation report) is read once at the terminal state, after
+    which the stream ends.
+    """
+    result = await session.execute(select(Source.id).where(Source.id == source_id))
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=404,
+            detail={"error": {"code": "source_not_found", "message": "Source not found"}},
+        )
+
+    return StreamingResponse(
+        _source_event_stream(source_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _source_event_stream(source_id: uuid.UUID) -> AsyncIterator[str]:
+    async def _snapshot() -> SourceResponse:
+        async with async_session_factory() as session:
+            return await _source_response(session, source_id)
+
+    try:
+        async with subscribe_progress(source_id, EVENTS_KEEPALIVE_SEC) as events:
+            response = await _snapshot()
+            yield format_sse("source", response.model_dump(mode="json"))
+
+            while response.status not in TERMINAL_STATUSES:
+                event = await anext(events)
+                if event is None:
+                    # Pub/sub is at-most-once: re-check the status while idle
+                    # so a lost terminal event cannot leave the client waiting.
+                    async with async_session_factory() as session:
+                        status = await session.scalar(
+                            select(Source.status).where(Source.id == source_id)
+                        )
+                    if status not in TERMINAL_STATUSES:
+                        yield ": keep-alive\n\n"
+                        continue
+                    event = {"status": status}
+
+                if event.get("status") in TERMINAL_STATUSES:
+                    response = await _snapshot()
+                else:
+                    if "status" in event:
+                        response.status = event["status"]
+                    if event.get("progress_json"):
+                        response.progress = ProgressInfo(**event["progress_json"])
+                yield format_sse("source", response.model_dump(mode="json"))
+    except Exception:
+        logger.warning("Event stream failed for source %s", source_id, exc_info=True)
+        yield format_sse("error", {"message": "event stream unavailable"})
+
+
+@router.get("/{source_id}/stream")
+async def stream_source(
+    source_id: uuid.UUID,
+    request: Request,
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Server-Sent Events with the reduce output as it is generated.
+
+    Emits ``start``, ``delta`` (``{"channel", "text"}``) and ``end`` events;
+    reconnecting clients resume via the ``Last-Event-ID`` header.
+    """
+    result = await session.execute(select(Source.status).where(Source.id == source_id))
+    status = result.scalar_one_or_none()
+    if status is None:
+        raise HTTPException(
+            status_code=404,
+            detail={"error": {"code": "source_not_found", "message": "Source not found"}},
+        )
+
+    return StreamingResponse(
+        sse_events(
+            source_id,
+            last_event_id=request.headers.get("last-event-id", "0-0"),
+            finished=status in TERMINAL_STATUSES,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/{source_id}/regenerate", response_model=RegenerateResponse)
 @limiter.limit("5/minute")
 async def regenerate_source(
@@ -14,21 +14,114 @@ class Settings(BaseSettings):
     llm_model: str = "gpt-4o"
     llm_mini_model: str = "gpt-4o-mini"
     transcription_model: str = "whisper-1"
+    transcription_provider: str = "openai"
+    local_whisper_model: str = "small"
+    local_whisper_compute_type: str = "int8"
+    local_whisper_cpu_threads: int = 4
+    local_whisper_batch_size: int = 8
+    local_whisper_model_dir: str = ""
+    transcription_concurrency: int = 4
+    transcription_max_retries: int = 3
+    # "segment": one ffmpeg pass with silence-snapped cuts; "seek": one ffmpeg per chunk
+    transcription_split_mode: str = "segment"
+    transcription_snap_to_silence: bool = True
+    # Re-encode downloaded audio to mono Opus before Whisper upload
+    audio_normalize: bool = True
+    audio_sample_rate: int = 16000
+    audio_bitrate: str = "24k"
+    # Pipe yt-dlp into the ffmpeg segmenter and transcribe segments as they close
+    streaming_ingest: bool = False
+    streaming_segment_sec: int = 600
 
     llm_provider: str = "openai"
     local_llm_base_url: str = "http://host.docker.internal:11434/v1"
     local_llm_model: str = "llama3.1"
     local_llm_mini_model: str = "qwen2.5:0.5b"
 
+    llm_cache_enabled: bool = False
+    llm_cache_backend: str = "redis"
+    llm_cache_ttl_sec: int = 7 * 24 * 3600
+    llm_cache_max_entries: int = 50_000
+    llm_cache_path: str = "/tmp/app/llm_cache.sqlite3"
+    # Cluster-wide budgets per model shared by all workers via Redis, e.g.
+    # {"gpt-4o-mini": {"rpm": 500, "tpm": 200000}}; unlisted models are unlimited
+    llm_rate_limits: dict[str, dict[str, int]] = {}
+    # Clone the approved payload of an earlier source with the same content,
+    # prompts and model routing instead of running the pipeline
+    result_cache_enabled: bool = False
+
     map_model: str = ""
     reduce_model: str = ""
     validation_model: str = ""
+    # Map chunks while transcription / extraction is still producing text.
+    # Opt-in: the mapping then runs inside the extract / transcribe task
+    # rather than on the map queue
+    map_overlap: bool = False
+    map_concurrency: int = 8
+    map_queue_size: int = 16
+    # AIMD limit on in-flight requests per model and call kind (map, merge,
+    # reduce, validate) in each worker process, starting from the pool size
+    # of each kind (map_concurrency for map and merge): +1 per window while
+    # latency stays within llm_latency_tolerance x its baseline, halved on
+    # 429s, timeouts and latency spikes.  The map and merge thread pools then
+    # grow to llm_concurrency_max so the limit can rise past map_concurrency.
+    # llm_concurrency_initial applies to calls without a kind
+    adaptive_concurrency: bool = False
+    llm_concurrency_initial: int = 4
+    llm_concurrency_min: int = 1
+    llm_concurrency_max: int = 16
+    llm_latency_tolerance: float = 2.0
+    # Hedged map requests: a chunk still running after its model's p90
+    # latency is sent again (to hedge_llm_provider / hedge_model when set,
+    # else the same provider and model) and the first answer wins.  At most
+    # map_hedge_budget of map requests are duplicated, and at most
+    # map_hedge_max_in_flight hedged pairs run at once in each worker process.
+    map_hedging: bool = False
+    map_hedge_budget: float = 0.05
+    map_hedge_min_samples: int = 20
+    map_hedge_max_in_flight: int = 2
+    hedge_llm_provider: str = ""
+    hedge_model: str = ""
+    # Tree reduce: merge map summaries in groups of reduce_fan_in until they
+    # fit reduce_token_budget tokens (0, the default, sends them to the
+    # channels as-is; e.g. 24000 keeps long sources within the reduce context)
+    reduce_token_budget: int = 0
+    reduce_fan_in: int = 6
+    # "channel_first": channel prompt as system message, summaries as user message.
+    # "shared_prefix": summaries first in an identical system message so the
+    # provider's prompt-prefix cache serves them to all five channels.
+    reduce_prompt_layout: str = "channel_first"
+    # Stream reduce output to Redis for GET /api/sources/{id}/stream
+    reduce_streaming: bool = True
+    reduce_stream_flush_sec: float = 0.1
 
     max_video_duration: int = 7200
+    youtube_meta_ttl_sec: int = 3600
+    caption_languages: list[str] = ["ru", "en"]
     max_chunks: int = 120
-    max_upload_bytes: int = 10 * 1024 * 1024
+    # Concurrent submissions of the same video / file / page: the first one
+    # holds a Redis lease (renewed at every stage) and the rest re-queue their
+    # extract stage until its map summaries exist, then reuse them.  A
+    # follower does the work itself once singleflight_wait_sec have passed
+    # since it was submitted
+    singleflight_enabled: bool = True
+    singleflight_lease_sec: int = 3600
+    singleflight_wait_sec: int = 3600
+    # Uploads are streamed to disk, so this is not bounded by worker RAM
+    max_upload_bytes: int = 100 * 1024 * 1024
     tmp_dir: str = "/tmp/app"
 
+    # Pipeline stage -> Celery queue, e.g. {"transcribe": "whisper", "map": "llm"}.
+    # Stages without an entry run on the default "celery" queue.
+    stage_queues: dict[str, str] = {}
+    stage_max_retries: int = 3
+    stage_retry_backoff: int = 30
+
+    # "db" writes coalesced progress to the sources row; "redis" keeps
+    # non-terminal progress in Redis and persists only terminal states.
+    progress_backend: str = "db"
+    progress_debounce_sec: float = 2.0
+
     cors_origins: list[str] = ["http://localhost:3000"]
 
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
@@ -0,0 +1,18 @@
+from functools import lru_cache
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+
+@lru_cache
+def get_redis() -> redis.Redis:
+    """Process-wide sync Redis client (Celery workers)."""
+    return redis.Redis.from_url(settings.redis_url, decode_responses=True)
+
+
+@lru_cache
+def get_async_redis() -> aioredis.Redis:
+    """Process-wide async Redis client (API)."""
+    return aioredis.Redis.from_url(settings.redis_url, decode_responses=True)
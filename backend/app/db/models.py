@@ -1,7 +1,15 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+)
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -14,6 +22,12 @@ def utcnow() -> datetime:
 
 class Source(Base):
     __tablename__ = "sources"
+    # Keyset pagination of the history feed seeks on (created_at, id);
+    # the extract stage looks up earlier sources by content digest.
+    __table_args__ = (
+        Index("ix_sources_created_at_id", "created_at", "id"),
+        Index("ix_sources_content_digest", "content_digest"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -24,6 +38,8 @@ class Source(Base):
         String(20), nullable=False, default="youtube"
     )
     file_path: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # SHA-256 of the uploaded file, or of the normalized final URL of a web page
+    content_digest: Mapped[str | None] = mapped_column(String(64), nullable=True)
     status: Mapped[str] = mapped_column(String(20), nullable=False, default="queued")
     progress_json: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
     regen_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -45,6 +61,9 @@ class Source(Base):
     validations: Mapped[list["Validation"]] = relationship(
         back_populates="source", order_by="Validation.created_at"
     )
+    checkpoints: Mapped[list["PipelineCheckpoint"]] = relationship(
+        back_populates="source", order_by="PipelineCheckpoint.created_at"
+    )
 
 
 class Transcript(Base):
@@ -61,10 +80,46 @@ class Transcript(Base):
     meta_json: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
 
     source: Mapped["Source"] = relationship(back_populates="transcript")
+    chunk_summaries: Mapped[list["ChunkSummary"]] = relationship(
+        back_populates="transcript", order_by="ChunkSummary.chunk_index"
+    )
+
+
+class ChunkSummary(Base):
+    """Map-stage output for one transcript chunk, reused by reduce and regeneration.
+
+    Tree-reduce merges of summary groups are stored here too, under
+    MERGE_PROMPT_VERSION with the group's content hash.
+    """
+
+    __tablename__ = "chunk_summaries"
+    __table_args__ = (
+        UniqueConstraint(
+            "transcript_id", "chunk_index", "chunk_hash", "map_model", "prompt_version"
+        ),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    transcript_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("transcripts.id")
+    )
+    chunk_index: Mapped[int] = mapped_column(Integer, nullable=False)
+    chunk_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    map_model: Mapped[str] = mapped_column(String(100), nullable=False)
+    prompt_version: Mapped[str] = mapped_column(String(20), nullable=False)
+    summary: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=utcnow
+    )
+
+    transcript: Mapped["Transcript"] = relationship(back_populates="chunk_summaries")
 
 
 class GeneratedContent(Base):
     __tablename__ = "generated_content"
+    __table_args__ = (Index("ix_generated_content_result_key", "result_key"),)
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -73,6 +128,10 @@ class GeneratedContent(Base):
         UUID(as_uuid=True), ForeignKey("sources.id"), unique=True
     )
     content_payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    # Content, prompt set and model routing the payload was generated with
+    result_key: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    # Source whose payload was cloned by the result cache
+    cached_from: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
 
     source: Mapped["Source"] = relationship(back_populates="generated_content")
 
@@ -93,3 +152,24 @@ class Validation(Base):
     )
 
     source: Mapped["Source"] = relationship(back_populates="validations")
+
+
+class PipelineCheckpoint(Base):
+    """Output of a completed pipeline stage, used to resume after a crash or retry."""
+
+    __tablename__ = "pipeline_checkpoints"
+    __table_args__ = (UniqueConstraint("source_id", "stage"),)
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    source_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("sources.id")
+    )
+    stage: Mapped[str] = mapped_column(String(20), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=utcnow
+    )
+
+    source: Mapped["Source"] = relationship(back_populates="checkpoints")
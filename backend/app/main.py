@@ -2,6 +2,7 @@ import logging
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
@@ -40,3 +41,30 @@ app.include_router(sources_router)
 @app.get("/api/health")
 async def health():
     return {"status": "ok"}
+
+
+@app.get("/api/llm/cache")
+async def llm_cache_stats():
+    """Hit/miss counters of the LLM response cache, shared by all workers."""
+    if not settings.llm_cache_enabled:
+        return {"enabled": False}
+    from app.providers.factory import get_llm_cache
+
+    stats = await run_in_threadpool(get_llm_cache().stats)
+    return {"enabled": True, "backend": settings.llm_cache_backend, **stats}
+
+
+@app.get("/api/llm/governor")
+async def llm_governor_stats():
+    """Cluster-wide wait counters of the LLM rate governor, per limited model."""
+    if not settings.llm_rate_limits:
+        return {"models": {}}
+    from app.providers.factory import get_rate_governor
+
+    governor = get_rate_governor()
+    return {
+        "models": {
+            model: await run_in_threadpool(governor.stats, model)
+            for model in settings.llm_rate_limits
+        }
+    }
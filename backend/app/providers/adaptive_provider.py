@@ -0,0 +1,37 @@
+from collections.abc import Iterator
+
+from app.providers.base_llm import BaseLLMProvider
+from app.providers.concurrency_limiter import (
+    AIMDLimiter,
+    current_call_kind,
+    get_limiter,
+)
+
+
+class AdaptiveConcurrencyLLMProvider(BaseLLMProvider):
+    """Runs each request in a slot of the AIMD limiter for its model and call
+    kind (see call_kind), so the map and reduce thread pools only bound
+    parallelism and the limiter sets it."""
+
+    def __init__(self, inner: BaseLLMProvider) -> None:
+        self.inner = inner
+        self.name = inner.name
+        self.temperature = inner.temperature
+        self.json_temperature = inner.json_temperature
+
+    def complete(self, system_prompt: str, user_prompt: str, model: str) -> str:
+        with _limiter(model).slot():
+            return self.inner.complete(system_prompt, user_prompt, model)
+
+    def complete_json(self, system_prompt: str, user_prompt: str, model: str) -> dict:
+        with _limiter(model).slot():
+            return self.inner.complete_json(system_prompt, user_prompt, model)
+
+    def complete_stream(self, system_prompt: str, user_prompt: str, model: str) -> Iterator[str]:
+        with _limiter(model).slot():
+            yield from self.inner.complete_stream(system_prompt, user_prompt, model)
+
+
+def _limiter(model: str) -> AIMDLimiter:
+    kind, initial = current_call_kind()
+    return get_limiter(model, kind, initial)
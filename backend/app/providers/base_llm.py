@@ -1,7 +1,21 @@
+import logging
+import threading
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
+
+logger = logging.getLogger(__name__)
+
+# Token usage of the most recent completion on each thread.  Providers call
+# record_usage after every request; callers read it back with pop_usage from
+# the same thread (the reduce fan-out runs one channel per worker thread).
+_usage = threading.local()
 
 
 class BaseLLMProvider(ABC):
+    name: str = "base"
+    temperature: float = 0.3
+    json_temperature: float = 0.1
+
     @abstractmethod
     def complete(self, system_prompt: str, user_prompt: str, model: str) -> str:
         """Generate a text completion."""
@@ -11,3 +25,57 @@ class BaseLLMProvider(ABC):
     def complete_json(self, system_prompt: str, user_prompt: str, model: str) -> dict:
         """Generate a completion and parse the result as JSON."""
         ...
+
+    def complete_stream(self, system_prompt: str, user_prompt: str, model: str) -> Iterator[str]:
+        """Yield a text completion in pieces as the model produces them.
+
+        Providers without streaming support yield the whole completion once.
+        """
+        yield self.complete(system_prompt, user_prompt, model)
+
+
+def record_usage(model: str, response) -> None:
+    """Store the usage of an OpenAI-compatible chat response for this thread.
+
+    ``cached_tokens`` is the prompt prefix the server served from its prompt
+    cache; backends that do not report it count as zero.
+    """
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        _usage.value = None
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    _usage.value = {
+        "prompt_tokens": usage.prompt_tokens or 0,
+        "cached_tokens": getattr(details, "cached_tokens", 0) or 0,
+        "completion_tokens": usage.completion_tokens or 0,
+    }
+    logger.info(
+        "LLM usage model=%s prompt=%d cached=%d completion=%d",
+        model,
+        _usage.value["prompt_tokens"],
+        _usage.value["cached_tokens"],
+        _usage.value["completion_tokens"],
+    )
+
+
+def record_cache_hit(hit: bool) -> None:
+    """Note whether this thread's last completion was served from a cache."""
+    _usage.cache_hit = hit
+
+
+def served_from_cache() -> bool:
+    """True when this thread's last completion came from a response cache."""
+    return getattr(_usage, "cache_hit", False)
+
+
+def pop_usage() -> dict | None:
+    """Usage of this thread's last completion, or None (unreported or cache hit)."""
+    value = getattr(_usage, "value", None)
+    _usage.value = None
+    return value
+
+
+def peek_usage() -> dict | None:
+    """Like pop_usage, but leaves the usage for the caller further up."""
+    return getattr(_usage, "value", None)
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import logging
+from collections.abc import Iterator
+
+from app.providers.base_llm import BaseLLMProvider, pop_usage, record_cache_hit
+from app.providers.llm_cache import BaseLLMCache
+
+logger = logging.getLogger(__name__)
+
+
+class CachedLLMProvider(BaseLLMProvider):
+    """Content-addressed response cache around another provider.
+
+    Identical (provider, model, temperature, system, user, response_format)
+    requests are served from the cache instead of calling the model again.
+    """
+
+    def __init__(self, inner: BaseLLMProvider, cache: BaseLLMCache) -> None:
+        self.inner = inner
+        self.cache = cache
+        self.name = inner.name
+        self.temperature = inner.temperature
+        self.json_temperature = inner.json_temperature
+
+    def complete(self, system_prompt: str, user_prompt: str, model: str) -> str:
+        key = self.cache_key(model, self.temperature, system_prompt, user_prompt, None)
+        return self._cached(
+            key, lambda: self.inner.complete(system_prompt, user_prompt, model)
+        )
+
+    def complete_json(self, system_prompt: str, user_prompt: str, model: str) -> dict:
+        key = self.cache_key(
+            model, self.json_temperature, system_prompt, user_prompt, "json_object"
+        )
+        return self._cached(
+            key, lambda: self.inner.complete_json(system_prompt, user_prompt, model)
+        )
+
+    def complete_stream(self, system_prompt: str, user_prompt: str, model: str) -> Iterator[str]:
+        key = self.cache_key(model, self.temperature, system_prompt, user_prompt, None)
+        cached = self._lookup(key)
+        if cached is not None:
+            yield cached
+            return
+
+        parts: list[str] = []
+        for delta in self.inner.complete_stream(system_prompt, user_prompt, model):
+            parts.append(delta)
+            yield delta
+        self._store(key, "".join(parts))
+
+    def cache_key(
+        self,
+        model: str,
+        temperature: float,
+        system_prompt: str,
+        user_prompt: str,
+        response_format: str | None,
+    ) -> str:
+        material = json.dumps(
+            [self.name, model, temperature, system_prompt, user_prompt, response_format],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    # ------------------------------------------------------------------
+
+    def _cached(self, key: str, call):
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        result = call()
+        self._store(key, result)
+        return result
+
+    def _lookup(self, key: str):
+        try:
+            cached = self.cache.get(key)
+        except Exception:
+            logger.warning("LLM cache read failed", exc_info=True)
+            cached = None
+
+        self.cache.record(hit=cached is not None)
+        record_cache_hit(cached is not None)
+        if cached is not None:
+            logger.debug("LLM cache hit %s", key[:12])
+            pop_usage()  # no tokens were spent on this call
+        return cached
+
+    def _store(self, key: str, result) -> None:
+        try:
+            self.cache.set(key, result)
+        except Exception:
+            logger.warning("LLM cache write failed", exc_info=True)
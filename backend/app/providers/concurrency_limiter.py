@@ -0,0 +1,154 @@
+import logging
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Exceptions that mean "the backend is overloaded" rather than "this request
+# is bad": OpenAI / httpx rate-limit and timeout errors, matched by name so
+# the local Ollama client (also openai-compatible) is covered too.
+_OVERLOAD_ERRORS = frozenset(
+    {"RateLimitError", "APITimeoutError", "TimeoutError", "ReadTimeout", "ConnectTimeout"}
+)
+
+# Weight of a new sample in the latency baseline.
+BASELINE_ALPHA = 0.1
+
+
+def is_overload(exc: BaseException) -> bool:
+    return type(exc).__name__ in _OVERLOAD_ERRORS or getattr(exc, "status_code", None) == 429
+
+
+class AIMDLimiter:
+    """Adaptive cap on in-flight requests to one model.
+
+    Additive increase: every request that finishes within ``tolerance`` x the
+    latency baseline raises the limit by 1/limit, i.e. by one per window of
+    requests.  Multiplicative decrease: a 429, a timeout or a latency spike
+    multiplies it by ``backoff``, at most once per congestion episode (only
+    requests started after the last decrease can trigger the next one).
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        min_limit: int,
+        max_limit: int,
+        tolerance: float,
+        backoff: float = 0.5,
+    ) -> None:
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(self.max_limit, max(self.min_limit, initial)))
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.in_flight = 0
+        self.baseline: float | None = None
+        self._last_decrease = float("-inf")
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold one of the ``limit`` request slots for the duration of a call."""
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+        started = time.monotonic()
+        outcome = "error"
+        try:
+            yield
+            outcome = "ok"
+        except BaseException as e:
+            if is_overload(e):
+                outcome = "overload"
+            raise
+        finally:
+            self._complete(started, time.monotonic() - started, outcome)
+
+    def _complete(self, started: float, latency: float, outcome: str) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            spike = (
+                outcome == "ok"
+                and self.baseline is not None
+                and latency > self.baseline * self.tolerance
+            )
+            if outcome == "overload" or spike:
+                if started > self._last_decrease:
+                    self.limit = max(self.min_limit, self.limit * self.backoff)
+                    self._last_decrease = time.monotonic()
+                    logger.info(
+                        "Concurrency limit down to %d (%s, %.1fs)",
+                        int(self.limit), "overload" if outcome == "overload" else "latency", latency,
+                    )
+            elif outcome == "ok":
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+            if outcome == "ok":
+                # Spikes count at most tolerance x baseline, so the baseline
+                # follows a lasting shift in latency without chasing outliers.
+                sample = latency
+                if self.baseline is None:
+                    self.baseline = sample
+                else:
+                    sample = min(sample, self.baseline * self.tolerance)
+                    self.baseline += BASELINE_ALPHA * (sample - self.baseline)
+            self._cond.notify_all()
+
+
+def pool_size() -> int:
+    """Thread pool size for fanned-out map and merge calls.
+
+    With adaptive_concurrency the limiters decide how many calls run, so the
+    pool only has to leave room for llm_concurrency_max; otherwise it is the
+    fixed map_concurrency.
+    """
+    if settings.adaptive_concurrency:
+        return max(1, settings.llm_concurrency_max)
+    return max(1, settings.map_concurrency)
+
+
+_limiters: dict[tuple[str, str], AIMDLimiter] = {}
+_limiters_lock = threading.Lock()
+_call_kind = threading.local()
+
+
+@contextmanager
+def call_kind(kind: str, initial: int | None = None) -> Iterator[None]:
+    """Label the LLM calls this thread makes inside the block.
+
+    Map, reduce and validation calls differ in latency by far more than the
+    tolerance, so each kind gets its own limiter even on the same model.
+    ``initial`` (the caller's pool size) is the starting limit when the
+    kind's limiter is created; unlabelled calls use llm_concurrency_initial.
+    """
+    previous = getattr(_call_kind, "value", None)
+    _call_kind.value = (kind, initial)
+    try:
+        yield
+    finally:
+        _call_kind.value = previous
+
+
+def current_call_kind() -> tuple[str, int | None]:
+    return getattr(_call_kind, "value", None) or ("default", None)
+
+
+def get_limiter(model: str, kind: str = "default", initial: int | None = None) -> AIMDLimiter:
+    """Process-wide limiter for ``kind`` calls to ``model``, shared by all
+    tasks in the worker."""
+    with _limiters_lock:
+        limiter = _limiters.get((model, kind))
+        if limiter is None:
+            limiter = _limiters[(model, kind)] = AIMDLimiter(
+                initial=initial or settings.llm_concurrency_initial,
+                min_limit=settings.llm_concurrency_min,
+                max_limit=settings.llm_concurrency_max,
+                tolerance=settings.llm_latency_tolerance,
+            )
+        return limiter
@@ -1,24 +1,71 @@
+import importlib
+from functools import lru_cache
+
 from app.core.config import settings
 from app.providers.base_llm import BaseLLMProvider
+from app.providers.llm_cache import BaseLLMCache
+from app.providers.rate_governor import RateGovernor
 
 _PROVIDERS = {
     "openai": "app.providers.openai_provider.OpenAIProvider",
     "local_ollama": "app.providers.local_llm_provider.LocalLLMProvider",
 }
 
+_CACHE_BACKENDS = {
+    "redis": "app.providers.llm_cache.RedisLLMCache",
+    "sqlite": "app.providers.llm_cache.SqliteLLMCache",
+}
+
+
+def _load(dotted: str):
+    module_path, class_name = dotted.rsplit(".", 1)
+    module = importlib.import_module(module_path)
+    return getattr(module, class_name)
+
+
+@lru_cache
+def get_llm_cache() -> BaseLLMCache:
+    backend = settings.llm_cache_backend
+    dotted = _CACHE_BACKENDS.get(backend)
+    if dotted is None:
+        raise ValueError(
+            f"Unknown LLM_CACHE_BACKEND={backend!r}. "
+            f"Supported: {', '.join(_CACHE_BACKENDS)}"
+        )
+    return _load(dotted)(
+        ttl_sec=settings.llm_cache_ttl_sec,
+        max_entries=settings.llm_cache_max_entries,
+    )
+
+
+@lru_cache
+def get_rate_governor() -> RateGovernor:
+    return RateGovernor(settings.llm_rate_limits)
 
-def get_llm_provider() -> BaseLLMProvider:
-    provider_key = settings.llm_provider
+
+def get_llm_provider(provider_key: str | None = None) -> BaseLLMProvider:
+    provider_key = provider_key or settings.llm_provider
     dotted = _PROVIDERS.get(provider_key)
     if dotted is None:
         raise ValueError(
             f"Unknown LLM_PROVIDER={provider_key!r}. "
             f"Supported: {', '.join(_PROVIDERS)}"
         )
-    module_path, class_name = dotted.rsplit(".", 1)
+    provider = _load(dotted)()
 
-    import importlib
+    if settings.adaptive_concurrency:
+        from app.providers.adaptive_provider import AdaptiveConcurrencyLLMProvider
 
-    module = importlib.import_module(module_path)
-    cls = getattr(module, class_name)
-    return cls()
+        provider = AdaptiveConcurrencyLLMProvider(provider)
+
+    # Inside the cache, so cache hits spend no budget.
+    if settings.llm_rate_limits:
+        from app.providers.governed_provider import GovernedLLMProvider
+
+        provider = GovernedLLMProvider(provider, get_rate_governor())
+
+    if settings.llm_cache_enabled:
+        from app.providers.cached_provider import CachedLLMProvider
+
+        provider = CachedLLMProvider(provider, get_llm_cache())
+    return provider
@@ -0,0 +1,63 @@
+import logging
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from app.providers.base_llm import BaseLLMProvider, peek_usage, pop_usage
+from app.providers.rate_governor import RateGovernor
+
+logger = logging.getLogger(__name__)
+
+# Rough prompt size before the request is made; the reservation is
+# corrected with the reported usage afterwards.
+CHARS_PER_TOKEN = 3
+ESTIMATED_COMPLETION_TOKENS = 1024
+
+
+class GovernedLLMProvider(BaseLLMProvider):
+    """Holds every request to another provider until the cluster-wide
+    RPM/TPM budget of its model allows it (see RateGovernor)."""
+
+    def __init__(self, inner: BaseLLMProvider, governor: RateGovernor) -> None:
+        self.inner = inner
+        self.governor = governor
+        self.name = inner.name
+        self.temperature = inner.temperature
+        self.json_temperature = inner.json_temperature
+
+    def complete(self, system_prompt: str, user_prompt: str, model: str) -> str:
+        with self._governed(model, system_prompt, user_prompt):
+            return self.inner.complete(system_prompt, user_prompt, model)
+
+    def complete_json(self, system_prompt: str, user_prompt: str, model: str) -> dict:
+        with self._governed(model, system_prompt, user_prompt):
+            return self.inner.complete_json(system_prompt, user_prompt, model)
+
+    def complete_stream(self, system_prompt: str, user_prompt: str, model: str) -> Iterator[str]:
+        with self._governed(model, system_prompt, user_prompt):
+            yield from self.inner.complete_stream(system_prompt, user_prompt, model)
+
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _governed(self, model: str, system_prompt: str, user_prompt: str) -> Iterator[None]:
+        """Reserve budget for one call, then settle it against the reported usage.
+
+        A failed call is settled as zero tokens (its request still counts).
+        Without reported usage the estimate stands.
+        """
+        estimate = (
+            (len(system_prompt) + len(user_prompt)) // CHARS_PER_TOKEN
+            + ESTIMATED_COMPLETION_TOKENS
+        )
+        self.governor.acquire(model, estimate)
+        # Drop an earlier call's usage so it is not taken for this one's.
+        pop_usage()
+        try:
+            yield
+        except Exception:
+            self.governor.adjust(model, -estimate)
+            raise
+        usage = peek_usage()
+        if usage is not None:
+            actual = usage["prompt_tokens"] + usage["completion_tokens"]
+            self.governor.adjust(model, actual - estimate)
@@ -0,0 +1,162 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _hit_report(hits: int, misses: int) -> dict:
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+    }
+
+
+class BaseLLMCache(ABC):
+    """Key/value store for LLM responses with TTL and LRU eviction.
+
+    Hit/miss counters live in the store itself, so ``stats`` covers every
+    process that shares it (workers and the API, see /api/llm/cache).
+    """
+
+    def __init__(self, ttl_sec: int, max_entries: int) -> None:
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+
+    @abstractmethod
+    def record(self, hit: bool) -> None:
+        ...
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """Lookups served (hits) and missed so far, and the hit rate."""
+        ...
+
+    @abstractmethod
+    def get(self, key: str) -> str | dict | None:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: str | dict) -> None:
+        ...
+
+
+class RedisLLMCache(BaseLLMCache):
+    """Entries expire via Redis TTL; a sorted set of access times drives LRU."""
+
+    KEY_PREFIX = "llm_cache:"
+    LRU_KEY = "llm_cache:lru"
+    STATS_KEY = "llm_cache:stats"
+
+    def __init__(self, ttl_sec: int, max_entries: int) -> None:
+        super().__init__(ttl_sec, max_entries)
+        from app.core.redis import get_redis
+
+        self.client = get_redis()
+
+    def record(self, hit: bool) -> None:
+        self.client.hincrby(self.STATS_KEY, "hits" if hit else "misses", 1)
+
+    def stats(self) -> dict:
+        raw = self.client.hgetall(self.STATS_KEY)
+        return _hit_report(int(raw.get("hits", 0)), int(raw.get("misses", 0)))
+
+    def get(self, key: str) -> str | dict | None:
+        raw = self.client.get(self.KEY_PREFIX + key)
+        if raw is None:
+            self.client.zrem(self.LRU_KEY, key)
+            return None
+        self.client.zadd(self.LRU_KEY, {key: time.time()})
+        return json.loads(raw)
+
+    def set(self, key: str, value: str | dict) -> None:
+        pipe = self.client.pipeline()
+        pipe.set(self.KEY_PREFIX + key, json.dumps(value, ensure_ascii=False), ex=self.ttl_sec)
+        pipe.zadd(self.LRU_KEY, {key: time.time()})
+        pipe.zcard(self.LRU_KEY)
+        size = pipe.execute()[-1]
+        if size > self.max_entries:
+            evicted = self.client.zpopmin(self.LRU_KEY, size - self.max_entries)
+            if evicted:
+                self.client.delete(*(self.KEY_PREFIX + k for k, _ in evicted))
+
+
+class SqliteLLMCache(BaseLLMCache):
+    """Single-file on-disk cache, for workers without a shared Redis."""
+
+    def __init__(self, ttl_sec: int, max_entries: int, path: str | None = None) -> None:
+        super().__init__(ttl_sec, max_entries)
+        self.path = path or settings.llm_cache_path
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS llm_cache_accessed_at ON llm_cache (accessed_at)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache_stats ("
+            "name TEXT PRIMARY KEY, count INTEGER NOT NULL)"
+        )
+        self._conn.commit()
+
+    def record(self, hit: bool) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO llm_cache_stats (name, count) VALUES (?, 1) "
+                "ON CONFLICT (name) DO UPDATE SET count = count + 1",
+                ("hits" if hit else "misses",),
+            )
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT name, count FROM llm_cache_stats"))
+        return _hit_report(counts.get("hits", 0), counts.get("misses", 0))
+
+    def get(self, key: str) -> str | dict | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at <= now:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+        return json.loads(value)
+
+    def set(self, key: str, value: str | dict) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now + self.ttl_sec, now),
+            )
+            self._conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                "SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
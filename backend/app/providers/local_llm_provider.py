@@ -1,16 +1,19 @@
 import json
 import logging
 import re
+from collections.abc import Iterator
 
 from openai import OpenAI
 
 from app.core.config import settings
-from app.providers.base_llm import BaseLLMProvider
+from app.providers.base_llm import BaseLLMProvider, record_usage
 
 logger = logging.getLogger(__name__)
 
 
 class LocalLLMProvider(BaseLLMProvider):
+    name = "local_ollama"
+
     def __init__(self) -> None:
         self.client = OpenAI(
             base_url=settings.local_llm_base_url,
@@ -24,10 +27,28 @@ class LocalLLMProvider(BaseLLMProvider):
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt},
             ],
-            temperature=0.3,
+            temperature=self.temperature,
         )
+        record_usage(model, response)
         return response.choices[0].message.content or ""
 
+    def complete_stream(self, system_prompt: str, user_prompt: str, model: str) -> Iterator[str]:
+        stream = self.client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            temperature=self.temperature,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        for chunk in stream:
+            if chunk.usage is not None:
+                record_usage(model, chunk)
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
     def complete_json(self, system_prompt: str, user_prompt: str, model: str) -> dict:
         try:
             response = self.client.chat.completions.create(
@@ -36,9 +57,10 @@ class LocalLLMProvider(BaseLLMProvider):
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt},
                 ],
-                temperature=0.1,
+                temperature=self.json_temperature,
                 response_format={"type": "json_object"},
             )
+            record_usage(model, response)
             text = response.choices[0].message.content or "{}"
             return json.loads(text)
         except Exception as exc:
@@ -56,8 +78,9 @@ class LocalLLMProvider(BaseLLMProvider):
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt},
             ],
-            temperature=0.1,
+            temperature=self.json_temperature,
         )
+        record_usage(model, response)
         text = response.choices[0].message.content or ""
         return self._extract_json(text)
 
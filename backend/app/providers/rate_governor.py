@@ -0,0 +1,142 @@
+import logging
+import time
+
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Token buckets that may go into debt: each caller reserves its share and is
+# told how long to wait for the reservation to mature.  Callers are served
+# in the order they reach Redis, so a burst from one task cannot starve the
+# others, and nobody polls.  Redis' clock is used so workers need not agree.
+#
+# KEYS: bucket keys.  ARGV: (per-second rate, capacity, amount) per key.
+# Returns the wait in seconds (as a string; Lua numbers are truncated).
+_RESERVE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[i * 3 - 2])
+    local capacity = tonumber(ARGV[i * 3 - 1])
+    local amount = tonumber(ARGV[i * 3])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate) - amount
+    redis.call('HSET', key, 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', key, math.ceil(capacity / rate) + 60)
+    if tokens < 0 then
+        wait = math.max(wait, -tokens / rate)
+    end
+end
+return tostring(wait)
+"""
+
+# Per-model wait counters; the max is taken in Redis so concurrent workers
+# do not overwrite each other's value.  ARGV: the wait in seconds.
+_RECORD_SCRIPT = """
+local wait = tonumber(ARGV[1])
+redis.call('HINCRBY', KEYS[1], 'requests', 1)
+if wait > 0 then
+    redis.call('HINCRBY', KEYS[1], 'waited', 1)
+    redis.call('HINCRBYFLOAT', KEYS[1], 'wait_sec', ARGV[1])
+    local current = tonumber(redis.call('HGET', KEYS[1], 'wait_sec_max')) or 0
+    if wait > current then
+        redis.call('HSET', KEYS[1], 'wait_sec_max', ARGV[1])
+    end
+end
+return 0
+"""
+
+
+class RateGovernor:
+    """Cluster-wide requests- and tokens-per-minute budgets per model.
+
+    ``limits`` maps a model to ``{"rpm": ..., "tpm": ...}``; either may be
+    omitted and models without an entry are not limited.  Buckets hold one
+    minute of budget.  Wait counters are kept in Redis per model, so
+    ``stats`` reports for the whole cluster.  If Redis is unavailable calls
+    go through ungoverned.
+    """
+
+    BUCKET_KEY = "llm_governor:{model}:{kind}"
+    STATS_KEY = "llm_governor:stats:{model}"
+
+    def __init__(self, limits: dict[str, dict[str, int]]) -> None:
+        self.limits = limits
+        self.client = get_redis()
+        self._reserve = self.client.register_script(_RESERVE_SCRIPT)
+        self._record_stats = self.client.register_script(_RECORD_SCRIPT)
+
+    def acquire(self, model: str, tokens: int) -> float:
+        """Reserve one request and ``tokens`` tokens; sleep until they are
+        available.  Returns the seconds waited."""
+        buckets = self._buckets(model, requests=1, tokens=tokens)
+        if not buckets:
+            return 0.0
+        try:
+            wait = self._reserve_all(buckets)
+        except Exception:
+            logger.warning("LLM rate governor unavailable, not throttling", exc_info=True)
+            return 0.0
+
+        if wait > 0:
+            logger.info("LLM governor: waiting %.2fs for %s", wait, model)
+            time.sleep(wait)
+        self._record(model, wait)
+        return wait
+
+    def adjust(self, model: str, tokens: int) -> None:
+        """Correct the token reservation once actual usage is known
+        (negative ``tokens`` hands unused budget back)."""
+        buckets = self._buckets(model, requests=0, tokens=tokens)
+        if not buckets:
+            return
+        try:
+            self._reserve_all(buckets)
+        except Exception:
+            logger.warning("LLM rate governor adjustment failed", exc_info=True)
+
+    def stats(self, model: str) -> dict:
+        raw = self.client.hgetall(self.STATS_KEY.format(model=model))
+        requests = int(raw.get("requests", 0))
+        waited = int(raw.get("waited", 0))
+        wait_sec = float(raw.get("wait_sec", 0.0))
+        return {
+            "requests": requests,
+            "waited": waited,
+            "wait_sec_total": round(wait_sec, 3),
+            "wait_sec_mean": round(wait_sec / requests, 3) if requests else 0.0,
+            "wait_sec_max": round(float(raw.get("wait_sec_max", 0.0)), 3),
+        }
+
+    # ------------------------------------------------------------------
+
+    def _buckets(self, model: str, requests: int, tokens: int) -> list[tuple[str, float, int, int]]:
+        limits = self.limits.get(model) or {}
+        buckets = []
+        for kind, amount in (("rpm", requests), ("tpm", tokens)):
+            per_minute = limits.get(kind)
+            if per_minute and amount:
+                buckets.append(
+                    (
+                        self.BUCKET_KEY.format(model=model, kind=kind),
+                        per_minute / 60,
+                        per_minute,
+                        # A request larger than the bucket could never be served.
+                        min(amount, per_minute),
+                    )
+                )
+        return buckets
+
+    def _reserve_all(self, buckets: list[tuple[str, float, int, int]]) -> float:
+        keys = [key for key, *_ in buckets]
+        args = [value for _, *values in buckets for value in values]
+        return float(self._reserve(keys=keys, args=args))
+
+    def _record(self, model: str, wait: float) -> None:
+        try:
+            self._record_stats(keys=[self.STATS_KEY.format(model=model)], args=[f"{wait:.6f}"])
+        except Exception:
+            logger.warning("Could not record LLM governor stats", exc_info=True)
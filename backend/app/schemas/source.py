@@ -50,6 +50,8 @@ class SourceResponse(BaseModel):
     error: ErrorInfo | None = None
     content_payload: dict | None = None
     validation_report: dict | None = None
+    # The payload was cloned from an identical earlier source (result cache)
+    from_cache: bool = False
 
 
 class RegenerateResponse(BaseModel):
@@ -67,4 +69,6 @@ class SourceListItem(BaseModel):
 
 class SourceListResponse(BaseModel):
     items: list[SourceListItem]
-    total: int
+    next_cursor: str | None = None
+    total: int | None = None
+    total_is_estimate: bool = False
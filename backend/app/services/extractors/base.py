@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
 from dataclasses import dataclass, field
 
 
@@ -8,9 +9,13 @@ class ExtractionResult:
     meta: dict = field(default_factory=dict)
     needs_transcription: bool = False
     audio_path: str | None = None
+    stream_url: str | None = None
 
 
 class ContentExtractor(ABC):
+    # Joins the parts yielded by iter_parts into the full text.
+    part_separator: str = "\n\n"
+
     @abstractmethod
     def extract(self, source) -> ExtractionResult:
         """Extract text content from a source record.
@@ -19,6 +24,29 @@ class ContentExtractor(ABC):
             source: a Source ORM instance with url, file_path, source_type, id.
 
         Returns:
-            ExtractionResult with extracted text or audio_path for whisper.
+            ExtractionResult with extracted text, or audio_path / stream_url
+            for whisper.
         """
         ...
+
+    def iter_parts(self, source, result: ExtractionResult) -> Iterator[str]:
+        """Yield the text unit by unit, so chunking and mapping can start on
+        the first one; joined with part_separator it is the full text.
+
+        Everything but ``result.text`` is filled in once the iterator is
+        exhausted.  By default the whole source is extracted and its text
+        yielded as a single part; extractors that read a document in units
+        (pages, chapters) override this.
+        """
+        extracted = self.extract(source)
+        result.meta.update(extracted.meta)
+        result.needs_transcription = extracted.needs_transcription
+        result.audio_path = extracted.audio_path
+        result.stream_url = extracted.stream_url
+        if extracted.text:
+            yield extracted.text
+
+    def count_parts(self, source) -> int | None:
+        """Cheap upper bound on the number of parts iter_parts yields, read
+        from the document structure without extracting text; None if unknown."""
+        return None
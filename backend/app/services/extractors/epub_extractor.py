@@ -1,4 +1,5 @@
 import logging
+from collections.abc import Iterator
 
 import ebooklib
 from bs4 import BeautifulSoup
@@ -11,17 +12,28 @@ logger = logging.getLogger(__name__)
 
 class EpubExtractor(ContentExtractor):
     def extract(self, source) -> ExtractionResult:
+        result = ExtractionResult(text="")
+        result.text = self.part_separator.join(self.iter_parts(source, result))
+        return result
+
+    def count_parts(self, source) -> int | None:
+        book = epub.read_epub(source.file_path, options={"ignore_ncx": True})
+        return sum(1 for _ in book.get_items_of_type(ebooklib.ITEM_DOCUMENT))
+
+    def iter_parts(self, source, result: ExtractionResult) -> Iterator[str]:
         book = epub.read_epub(source.file_path, options={"ignore_ncx": True})
 
-        chapters_text: list[str] = []
+        chapter_count = 0
+        has_text = False
         for item in book.get_items_of_type(ebooklib.ITEM_DOCUMENT):
             soup = BeautifulSoup(item.get_content(), "html.parser")
             text = soup.get_text(separator="\n", strip=True)
             if text:
-                chapters_text.append(text)
+                chapter_count += 1
+                has_text = has_text or bool(text.strip())
+                yield text
 
-        full_text = "\n\n".join(chapters_text)
-        if not full_text.strip():
+        if not has_text:
             raise ValueError(
                 "transcript_unavailable: EPUB contains no extractable text"
             )
@@ -37,10 +49,11 @@ class EpubExtractor(ContentExtractor):
             import os
             book_title = os.path.splitext(os.path.basename(source.file_path))[0]
 
-        meta = {
-            "source": "epub",
-            "file_path": source.file_path,
-            "chapter_count": len(chapters_text),
-            "title": book_title,
-        }
-        return ExtractionResult(text=full_text, meta=meta)
+        result.meta.update(
+            {
+                "source": "epub",
+                "file_path": source.file_path,
+                "chapter_count": chapter_count,
+                "title": book_title,
+            }
+        )
@@ -1,4 +1,5 @@
 import logging
+from collections.abc import Iterator
 
 import pdfplumber
 
@@ -9,23 +10,35 @@ logger = logging.getLogger(__name__)
 
 class PdfExtractor(ContentExtractor):
     def extract(self, source) -> ExtractionResult:
-        pages_text: list[str] = []
+        result = ExtractionResult(text="")
+        result.text = self.part_separator.join(self.iter_parts(source, result))
+        return result
+
+    def count_parts(self, source) -> int | None:
+        with pdfplumber.open(source.file_path) as pdf:
+            return len(pdf.pages)
+
+    def iter_parts(self, source, result: ExtractionResult) -> Iterator[str]:
+        page_count = 0
+        has_text = False
         with pdfplumber.open(source.file_path) as pdf:
             for page in pdf.pages:
                 text = page.extract_text()
                 if text:
-                    pages_text.append(text)
+                    page_count += 1
+                    has_text = has_text or bool(text.strip())
+                    yield text
 
-        full_text = "\n\n".join(pages_text)
-        if not full_text.strip():
+        if not has_text:
             raise ValueError("transcript_unavailable: PDF contains no extractable text")
 
         import os
         title = os.path.splitext(os.path.basename(source.file_path))[0] if source.file_path else None
-        meta = {
-            "source": "pdf",
-            "file_path": source.file_path,
-            "page_count": len(pages_text),
-            "title": title,
-        }
-        return ExtractionResult(text=full_text, meta=meta)
+        result.meta.update(
+            {
+                "source": "pdf",
+                "file_path": source.file_path,
+                "page_count": page_count,
+                "title": title,
+            }
+        )
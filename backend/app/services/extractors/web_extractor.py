@@ -1,5 +1,5 @@
 import logging
-from urllib.parse import quote, urlsplit, urlunsplit
+from urllib.parse import parse_qsl, quote, urlencode, urlsplit, urlunsplit
 
 from newspaper import Article
 
@@ -7,6 +7,9 @@ from app.services.extractors.base import ContentExtractor, ExtractionResult
 
 logger = logging.getLogger(__name__)
 
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+_TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "yclid", "mc_cid", "mc_eid")
+
 
 def _encode_url(url: str) -> str:
     """Percent-encode non-ASCII characters in URL path/query (keeps scheme & host)."""
@@ -21,6 +24,26 @@ def _encode_url(url: str) -> str:
     return encoded
 
 
+def normalize_url(url: str) -> str:
+    """Canonical form of a page URL for dedup.
+
+    Lowercases scheme and host, drops default ports, fragments, tracking
+    query parameters and a trailing slash, and sorts the remaining query.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip("/") or "/"
+    query = sorted(
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(_TRACKING_PARAMS)
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
 class WebExtractor(ContentExtractor):
     def extract(self, source) -> ExtractionResult:
         safe_url = _encode_url(source.url)
@@ -37,6 +60,9 @@ class WebExtractor(ContentExtractor):
         meta = {
             "source": "web",
             "url": source.url,
+            # Where the page actually lives (canonical link, else the submitted
+            # URL); keys the dedup of repeated submissions.
+            "final_url": normalize_url(article.canonical_link or source.url),
             "title": article.title or "",
             "authors": article.authors or [],
         }
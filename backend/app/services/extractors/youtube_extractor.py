@@ -19,5 +19,6 @@ class YoutubeExtractor(ContentExtractor):
             text="",
             meta=result["meta"],
             needs_transcription=True,
-            audio_path=result["audio_path"],
+            audio_path=result.get("audio_path"),
+            stream_url=result.get("stream_url"),
         )
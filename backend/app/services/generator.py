@@ -1,11 +1,18 @@
+import hashlib
 import json
 import logging
+import math
+import queue
+import threading
+from collections.abc import Callable, Iterable
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import tiktoken
 
 from app.core.config import settings
-from app.providers.base_llm import BaseLLMProvider
+from app.providers.base_llm import BaseLLMProvider, pop_usage
+from app.providers.concurrency_limiter import call_kind, pool_size
+from app.services.hedging import get_hedger
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +27,29 @@ MAP_SYSTEM_PROMPT = (
     "Отвечай на русском языке."
 )
 
+# Bump whenever MAP_SYSTEM_PROMPT changes so stored chunk summaries are not reused.
+MAP_PROMPT_VERSION = "1"
+
+MERGE_SYSTEM_PROMPT = (
+    "Ты — эксперт по анализу контента. "
+    "Тебе даны саммари нескольких последовательных фрагментов одного материала, "
+    "разделённые строкой ---. Объедини их в одно саммари:\n"
+    "1. Сохрани все ключевые идеи и тезисы\n"
+    "2. Сохрани конкретные факты, цифры, примеры и цитаты\n"
+    "3. Убери повторы между фрагментами\n"
+    "4. Сохрани порядок изложения\n\n"
+    "Не добавляй ничего от себя. Отвечай на русском языке."
+)
+
+# Bump whenever MERGE_SYSTEM_PROMPT changes; stored merges carry this version.
+MERGE_PROMPT_VERSION = "merge-1"
+
+SUMMARY_SEPARATOR = "\n\n---\n\n"
+
+# Token window of a map chunk and the overlap between neighbouring chunks.
+MAP_CHUNK_SIZE = 3000
+MAP_CHUNK_OVERLAP = 200
+
 _ANTI_HALLUCINATION = (
     "\n\nСТРОГО ЗАПРЕЩЕНО:\n"
     "- Придумывать факты, цифры, статистику, даты или имена, которых нет в саммари\n"
@@ -117,6 +147,16 @@ REVISION_ADDENDUM = (
     "Предыдущая версия текста для контекста:\n{previous_text}"
 )
 
+# System message of the "shared_prefix" reduce layout: the summaries come
+# first and are byte-identical for every channel, so provider-side prompt
+# caching (OpenAI, vLLM, llama.cpp) serves them once per fan-out; the
+# channel prompt follows as the user message.
+SHARED_SUMMARIES_PROMPT = (
+    "Ниже — саммари исходного материала. Используй их как единственный "
+    "источник фактов для задания, которое придёт следующим сообщением."
+    "\n\nСАММАРИ:\n{summaries}"
+)
+
 CHANNEL_DEFS: list[tuple[str, str, str, bool]] = [
     ("medium_text", "medium", MEDIUM_SYSTEM_PROMPT, False),
     ("habr_text", "habr", HABR_SYSTEM_PROMPT, False),
@@ -130,35 +170,229 @@ ALL_CHANNEL_KEYS = [key for key, *_ in CHANNEL_DEFS]
 PAYLOAD_KEY_TO_PLATFORM: dict[str, str] = {key: platform for key, platform, _, _ in CHANNEL_DEFS}
 PLATFORM_TO_PAYLOAD_KEY: dict[str, str] = {platform: key for key, platform, _, _ in CHANNEL_DEFS}
 
+# Digest of every prompt that shapes a generated payload; editing any of
+# them invalidates the result cache.
+GENERATOR_PROMPTS_DIGEST = hashlib.sha256(
+    json.dumps(
+        [
+            MAP_SYSTEM_PROMPT,
+            MERGE_SYSTEM_PROMPT,
+            REVISION_ADDENDUM,
+            SHARED_SUMMARIES_PROMPT,
+            [prompt for _, _, prompt, _ in CHANNEL_DEFS],
+        ],
+        ensure_ascii=False,
+    ).encode("utf-8")
+).hexdigest()
+
+
+def chunk_hash(chunk: str) -> str:
+    return hashlib.sha256(chunk.encode("utf-8")).hexdigest()
+
+
+class IncrementalChunker:
+    """Token-window chunker that accepts text as it is produced.
+
+    Emits the same windows as a one-shot pass over the concatenated text:
+    a window is released once more tokens than ``chunk_size`` follow its
+    start, and ``finish`` releases the tail.  Pieces are joined with
+    ``separator``, as the full text would have been.
+    """
+
+    def __init__(
+        self, enc, chunk_size: int = MAP_CHUNK_SIZE, overlap: int = MAP_CHUNK_OVERLAP, separator: str = " "
+    ) -> None:
+        self._enc = enc
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.separator = separator
+        self._tokens: list[int] = []
+        self._start = 0
+        self.emitted = 0
+
+    @property
+    def token_count(self) -> int:
+        return len(self._tokens)
+
+    def chunks_for(self, tokens: float) -> int:
+        """Number of windows ``tokens`` tokens of text would be cut into."""
+        step = max(1, self.chunk_size - self.overlap)
+        return max(1, math.ceil((tokens - self.overlap) / step))
+
+    def feed(self, text: str) -> list[str]:
+        if self._tokens and text:
+            text = self.separator + text
+        self._tokens.extend(self._enc.encode(text))
+        return self._drain(final=False)
+
+    def finish(self) -> list[str]:
+        return self._drain(final=True)
+
+    def _drain(self, final: bool) -> list[str]:
+        chunks: list[str] = []
+        while self._start < len(self._tokens):
+            end = self._start + self.chunk_size
+            if end >= len(self._tokens):
+                if final:
+                    chunks.append(self._enc.decode(self._tokens[self._start:]))
+                    self._start = len(self._tokens)
+                break
+            chunks.append(self._enc.decode(self._tokens[self._start:end]))
+            self._start = end - self.overlap
+        self.emitted += len(chunks)
+        return chunks
+
+
+def _usage_report(usage: dict[str, dict | None], layout: str) -> dict:
+    """Per-channel token usage of one reduce fan-out plus totals."""
+    reported = [u for u in usage.values() if u]
+    prompt = sum(u["prompt_tokens"] for u in reported)
+    cached = sum(u["cached_tokens"] for u in reported)
+    report = {
+        "layout": layout,
+        "channels": usage,
+        "prompt_tokens": prompt,
+        "cached_tokens": cached,
+        "completion_tokens": sum(u["completion_tokens"] for u in reported),
+        "cached_ratio": round(cached / prompt, 3) if prompt else 0.0,
+    }
+    logger.info(
+        "Reduce usage (%s): prompt=%d cached=%d (%.0f%%) completion=%d",
+        layout, prompt, cached, report["cached_ratio"] * 100, report["completion_tokens"],
+    )
+    return report
+
 
 class GeneratorService:
-    def __init__(self, llm: BaseLLMProvider) -> None:
+    def __init__(self, llm: BaseLLMProvider, hedge_llm: BaseLLMProvider | None = None) -> None:
         self.llm = llm
+        # Provider for hedged map requests; defaults to ``llm`` itself.
+        self.hedge_llm = hedge_llm
+        self.last_reduce_usage: dict | None = None
+        self.last_map_hedges: dict | None = None
         self._enc = tiktoken.get_encoding("cl100k_base")
 
     def chunk_transcript(
-        self, text: str, chunk_size: int = 3000, overlap: int = 200
+        self, text: str, chunk_size: int = MAP_CHUNK_SIZE, overlap: int = MAP_CHUNK_OVERLAP
     ) -> list[str]:
-        tokens = self._enc.encode(text)
-        chunks: list[str] = []
-        start = 0
-        while start < len(tokens):
-            end = min(start + chunk_size, len(tokens))
-            chunks.append(self._enc.decode(tokens[start:end]))
-            if end >= len(tokens):
-                break
-            start = end - overlap
+        chunker = self.incremental_chunker(chunk_size, overlap)
+        chunks = chunker.feed(text) + chunker.finish()
         return chunks if chunks else [text]
 
-    def map_chunks(self, chunks: list[str], max_workers: int = 8) -> list[str]:
+    def incremental_chunker(
+        self, chunk_size: int = MAP_CHUNK_SIZE, overlap: int = MAP_CHUNK_OVERLAP, separator: str = " "
+    ) -> "IncrementalChunker":
+        return IncrementalChunker(self._enc, chunk_size, overlap, separator)
+
+    def map_stream(
+        self,
+        parts: Iterable[str],
+        separator: str = " ",
+        max_workers: int | None = None,
+        max_chunks: int | None = None,
+        expected_parts: int | None = None,
+        mapped: dict[tuple[int, str], str] | None = None,
+    ) -> tuple[list[str], list[str]]:
+        """Chunk text as it is produced and map each chunk as soon as it is cut.
+
+        The calling thread pulls ``parts`` (Whisper segments, PDF pages, EPUB
+        chapters) through an incremental chunker and puts every finished
+        window on a bounded queue; ``max_workers`` map workers (default
+        pool_size()) drain it
+        concurrently.  A full queue blocks the producer, so a slow LLM holds
+        back extraction instead of buffering the whole document.
+
+        With ``expected_parts`` (page or chapter count) the final chunk count
+        is projected from the text seen so far before each chunk is queued,
+        so an oversized document is rejected before its first map call
+        rather than after ``max_chunks`` of them.
+
+        ``mapped`` holds summaries by (chunk index, chunk_hash): chunks found
+        there are not sent again, and each new summary is added as soon as
+        it is ready, so the caller keeps them if mapping fails partway.
+
+        Returns (chunks, summaries) in chunk order.
+        """
+        self._reset_hedges()
+        chunker = self.incremental_chunker(separator=separator)
+        work: queue.Queue = queue.Queue(maxsize=settings.map_queue_size)
+        mapped = {} if mapped is None else mapped
+        errors: list[Exception] = []
+        failed = threading.Event()
+        chunks: list[str] = []
+
+        def _worker() -> None:
+            while True:
+                item = work.get()
+                if item is None:
+                    return
+                if failed.is_set():
+                    continue  # keep draining so the producer never blocks
+                idx, chunk = item
+                try:
+                    logger.info("Mapping chunk %d", idx + 1)
+                    mapped[(idx, chunk_hash(chunk))] = self._map_one(chunk)
+                except Exception as e:
+                    logger.warning("Mapping chunk %d failed", idx + 1, exc_info=True)
+                    errors.append(e)
+                    failed.set()
+
+        def _check_projection(parts_seen: int) -> None:
+            if max_chunks is None or not expected_parts or parts_seen >= expected_parts:
+                return
+            projected = chunker.chunks_for(chunker.token_count * expected_parts / parts_seen)
+            if projected > max_chunks:
+                raise ValueError(
+                    f"too_many_chunks: about {projected} chunks expected, "
+                    f"limit is {max_chunks}"
+                )
+
+        def _emit(new_chunks: list[str]) -> None:
+            for chunk in new_chunks:
+                if max_chunks is not None and len(chunks) >= max_chunks:
+                    raise ValueError(
+                        f"too_many_chunks: more than {max_chunks} chunks"
+                    )
+                if (len(chunks), chunk_hash(chunk)) not in mapped:
+                    work.put((len(chunks), chunk))
+                chunks.append(chunk)
+
+        workers = max(1, max_workers or pool_size())
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for _ in range(workers):
+                pool.submit(_worker)
+            try:
+                for parts_seen, part in enumerate(parts, start=1):
+                    if failed.is_set():
+                        break
+                    new_chunks = chunker.feed(part)
+                    if new_chunks:
+                        _check_projection(parts_seen)
+                    _emit(new_chunks)
+                if not failed.is_set():
+                    _emit(chunker.finish())
+            except Exception:
+                failed.set()
+                raise
+            finally:
+                for _ in range(workers):
+                    work.put(None)
+
+        if errors:
+            raise errors[0]
+        return chunks, [mapped[(i, chunk_hash(c))] for i, c in enumerate(chunks)]
+
+    def map_chunks(self, chunks: list[str], max_workers: int | None = None) -> list[str]:
         total = len(chunks)
         results: list[tuple[int, str]] = []
+        self._reset_hedges()
 
         def _map_one(idx: int, chunk: str) -> tuple[int, str]:
             logger.info("Mapping chunk %d/%d", idx + 1, total)
-            return idx, self.llm.complete(MAP_SYSTEM_PROMPT, chunk, settings.map_model)
+            return idx, self._map_one(chunk)
 
-        with ThreadPoolExecutor(max_workers=min(max_workers, total)) as pool:
+        workers = max(1, min(max_workers or pool_size(), total))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
             futures = {pool.submit(_map_one, i, c): i for i, c in enumerate(chunks)}
             for future in as_completed(futures):
                 results.append(future.result())
@@ -166,43 +400,156 @@ class GeneratorService:
         results.sort(key=lambda x: x[0])
         return [text for _, text in results]
 
+    def _map_one(self, chunk: str) -> str:
+        """Map summary of one chunk, hedged when ``map_hedging`` is on."""
+        model = settings.map_model
+
+        def _map(llm: BaseLLMProvider, model: str) -> str:
+            # Labelled in the thread that makes the call (hedges run on the
+            # hedger's pool).
+            with call_kind("map", settings.map_concurrency):
+                return llm.complete(MAP_SYSTEM_PROMPT, chunk, model)
+
+        if not settings.map_hedging:
+            return _map(self.llm, model)
+
+        backup_llm = self.hedge_llm or self.llm
+        backup_model = settings.hedge_model or model
+        return get_hedger().call(
+            model,
+            lambda: _map(self.llm, model),
+            lambda: _map(backup_llm, backup_model),
+            tally=self.last_map_hedges,
+        )
+
+    def _reset_hedges(self) -> None:
+        self.last_map_hedges = (
+            {"requests": 0, "fired": 0, "won": 0, "denied": 0} if settings.map_hedging else None
+        )
+
+    def merge_summaries(self, groups: list[str], max_workers: int | None = None) -> list[str]:
+        """One tree-reduce level: merge each joined group of summaries."""
+        total = len(groups)
+
+        def _merge_one(idx: int, group: str) -> str:
+            logger.info("Merging summary group %d/%d", idx + 1, total)
+            with call_kind("merge", settings.map_concurrency):
+                return self.llm.complete(MERGE_SYSTEM_PROMPT, group, settings.map_model)
+
+        workers = max(1, min(max_workers or pool_size(), total))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(_merge_one, range(total), groups))
+
+    def collapse_summaries(
+        self,
+        summaries: list[str],
+        merge: Callable[[int, list[str]], list[str]] | None = None,
+    ) -> list[str]:
+        """Merge summaries level by level until they fit the reduce budget.
+
+        Each level joins ``reduce_fan_in`` neighbouring summaries and merges
+        the groups in parallel (a group of one is kept unchanged); ``merge(level, groups)`` may serve groups
+        from storage.  Every channel prompt then receives the collapsed text,
+        so the merge cost is paid once rather than in each channel's input.
+        """
+        budget = settings.reduce_token_budget
+        fan_in = max(2, settings.reduce_fan_in)
+
+        level = 0
+        while (
+            budget
+            and len(summaries) > 1
+            and len(self._enc.encode(SUMMARY_SEPARATOR.join(summaries))) > budget
+        ):
+            level += 1
+            groups = [summaries[i:i + fan_in] for i in range(0, len(summaries), fan_in)]
+            logger.info(
+                "Tree reduce level %d: %d summaries -> %d", level, len(summaries), len(groups)
+            )
+            # A trailing group of one summary is carried up as it is.
+            to_merge = [SUMMARY_SEPARATOR.join(g) for g in groups if len(g) > 1]
+            merged = iter(merge(level, to_merge) if merge else self.merge_summaries(to_merge))
+            summaries = [next(merged) if len(g) > 1 else g[0] for g in groups]
+        return summaries
+
     def reduce(
         self,
         summaries: list[str],
         validation_report: dict | None = None,
         previous_texts: dict | None = None,
         channels: list[str] | None = None,
+        on_delta: Callable[[str, str], None] | None = None,
     ) -> dict:
-        combined = "\n\n---\n\n".join(summaries)
+        """Generate the channel texts from the (collapsed) map summaries.
+
+        With ``on_delta`` the text channels are streamed and every piece is
+        passed on as ``on_delta(channel_key, text)`` while it is generated.
+        """
+        combined = SUMMARY_SEPARATOR.join(summaries)
         target_keys = set(channels) if channels else {k for k, *_ in CHANNEL_DEFS}
+        shared_prefix = settings.reduce_prompt_layout == "shared_prefix"
 
         tasks: list[tuple[str, str, str, bool]] = []
         for key, platform, prompt_template, is_json in CHANNEL_DEFS:
             if key not in target_keys:
                 continue
-            system_prompt = prompt_template
+            channel_prompt = prompt_template
             if validation_report and previous_texts:
                 platform_report = validation_report.get(platform, {})
                 prev = previous_texts.get(key, "") or previous_texts.get(platform, "")
-                system_prompt += REVISION_ADDENDUM.format(
+                channel_prompt += REVISION_ADDENDUM.format(
                     report=json.dumps(platform_report, ensure_ascii=False),
                     previous_text=prev,
                 )
-            tasks.append((key, system_prompt, combined, is_json))
+            if shared_prefix:
+                # Identical system message across channels -> one cached prefix.
+                shared = SHARED_SUMMARIES_PROMPT.format(summaries=combined)
+                tasks.append((key, shared, channel_prompt, is_json))
+            else:
+                tasks.append((key, channel_prompt, combined, is_json))
 
         result: dict = {}
+        usage: dict[str, dict | None] = {}
+        # Set once the first request's prompt has been processed: its first
+        # streamed token, or its whole answer when not streaming.
+        prefix_warm = threading.Event()
 
-        def _gen(item: tuple[str, str, str, bool]) -> tuple[str, str | dict]:
+        def _gen(item: tuple[str, str, str, bool]) -> tuple[str, str | dict, dict | None]:
             key, sys_prompt, user_text, is_json = item
-            if is_json:
-                return key, self.llm.complete_json(sys_prompt, user_text, settings.reduce_model)
-            return key, self.llm.complete(sys_prompt, user_text, settings.reduce_model)
+            try:
+                with call_kind("reduce", len(CHANNEL_DEFS)):
+                    if is_json:
+                        value = self.llm.complete_json(sys_prompt, user_text, settings.reduce_model)
+                    elif on_delta is not None:
+                        parts: list[str] = []
+                        for delta in self.llm.complete_stream(
+                            sys_prompt, user_text, settings.reduce_model
+                        ):
+                            prefix_warm.set()
+                            parts.append(delta)
+                            on_delta(key, delta)
+                        value = "".join(parts)
+                    else:
+                        value = self.llm.complete(sys_prompt, user_text, settings.reduce_model)
+            finally:
+                prefix_warm.set()
+            return key, value, pop_usage()
 
-        with ThreadPoolExecutor(max_workers=min(5, len(tasks))) as pool:
-            futures = {pool.submit(_gen, t): t[0] for t in tasks}
+        # In the shared-prefix layout one channel goes first so the provider
+        # has the prefix cached before the others are sent.  A text channel
+        # is preferred: when streaming it releases the rest on its first token.
+        if shared_prefix and len(tasks) > 1:
+            tasks.sort(key=lambda t: t[3])
+        with ThreadPoolExecutor(max_workers=max(1, len(tasks))) as pool:
+            futures = {}
+            for i, t in enumerate(tasks):
+                if i == 1 and shared_prefix:
+                    prefix_warm.wait()
+                futures[pool.submit(_gen, t)] = t[0]
             for future in as_completed(futures):
-                key, value = future.result()
+                key, value, usage[key] = future.result()
                 result[key] = value
 
+        self.last_reduce_usage = _usage_report(usage, settings.reduce_prompt_layout)
         result["reduce_summary_text"] = combined
         return result
@@ -0,0 +1,145 @@
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import lru_cache
+
+from app.core.config import settings
+from app.providers.base_llm import record_cache_hit, served_from_cache
+from app.providers.concurrency_limiter import pool_size
+
+logger = logging.getLogger(__name__)
+
+# Recent primary latencies kept per model for the p90.
+LATENCY_WINDOW = 200
+
+
+class Hedger:
+    """Send a duplicate of a slow request; the first answer wins.
+
+    A request still running after the p90 latency of its model (over the
+    last LATENCY_WINDOW primary requests, once ``min_samples`` are known) is
+    sent again via ``backup``.  At most ``budget`` x requests are hedged;
+    counters per model show how often hedges were fired, won and denied.
+
+    Latency is timed from when a primary starts running, not when it is
+    queued, and cache hits are not sampled.  A hedged pair holds one of
+    ``max_hedges`` slots until both requests finish, so the losing request
+    (left to finish in the background and discarded) runs on that capacity
+    and never delays other primaries; with no slot free the hedge is denied.
+    """
+
+    def __init__(
+        self, budget: float, min_samples: int, max_workers: int, max_hedges: int
+    ) -> None:
+        self.budget = budget
+        self.min_samples = max(1, min_samples)
+        # Primaries, plus room for one losing primary per hedge slot.
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers + max_hedges, thread_name_prefix="hedge-primary"
+        )
+        self._hedge_pool = ThreadPoolExecutor(
+            max_workers=max_hedges, thread_name_prefix="hedge-backup"
+        )
+        self._hedge_slots = threading.BoundedSemaphore(max_hedges)
+        self._latencies: dict[str, deque[float]] = defaultdict(
+            lambda: deque(maxlen=LATENCY_WINDOW)
+        )
+        self._counters: dict[str, dict[str, int]] = defaultdict(
+            lambda: {"requests": 0, "fired": 0, "won": 0, "denied": 0}
+        )
+        self._lock = threading.Lock()
+
+    def call(
+        self,
+        model: str,
+        primary: Callable[[], str],
+        backup: Callable[[], str],
+        tally: dict[str, int] | None = None,
+    ) -> str:
+        delay = self.p90(model)
+        self._count(model, "requests", tally)
+
+        def _timed_primary() -> str:
+            record_cache_hit(False)
+            started = time.monotonic()
+            result = primary()
+            if not served_from_cache():
+                self._observe(model, time.monotonic() - started)
+            return result
+
+        first = self._pool.submit(_timed_primary)
+        if delay is None or wait([first], timeout=delay).done:
+            return first.result()
+
+        with self._lock:
+            counters = self._counters[model]
+            allowed = counters["fired"] < self.budget * counters["requests"]
+        if not allowed or not self._hedge_slots.acquire(blocking=False):
+            self._count(model, "denied", tally)
+            return first.result()
+
+        self._count(model, "fired", tally)
+        logger.info("Hedging %s request after %.1fs (p90)", model, delay)
+        second = self._hedge_pool.submit(backup)
+        self._release_when_done(first, second)
+        pending: set[Future] = {first, second}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is second:
+                        self._count(model, "won", tally)
+                    return future.result()
+        # Both failed: report the original request's error.
+        return first.result()
+
+    def p90(self, model: str) -> float | None:
+        with self._lock:
+            samples = sorted(self._latencies[model])
+        if len(samples) < self.min_samples:
+            return None
+        return samples[int(0.9 * (len(samples) - 1))]
+
+    def stats(self, model: str) -> dict:
+        with self._lock:
+            return dict(self._counters[model])
+
+    # ------------------------------------------------------------------
+
+    def _release_when_done(self, *futures: Future) -> None:
+        """Give the hedge slot back once every request of the pair is done."""
+        remaining = [len(futures)]
+
+        def _done(_: Future) -> None:
+            with self._lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                self._hedge_slots.release()
+
+        for future in futures:
+            future.add_done_callback(_done)
+
+    def _observe(self, model: str, latency: float) -> None:
+        with self._lock:
+            self._latencies[model].append(latency)
+
+    def _count(self, model: str, name: str, tally: dict[str, int] | None) -> None:
+        with self._lock:
+            self._counters[model][name] += 1
+            if tally is not None:
+                tally[name] = tally.get(name, 0) + 1
+
+
+@lru_cache
+def get_hedger() -> Hedger:
+    """Process-wide hedger; latencies and counters span all tasks in the worker."""
+    return Hedger(
+        budget=settings.map_hedge_budget,
+        min_samples=settings.map_hedge_min_samples,
+        max_workers=pool_size(),
+        max_hedges=settings.map_hedge_max_in_flight,
+    )
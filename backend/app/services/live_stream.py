@@ -0,0 +1,119 @@
+import json
+import logging
+import threading
+import time
+import uuid
+from collections.abc import AsyncIterator
+
+from app.core.config import settings
+from app.core.redis import get_async_redis, get_redis
+
+logger = logging.getLogger(__name__)
+
+# One Redis stream per source holds the reduce output as it is generated.
+# A stream (rather than pub/sub) lets a browser that connects mid-reduce, or
+# reconnects with Last-Event-ID, replay what it missed.
+STREAM_KEY = "source:{source_id}:stream"
+STREAM_TTL_SEC = 3600
+STREAM_MAXLEN = 20_000
+SSE_BLOCK_MS = 15_000  # XREAD wait before sending a keep-alive comment
+
+
+class DeltaPublisher:
+    """Publishes per-channel token deltas of one reduce run to Redis.
+
+    Deltas from the channel threads are buffered and appended as one stream
+    entry per channel at most every ``reduce_stream_flush_sec``, so a
+    five-channel fan-out costs a few XADDs per second rather than one per
+    token.  Redis errors are logged and never fail the reduce.
+    """
+
+    def __init__(self, source_id: uuid.UUID, flush_sec: float | None = None) -> None:
+        self.key = STREAM_KEY.format(source_id=source_id)
+        self.flush_sec = settings.reduce_stream_flush_sec if flush_sec is None else flush_sec
+        self._buffers: dict[str, list[str]] = {}
+        self._last_flush: dict[str, float] = {}
+        self._lock = threading.Lock()
+        # A new run (e.g. regeneration) starts from an empty stream.
+        self._call("delete", self.key)
+        self._publish({"type": "start"})
+
+    def __call__(self, channel: str, delta: str) -> None:
+        with self._lock:
+            self._buffers.setdefault(channel, []).append(delta)
+            now = time.monotonic()
+            if now - self._last_flush.get(channel, float("-inf")) >= self.flush_sec:
+                self._flush_locked(channel, now)
+
+    def close(self) -> None:
+        """Flush every channel and mark the run finished."""
+        with self._lock:
+            for channel in list(self._buffers):
+                self._flush_locked(channel, time.monotonic())
+        self._publish({"type": "end"})
+        self._call("expire", self.key, STREAM_TTL_SEC)
+
+    # ------------------------------------------------------------------
+
+    def _flush_locked(self, channel: str, now: float) -> None:
+        pending = self._buffers.pop(channel, None)
+        self._last_flush[channel] = now
+        if pending:
+            self._publish({"type": "delta", "channel": channel, "text": "".join(pending)})
+
+    def _publish(self, event: dict) -> None:
+        self._call(
+            "xadd",
+            self.key,
+            {"event": json.dumps(event, ensure_ascii=False)},
+            maxlen=STREAM_MAXLEN,
+            approximate=True,
+        )
+
+    def _call(self, method: str, *args, **kwargs) -> None:
+        try:
+            getattr(get_redis(), method)(*args, **kwargs)
+        except Exception:
+            logger.warning("Live stream %s failed for %s", method, self.key, exc_info=True)
+
+
+def format_sse(event: str, data: dict, event_id: str | None = None) -> str:
+    lines = []
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def sse_events(
+    source_id: uuid.UUID, last_event_id: str = "0-0", finished: bool = False
+) -> AsyncIterator[str]:
+    """Server-Sent Events for a source's live stream, from ``last_event_id`` on.
+
+    Replays what is already in the stream, then blocks on XREAD for new
+    entries and ends after the run's ``end`` event.  ``finished`` (the source
+    is in a terminal state) ends at once when there is no stream to replay.
+    """
+    key = STREAM_KEY.format(source_id=source_id)
+    client = get_async_redis()
+    try:
+        if finished and not await client.exists(key):
+            yield format_sse("end", {})
+            return
+        while True:
+            entries = await client.xread({key: last_event_id}, count=100, block=SSE_BLOCK_MS)
+            if not entries:
+                yield ": keep-alive\n\n"
+                continue
+            for _, messages in entries:
+                for entry_id, fields in messages:
+                    last_event_id = entry_id
+                    event = json.loads(fields["event"])
+                    event_type = event.pop("type")
+                    yield format_sse(event_type, event, entry_id)
+                    if event_type == "end":
+                        return
+    except Exception:
+        logger.warning("Live stream read failed for %s", key, exc_info=True)
+        yield format_sse("error", {"message": "live stream unavailable"})
@@ -0,0 +1,84 @@
+import logging
+import threading
+from collections.abc import Iterator
+
+from app.core.config import settings
+from app.services.transcription import BaseTranscriptionService
+
+logger = logging.getLogger(__name__)
+
+# Worker-level model cache: loading a quantized model takes seconds and
+# hundreds of MB, so each worker process keeps it for its whole lifetime.
+_MODELS: dict[tuple[str, str, int], object] = {}
+_MODELS_LOCK = threading.Lock()
+
+
+def _faster_whisper():
+    """The faster_whisper module, or a RuntimeError saying how to install it."""
+    try:
+        import faster_whisper
+    except ImportError as exc:
+        raise RuntimeError(
+            "TRANSCRIPTION_PROVIDER=local_whisper requires faster-whisper: "
+            "pip install faster-whisper"
+        ) from exc
+    return faster_whisper
+
+
+def get_whisper_model():
+    """Return the process-wide faster-whisper model for the current settings."""
+    key = (
+        settings.local_whisper_model,
+        settings.local_whisper_compute_type,
+        settings.local_whisper_cpu_threads,
+    )
+    with _MODELS_LOCK:
+        model = _MODELS.get(key)
+        if model is None:
+            logger.info(
+                "Loading faster-whisper model %s (%s, %d threads)", *key
+            )
+            model = _faster_whisper().WhisperModel(
+                settings.local_whisper_model,
+                device="cpu",
+                compute_type=settings.local_whisper_compute_type,
+                cpu_threads=settings.local_whisper_cpu_threads,
+                download_root=settings.local_whisper_model_dir or None,
+            )
+            _MODELS[key] = model
+    return model
+
+
+class LocalWhisperTranscriptionService(BaseTranscriptionService):
+    """CPU transcription with a quantized Whisper model via faster-whisper.
+
+    No upload and no per-minute cost; long files are decoded in batches of
+    VAD-separated segments instead of being split into size-limited chunks.
+    """
+
+    def transcribe(self, audio_path: str) -> tuple[str, dict]:
+        meta: dict = {}
+        full_text = " ".join(self.iter_texts(audio_path, meta))
+        return full_text, meta
+
+    def iter_texts(self, audio_path: str, meta: dict) -> Iterator[str]:
+        model = get_whisper_model()
+        pipeline = _faster_whisper().BatchedInferencePipeline(model=model)
+        segments, info = pipeline.transcribe(
+            audio_path,
+            batch_size=settings.local_whisper_batch_size,
+        )
+        meta.update(
+            {
+                "language": info.language,
+                "whisper_model": settings.local_whisper_model,
+            }
+        )
+
+        segment_count = 0
+        for segment in segments:
+            segment_count += 1
+            text = segment.text.strip()
+            if text:
+                yield text
+        meta["whisper_segments"] = segment_count
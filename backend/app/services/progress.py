@@ -0,0 +1,167 @@
+import json
+import logging
+import threading
+import time
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.core.redis import get_async_redis, get_redis
+from app.db.models import Source, utcnow
+from app.db.sync_session import sync_engine
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("approved", "needs_review", "failed")
+
+# Columns that change on every progress tick.  Everything else (title,
+# regen_count, error_*) is rare and always goes straight to the row.
+HOT_FIELDS = frozenset({"status", "progress_json"})
+
+PROGRESS_KEY = "source:{source_id}:progress"
+PROGRESS_TTL_SEC = 24 * 3600
+
+# Pub/sub channel with every flushed change, for GET /api/sources/{id}/events.
+EVENTS_CHANNEL = "source:{source_id}:events"
+EVENT_FIELDS = ("status", "progress_json", "error_code", "error_message")
+
+
+class ProgressReporter:
+    """Coalesces stage/percent updates for one source into few row writes.
+
+    Updates are merged into a pending dict and written as a single
+    ``UPDATE sources ... WHERE id = :id`` (no prior SELECT) at most once per
+    ``progress_debounce_sec``; a trailing timer flushes whatever is left so
+    the last state of a long-running step is never held back.  Terminal
+    statuses are written immediately.
+
+    With ``progress_backend="redis"`` non-terminal status/progress go to a
+    Redis key instead and only terminal states touch the ``sources`` row.
+    Either way each flush is published on ``EVENTS_CHANNEL`` for clients
+    that follow the source over Server-Sent Events instead of polling.
+    """
+
+    def __init__(self, source_id: uuid.UUID, debounce_sec: float | None = None) -> None:
+        self.source_id = source_id
+        self.debounce_sec = (
+            settings.progress_debounce_sec if debounce_sec is None else debounce_sec
+        )
+        self.use_redis = settings.progress_backend == "redis"
+        self._pending: dict = {}
+        self._lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+        self._last_flush = 0.0
+
+    def update(self, **fields) -> None:
+        with self._lock:
+            self._pending.update(fields)
+            elapsed = time.monotonic() - self._last_flush
+            if fields.get("status") in TERMINAL_STATUSES or elapsed >= self.debounce_sec:
+                self._flush_locked()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.debounce_sec - elapsed, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        """Flush pending updates; call when the stage finishes or fails."""
+        self.flush()
+
+    # ------------------------------------------------------------------
+
+    def _flush_locked(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        fields, self._pending = self._pending, {}
+        self._last_flush = time.monotonic()
+
+        try:
+            terminal = fields.get("status") in TERMINAL_STATUSES
+            if self.use_redis and not terminal:
+                hot = {k: v for k, v in fields.items() if k in HOT_FIELDS}
+                row = {k: v for k, v in fields.items() if k not in HOT_FIELDS}
+                if hot:
+                    self._write_hot(hot)
+                if row:
+                    self._write_row(row)
+            else:
+                self._write_row(fields)
+                if self.use_redis:
+                    get_redis().delete(PROGRESS_KEY.format(source_id=self.source_id))
+        except Exception:
+            logger.exception("Failed to write progress for source %s", self.source_id)
+            if fields.get("status") in TERMINAL_STATUSES:
+                raise
+        self._publish(fields)
+
+    def _write_row(self, fields: dict) -> None:
+        with sync_engine.begin() as conn:
+            conn.execute(
+                update(Source)
+                .where(Source.id == self.source_id)
+                .values(**fields, updated_at=utcnow())
+            )
+
+    def _publish(self, fields: dict) -> None:
+        event = {k: fields[k] for k in EVENT_FIELDS if k in fields}
+        if not event:
+            return
+        try:
+            get_redis().publish(
+                EVENTS_CHANNEL.format(source_id=self.source_id), json.dumps(event)
+            )
+        except Exception:
+            logger.warning("Could not publish progress for %s", self.source_id, exc_info=True)
+
+    def _write_hot(self, fields: dict) -> None:
+        key = PROGRESS_KEY.format(source_id=self.source_id)
+        client = get_redis()
+        current = json.loads(client.get(key) or "{}")
+        current.update(fields)
+        client.set(key, json.dumps(current), ex=PROGRESS_TTL_SEC)
+
+
+async def get_live_progress(source_id: uuid.UUID) -> dict | None:
+    """Return the hot status/progress_json kept in Redis, if any."""
+    if settings.progress_backend != "redis":
+        return None
+    try:
+        raw = await get_async_redis().get(PROGRESS_KEY.format(source_id=source_id))
+    except Exception:
+        logger.warning("Could not read live progress for %s", source_id, exc_info=True)
+        return None
+    return json.loads(raw) if raw else None
+
+
+@asynccontextmanager
+async def subscribe_progress(
+    source_id: uuid.UUID, idle_sec: float
+) -> AsyncIterator[AsyncIterator[dict | None]]:
+    """Subscribe to a source's progress events.
+
+    Yields an async iterator of published events; it produces ``None`` after
+    ``idle_sec`` without one, so callers can send keep-alives.  Subscribe
+    before reading the current state so no transition falls in between.
+    """
+    pubsub = get_async_redis().pubsub()
+    await pubsub.subscribe(EVENTS_CHANNEL.format(source_id=source_id))
+
+    async def _events() -> AsyncIterator[dict | None]:
+        while True:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=idle_sec)
+            yield json.loads(message["data"]) if message else None
+
+    try:
+        yield _events()
+    finally:
+        await pubsub.aclose()
@@ -0,0 +1,66 @@
+import logging
+
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+LEASE_KEY = "singleflight:{key}"
+
+# Delete the lease only while it is still ours: after expiry another source
+# may have taken it over.
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Extend the lease only while it is still ours.
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('expire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+def acquire_lease(key: str, owner: str, ttl_sec: int) -> str:
+    """Take the in-flight lease for a piece of content; return its holder.
+
+    The holder is ``owner`` when the lease was free.  A Redis error also
+    returns ``owner``, so an outage costs duplicate work rather than a stall.
+    """
+    name = LEASE_KEY.format(key=key)
+    try:
+        client = get_redis()
+        if client.set(name, owner, nx=True, ex=ttl_sec):
+            return owner
+        # The lease may have expired between SET and GET; take it then.
+        return client.get(name) or acquire_lease(key, owner, ttl_sec)
+    except Exception:
+        logger.warning("Could not acquire lease %s", name, exc_info=True)
+        return owner
+
+
+def lease_holder(key: str) -> str | None:
+    """Current holder of the lease for ``key``, or None when it is free."""
+    try:
+        return get_redis().get(LEASE_KEY.format(key=key))
+    except Exception:
+        logger.warning("Could not read lease for %s", key, exc_info=True)
+        return None
+
+
+def renew_lease(key: str, owner: str, ttl_sec: int) -> None:
+    """Reset the lease's TTL if ``owner`` still holds it."""
+    try:
+        get_redis().eval(_RENEW_SCRIPT, 1, LEASE_KEY.format(key=key), owner, ttl_sec)
+    except Exception:
+        logger.warning("Could not renew lease for %s", key, exc_info=True)
+
+
+def release_lease(key: str, owner: str) -> None:
+    try:
+        get_redis().eval(_RELEASE_SCRIPT, 1, LEASE_KEY.format(key=key), owner)
+    except Exception:
+        logger.warning("Could not release lease for %s", key, exc_info=True)
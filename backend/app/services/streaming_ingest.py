@@ -0,0 +1,139 @@
+import glob
+import logging
+import os
+import subprocess
+import sys
+import time
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from app.core.config import settings
+from app.services.transcription import BaseTranscriptionService
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_LIST = "segments.csv"
+STDERR_LOG = "ingest_stderr.log"
+POLL_INTERVAL_SEC = 1.0
+
+
+class StreamingAudioIngest:
+    """Transcribe a video's audio while it is still downloading.
+
+    yt-dlp writes the audio stream to stdout, ffmpeg reads it from a pipe,
+    re-encodes it to mono speech Opus and cuts it with the segment muxer.
+    Each segment is handed to the transcriber as soon as ffmpeg closes it
+    (it is then listed in the live segment list), and the texts are yielded
+    in segment order as they become available.
+
+    Both processes write stderr to a log file in ``work_dir`` rather than a
+    pipe, so a chatty long run cannot block on a full pipe buffer.
+    """
+
+    def __init__(self, transcriber: BaseTranscriptionService) -> None:
+        self.transcriber = transcriber
+
+    def iter_texts(self, url: str, work_dir: str) -> Iterator[str]:
+        os.makedirs(work_dir, exist_ok=True)
+        segment_list = os.path.join(work_dir, SEGMENT_LIST)
+        # A retried stage reuses work_dir: drop the previous attempt's output
+        # so no stale segment is picked up before ffmpeg rewrites the list.
+        stale = glob.glob(os.path.join(work_dir, "segment_*.ogg"))
+        if os.path.exists(segment_list):
+            stale.append(segment_list)
+        for path in stale:
+            os.remove(path)
+        stderr_path = os.path.join(work_dir, STDERR_LOG)
+        stderr_log = open(stderr_path, "wb")  # noqa: SIM115 - closed in finally
+
+        ytdlp = subprocess.Popen(
+            [
+                sys.executable, "-m", "yt_dlp",
+                "--quiet", "--no-warnings", "--no-playlist",
+                "-f", "bestaudio[abr<=96]/bestaudio/best",
+                "-o", "-",
+                url,
+            ],
+            stdout=subprocess.PIPE,
+            stderr=stderr_log,
+        )
+        ffmpeg = subprocess.Popen(
+            [
+                "ffmpeg", "-y", "-loglevel", "error",
+                "-i", "pipe:0",
+                "-vn",
+                "-ac", "1",
+                "-ar", str(settings.audio_sample_rate),
+                "-c:a", "libopus",
+                "-b:a", settings.audio_bitrate,
+                "-application", "voip",
+                "-f", "segment",
+                "-segment_time", str(settings.streaming_segment_sec),
+                "-segment_list", segment_list,
+                "-segment_list_type", "csv",
+                "-reset_timestamps", "1",
+                os.path.join(work_dir, "segment_%03d.ogg"),
+            ],
+            stdin=ytdlp.stdout,
+            stderr=stderr_log,
+        )
+        # Let ffmpeg own the read end so yt-dlp gets SIGPIPE if ffmpeg dies.
+        ytdlp.stdout.close()
+
+        pool = ThreadPoolExecutor(max_workers=max(1, settings.transcription_concurrency))
+        futures: list[Future] = []
+        next_idx = 0
+        try:
+            while True:
+                finished = ffmpeg.poll() is not None
+                for path in self._closed_segments(segment_list, len(futures)):
+                    logger.info("Streaming segment %d ready: %s", len(futures) + 1, path)
+                    futures.append(pool.submit(self._transcribe_segment, path))
+                while next_idx < len(futures) and futures[next_idx].done():
+                    yield futures[next_idx].result()
+                    next_idx += 1
+                if finished:
+                    break
+                time.sleep(POLL_INTERVAL_SEC)
+
+            ytdlp.wait()
+            if ffmpeg.returncode != 0 or ytdlp.returncode != 0:
+                stderr_log.flush()
+                with open(stderr_path, encoding="utf-8", errors="replace") as f:
+                    stderr = f.read()
+                raise ValueError(
+                    f"transcript_unavailable: streaming audio ingest failed: {stderr[-500:]}"
+                )
+            if not futures:
+                raise ValueError("transcript_unavailable: audio stream produced no segments")
+
+            for future in futures[next_idx:]:
+                yield future.result()
+        finally:
+            for proc in (ytdlp, ffmpeg):
+                if proc.poll() is None:
+                    proc.kill()
+                    proc.wait()
+            stderr_log.close()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    # ------------------------------------------------------------------
+
+    def _transcribe_segment(self, path: str) -> str:
+        text, _ = self.transcriber.transcribe(path)
+        return text
+
+    @staticmethod
+    def _closed_segments(segment_list: str, already_seen: int) -> list[str]:
+        """Segments ffmpeg has finished writing, beyond the first ``already_seen``."""
+        if not os.path.exists(segment_list):
+            return []
+        with open(segment_list, encoding="utf-8") as f:
+            content = f.read()
+        # A line is only complete once its newline has been written.
+        lines = [line for line in content.split("\n")[:-1] if line]
+        work_dir = os.path.dirname(segment_list)
+        return [
+            os.path.join(work_dir, line.split(",", 1)[0])
+            for line in lines[already_seen:]
+        ]
@@ -1,7 +1,11 @@
 import logging
 import os
+import re
 import subprocess
+import time
 from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 
 from openai import OpenAI
 
@@ -10,6 +14,11 @@ from app.core.config import settings
 logger = logging.getLogger(__name__)
 
 MAX_CHUNK_BYTES = 20 * 1024 * 1024  # 20 MB
+CHUNK_RETRY_BACKOFF_SEC = 2
+
+SILENCE_NOISE_DB = -30
+SILENCE_MIN_SEC = 0.4
+SILENCE_SNAP_WINDOW = 0.15  # fraction of chunk length to search back for silence
 
 
 class BaseTranscriptionService(ABC):
@@ -18,43 +27,78 @@ class BaseTranscriptionService(ABC):
         """Returns (full_text, meta_dict)."""
         ...
 
+    def iter_texts(self, audio_path: str, meta: dict) -> Iterator[str]:
+        """Yield transcript pieces in order as they become available.
+
+        Backends that transcribe piecewise override this so downstream
+        chunking can start before the whole file is done.  ``meta`` is
+        complete once the iterator is exhausted.
+        """
+        text, text_meta = self.transcribe(audio_path)
+        meta.update(text_meta)
+        yield text
+
 
 class TranscriptionService(BaseTranscriptionService):
     def __init__(self) -> None:
         self.client = OpenAI(api_key=settings.openai_api_key)
 
     def transcribe(self, audio_path: str) -> tuple[str, dict]:
+        meta: dict = {}
+        full_text = " ".join(self.iter_texts(audio_path, meta))
+        return full_text, meta
+
+    def iter_texts(self, audio_path: str, meta: dict) -> Iterator[str]:
         chunks = self._split_if_needed(audio_path)
         if len(chunks) > settings.max_chunks:
             raise ValueError(
                 f"too_many_chunks: {len(chunks)} exceeds {settings.max_chunks} limit"
             )
+        meta["whisper_chunks"] = len(chunks)
 
-        texts: list[str] = []
-        for i, chunk_path in enumerate(chunks):
-            logger.info("Whisper chunk %d/%d: %s", i + 1, len(chunks), chunk_path)
-            with open(chunk_path, "rb") as f:
-                resp = self.client.audio.transcriptions.create(
-                    model=settings.transcription_model, file=f
-                )
-            texts.append(resp.text)
-
-        full_text = " ".join(texts)
-        meta = {"whisper_chunks": len(chunks)}
-        return full_text, meta
+        total = len(chunks)
+        workers = max(1, min(settings.transcription_concurrency, total))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # pool.map yields in chunk order as soon as each next chunk is done.
+            yield from pool.map(
+                lambda item: self._transcribe_chunk(item[0], item[1], total),
+                enumerate(chunks),
+            )
 
     # ------------------------------------------------------------------
 
+    def _transcribe_chunk(self, idx: int, chunk_path: str, total: int) -> str:
+        """Transcribe one chunk, retrying it alone on transient API errors."""
+        max_attempts = settings.transcription_max_retries + 1
+        logger.info("Whisper chunk %d/%d: %s", idx + 1, total, chunk_path)
+        for attempt in range(1, max_attempts + 1):
+            try:
+                with open(chunk_path, "rb") as f:
+                    resp = self.client.audio.transcriptions.create(
+                        model=settings.transcription_model, file=f
+                    )
+                return resp.text
+            except Exception as e:
+                if attempt == max_attempts:
+                    raise
+                logger.warning(
+                    "Whisper chunk %d/%d failed (attempt %d/%d): %s",
+                    idx + 1, total, attempt, max_attempts, e,
+                )
+                time.sleep(CHUNK_RETRY_BACKOFF_SEC * 2 ** (attempt - 1))
+
     def _split_if_needed(self, audio_path: str) -> list[str]:
         file_size = os.path.getsize(audio_path)
         if file_size <= MAX_CHUNK_BYTES:
             return [audio_path]
 
-        return self._split_with_ffmpeg(audio_path)
+        if settings.transcription_split_mode == "seek":
+            return self._split_with_ffmpeg(audio_path)
+        return self._split_with_segmenter(audio_path)
 
     @staticmethod
-    def _split_with_ffmpeg(audio_path: str) -> list[str]:
-        work_dir = os.path.dirname(audio_path)
+    def _probe_chunk_sec(audio_path: str) -> tuple[float, int]:
+        """Return (total duration, chunk length) so chunks stay under MAX_CHUNK_BYTES."""
         file_size = os.path.getsize(audio_path)
 
         probe = subprocess.run(
@@ -70,11 +114,19 @@ class TranscriptionService(BaseTranscriptionService):
         )
         total_sec = float(probe.stdout.strip())
         if total_sec <= 0:
-            return [audio_path]
+            return total_sec, 0
 
         bytes_per_sec = file_size / total_sec
         chunk_sec = int(MAX_CHUNK_BYTES / bytes_per_sec * 0.95)
-        chunk_sec = max(chunk_sec, 10)
+        return total_sec, max(chunk_sec, 10)
+
+    @classmethod
+    def _split_with_ffmpeg(cls, audio_path: str) -> list[str]:
+        """Legacy splitter: one ``ffmpeg -ss -t`` process per chunk."""
+        work_dir = os.path.dirname(audio_path)
+        total_sec, chunk_sec = cls._probe_chunk_sec(audio_path)
+        if total_sec <= 0:
+            return [audio_path]
 
         chunks: list[str] = []
         start = 0
@@ -99,3 +151,151 @@ class TranscriptionService(BaseTranscriptionService):
             idx += 1
 
         return chunks if chunks else [audio_path]
+
+    @classmethod
+    def _split_with_segmenter(cls, audio_path: str) -> list[str]:
+        """Split in a single ffmpeg pass with the segment muxer.
+
+        Cut points are snapped back to the nearest detected silence so words
+        are not cut mid-stream; only a short window before each cut is
+        decoded to find it.
+        """
+        work_dir = os.path.dirname(audio_path)
+        total_sec, chunk_sec = cls._probe_chunk_sec(audio_path)
+        if total_sec <= 0:
+            return [audio_path]
+
+        def silences_between(start: float, end: float) -> list[tuple[float, float]]:
+            if not settings.transcription_snap_to_silence:
+                return []
+            return cls._detect_silences(audio_path, start, end)
+
+        boundaries = snap_boundaries(total_sec, chunk_sec, silences_between)
+        if not boundaries:
+            return [audio_path]
+
+        ext = os.path.splitext(audio_path)[1] or ".mp3"
+        pattern = os.path.join(work_dir, f"chunk_%03d{ext}")
+        subprocess.run(
+            [
+                "ffmpeg", "-y",
+                "-i", audio_path,
+                "-f", "segment",
+                "-segment_times", ",".join(f"{t:.3f}" for t in boundaries),
+                "-reset_timestamps", "1",
+                "-c", "copy",
+                "-loglevel", "error",
+                pattern,
+            ],
+            check=True,
+        )
+
+        chunks: list[str] = []
+        for idx in range(len(boundaries) + 1):
+            out = pattern % idx
+            if os.path.exists(out) and os.path.getsize(out) > 0:
+                chunks.append(out)
+        return chunks if chunks else [audio_path]
+
+    @staticmethod
+    def _detect_silences(audio_path: str, start: float, end: float) -> list[tuple[float, float]]:
+        """Return (start, end) of silent stretches between ``start`` and ``end``
+        via ffmpeg silencedetect.  Only that window is decoded."""
+        proc = subprocess.run(
+            [
+                "ffmpeg", "-hide_banner", "-nostats",
+                "-ss", f"{start:.3f}",
+                "-t", f"{end - start:.3f}",
+                "-i", audio_path,
+                "-af", f"silencedetect=noise={SILENCE_NOISE_DB}dB:d={SILENCE_MIN_SEC}",
+                "-f", "null", "-",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        # Input seeking restarts timestamps at zero.
+        return [(s + start, e + start) for s, e in parse_silencedetect(proc.stderr)]
+
+
+def normalize_speech_audio(audio_path: str) -> tuple[str, dict]:
+    """Re-encode audio to low-bitrate mono Opus for speech recognition.
+
+    Whisper gains nothing from stereo or high sample rates, so one ffmpeg
+    pass to 16 kHz mono Opus (in an .ogg container, which the API accepts)
+    cuts upload size and the number of chunks several times over.
+
+    Returns (path, meta) where meta records the size and time of the pass.
+    """
+    out = os.path.join(os.path.dirname(audio_path), "speech.ogg")
+    raw_bytes = os.path.getsize(audio_path)
+    t0 = time.monotonic()
+    subprocess.run(
+        [
+            "ffmpeg", "-y",
+            "-i", audio_path,
+            "-vn",
+            "-ac", "1",
+            "-ar", str(settings.audio_sample_rate),
+            "-c:a", "libopus",
+            "-b:a", settings.audio_bitrate,
+            "-application", "voip",
+            "-loglevel", "error",
+            out,
+        ],
+        check=True,
+    )
+    elapsed = time.monotonic() - t0
+    out_bytes = os.path.getsize(out)
+    logger.info(
+        "Normalized audio %s: %.1f MB -> %.1f MB in %.1fs",
+        audio_path, raw_bytes / 1024 / 1024, out_bytes / 1024 / 1024, elapsed,
+    )
+    meta = {
+        "audio_bytes_raw": raw_bytes,
+        "audio_bytes": out_bytes,
+        "audio_normalize_sec": round(elapsed, 2),
+    }
+    return out, meta
+
+
+_SILENCE_START_RE = re.compile(r"silence_start:\s*(-?[\d.]+)")
+_SILENCE_END_RE = re.compile(r"silence_end:\s*(-?[\d.]+)")
+
+
+def parse_silencedetect(output: str) -> list[tuple[float, float]]:
+    silences: list[tuple[float, float]] = []
+    start: float | None = None
+    for line in output.splitlines():
+        if m := _SILENCE_START_RE.search(line):
+            start = max(float(m.group(1)), 0.0)
+        elif (m := _SILENCE_END_RE.search(line)) and start is not None:
+            silences.append((start, float(m.group(1))))
+            start = None
+    return silences
+
+
+def snap_boundaries(
+    total_sec: float,
+    chunk_sec: int,
+    silences_between: Callable[[float, float], list[tuple[float, float]]],
+    window: float = SILENCE_SNAP_WINDOW,
+) -> list[float]:
+    """Cut points every ``chunk_sec`` seconds, each moved back to the middle
+    of the latest silence within ``window * chunk_sec`` before it.
+
+    ``silences_between(start, end)`` is asked only for the window before each
+    planned cut, so just those stretches of audio need to be scanned.
+    Snapping only ever shortens a chunk, so it stays under the size limit.
+    """
+    boundaries: list[float] = []
+    prev = 0.0
+    while prev + chunk_sec < total_sec:
+        target = prev + chunk_sec
+        earliest = max(prev, target - window * chunk_sec)
+        midpoints = sorted((start + end) / 2 for start, end in silences_between(earliest, target))
+        candidates = [m for m in midpoints if earliest <= m <= target and m > prev]
+        cut = candidates[-1] if candidates else target
+        boundaries.append(cut)
+        prev = cut
+    return boundaries
@@ -0,0 +1,24 @@
+import importlib
+
+from app.core.config import settings
+from app.services.transcription import BaseTranscriptionService
+
+_TRANSCRIBERS = {
+    "openai": "app.services.transcription.TranscriptionService",
+    "local_whisper": "app.services.local_transcription.LocalWhisperTranscriptionService",
+}
+
+
+def get_transcription_service() -> BaseTranscriptionService:
+    provider_key = settings.transcription_provider
+    dotted = _TRANSCRIBERS.get(provider_key)
+    if dotted is None:
+        raise ValueError(
+            f"Unknown TRANSCRIPTION_PROVIDER={provider_key!r}. "
+            f"Supported: {', '.join(_TRANSCRIBERS)}"
+        )
+    module_path, class_name = dotted.rsplit(".", 1)
+
+    module = importlib.import_module(module_path)
+    cls = getattr(module, class_name)
+    return cls()
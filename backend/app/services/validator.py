@@ -4,6 +4,7 @@ import tiktoken
 
 from app.core.config import settings
 from app.providers.base_llm import BaseLLMProvider
+from app.providers.concurrency_limiter import call_kind
 from app.services.generator import PAYLOAD_KEY_TO_PLATFORM, PLATFORM_TO_PAYLOAD_KEY
 
 logger = logging.getLogger(__name__)
@@ -95,11 +96,12 @@ class ValidatorService:
             for platform, text in platforms_to_check.items():
                 user_prompt += f"=== {platform} ===\n{text}\n\n"
 
-            result = self.llm.complete_json(
-                VALIDATOR_SYSTEM_PROMPT,
-                user_prompt,
-                settings.validation_model,
-            )
+            with call_kind("validate"):
+                result = self.llm.complete_json(
+                    VALIDATOR_SYSTEM_PROMPT,
+                    user_prompt,
+                    settings.validation_model,
+                )
 
             for platform in platforms_to_check.keys():
                 platform_result = result.get(platform, {"checks": [{"name": "error", "passed": False, "details": "Validation failed to return result for this platform"}]})
@@ -1,14 +1,32 @@
+import glob
+import json
 import logging
 import os
 import re
 from abc import ABC, abstractmethod
 
 from app.core.config import settings
+from app.core.redis import get_redis
+from app.services.transcription import normalize_speech_audio
 
 logger = logging.getLogger(__name__)
 
 YT_ID_RE = re.compile(r"(?:v=|youtu\.be/)([\w\-]{11})")
 
+META_CACHE_KEY = "yt_meta:{yt_id}"
+
+# Large parts of the info dict that none of our steps read.  Caption tracks
+# are reduced to a flag before they are dropped.
+_UNUSED_INFO_KEYS = (
+    "subtitles",
+    "automatic_captions",
+    "thumbnails",
+    "heatmap",
+    "chapters",
+    "requested_formats",
+    "requested_downloads",
+)
+
 
 class BaseYouTubeService(ABC):
     @abstractmethod
@@ -17,6 +35,7 @@ class BaseYouTubeService(ABC):
         Returns one of:
           {"source": "captions", "text": str, "meta": dict}
           {"source": "whisper",  "audio_path": str, "meta": dict}
+          {"source": "whisper_stream", "stream_url": str, "meta": dict}
         """
         ...
 
@@ -30,108 +49,224 @@ class YouTubeService(BaseYouTubeService):
 
     def extract(self, url: str, video_id_db: str) -> dict:
         yt_id = self._extract_video_id(url)
+        info = self._probe(url, yt_id)
 
-        text, meta = self._try_captions(yt_id, url)
+        text, meta = self._try_captions(yt_id, info)
         if text:
             return {"source": "captions", "text": text, "meta": meta}
 
-        return self._download_audio(url, yt_id, video_id_db)
+        if settings.streaming_ingest and info is not None:
+            result = self._stream_audio(url, info)
+        else:
+            result = self._download_audio(url, yt_id, video_id_db, info)
+        result["meta"]["caption_choice"] = meta.get("caption_choice")
+        return result
 
     # ------------------------------------------------------------------
 
-    def _fetch_title(self, url: str) -> str | None:
+    def _probe(self, url: str, yt_id: str) -> dict | None:
+        """Fetch the yt-dlp info dict once per video, cached by video ID.
+
+        The same dict serves the title, caption availability, duration
+        gating and format selection for the audio download.
+        """
+        cache_key = META_CACHE_KEY.format(yt_id=yt_id)
+        try:
+            cached = get_redis().get(cache_key)
+            if cached:
+                logger.info("Using cached yt-dlp metadata for %s", yt_id)
+                return json.loads(cached)
+        except Exception:
+            logger.warning("Metadata cache read failed for %s", yt_id, exc_info=True)
+
         try:
             import yt_dlp
 
             with yt_dlp.YoutubeDL({"quiet": True, "no_warnings": True, "skip_download": True}) as ydl:
-                info = ydl.extract_info(url, download=False)
-                return info.get("title")
+                info = ydl.sanitize_info(ydl.extract_info(url, download=False))
         except Exception as e:
-            logger.warning("Could not fetch title: %s", e)
+            logger.warning("Could not probe video metadata: %s", e)
             return None
 
-    def _try_captions(self, yt_id: str, url: str) -> tuple[str | None, dict]:
-        title = self._fetch_title(url)
+        info["_has_captions"] = bool(info.get("subtitles") or info.get("automatic_captions"))
+        for key in _UNUSED_INFO_KEYS:
+            info.pop(key, None)
 
         try:
-            from youtube_transcript_api import YouTubeTranscriptApi
-
-            entries = YouTubeTranscriptApi.get_transcript(
-                yt_id, languages=["ru", "en"]
-            )
-            text = " ".join(e["text"] for e in entries)
-            meta = {"language": "ru/en", "source": "captions"}
-            if title:
-                meta["title"] = title
-            return text, meta
+            get_redis().set(cache_key, json.dumps(info), ex=settings.youtube_meta_ttl_sec)
         except Exception:
-            pass
+            logger.warning("Metadata cache write failed for %s", yt_id, exc_info=True)
+        return info
+
+    def _try_captions(self, yt_id: str, info: dict | None) -> tuple[str | None, dict]:
+        """List the caption tracks once and fetch the best one.
+
+        ``meta["caption_choice"]`` records which track was used, or why none
+        was, so the share of videos falling through to Whisper is measurable.
+        """
+        title = info.get("title") if info else None
+        meta = {}
+        if title:
+            meta["title"] = title
+
+        if info is not None and not info.get("_has_captions"):
+            logger.info("No caption tracks listed for %s", yt_id)
+            meta["caption_choice"] = {"kind": "none", "reason": "no_tracks"}
+            return None, meta
 
         try:
             from youtube_transcript_api import YouTubeTranscriptApi
 
-            entries = YouTubeTranscriptApi.get_transcript(yt_id)
-            text = " ".join(e["text"] for e in entries)
-            meta = {"language": "auto", "source": "captions"}
-            if title:
-                meta["title"] = title
-            return text, meta
+            tracks = list(YouTubeTranscriptApi().list(yt_id))
+            track, choice = choose_caption_track(tracks, settings.caption_languages)
+            if track is None:
+                logger.info("No usable caption track for %s", yt_id)
+                meta["caption_choice"] = {"kind": "none", "reason": "no_usable_track"}
+                return None, meta
+            text = " ".join(snippet.text for snippet in track.fetch())
         except Exception as e:
             logger.warning("Captions unavailable for %s: %s", yt_id, e)
-            meta = {}
-            if title:
-                meta["title"] = title
+            meta["caption_choice"] = {"kind": "none", "reason": type(e).__name__}
             return None, meta
 
-    def _download_audio(self, url: str, yt_id: str, video_id_db: str) -> dict:
+        logger.info("Using %s captions (%s) for %s", choice["kind"], choice["language"], yt_id)
+        meta.update(
+            {"language": choice["language"], "source": "captions", "caption_choice": choice}
+        )
+        return text, meta
+
+    def _stream_audio(self, url: str, info: dict) -> dict:
+        """Defer the download to StreamingAudioIngest in the transcribe stage."""
+        _check_duration_limit(info)
+        meta = {
+            "language": info.get("language") or "unknown",
+            "duration_sec": info.get("duration", 0),
+            "source": "whisper",
+            "title": info.get("title", ""),
+        }
+        return {"source": "whisper_stream", "stream_url": url, "meta": meta}
+
+    def _download_audio(
+        self, url: str, yt_id: str, video_id_db: str, info: dict | None = None
+    ) -> dict:
         import yt_dlp
 
         work_dir = os.path.join(settings.tmp_dir, video_id_db)
         os.makedirs(work_dir, exist_ok=True)
 
-        max_dur = settings.max_video_duration
-
         def _check_duration(info, *, incomplete):
-            duration = info.get("duration") or 0
-            if duration > max_dur:
-                return f"video_too_long: duration {duration}s exceeds {max_dur}s limit"
-            return None
+            return _duration_error(info)
+
+        if info is not None:
+            _check_duration_limit(info)
 
         output_tpl = os.path.join(work_dir, "audio.%(ext)s")
-        ydl_opts = {
-            "format": "bestaudio/best",
-            "outtmpl": output_tpl,
-            "match_filter": _check_duration,
-            "postprocessors": [
+        if settings.audio_normalize:
+            # Keep the native stream; normalize_speech_audio does the only transcode.
+            audio_format = "bestaudio[abr<=96]/bestaudio/best"
+            postprocessors = []
+        else:
+            audio_format = "bestaudio/best"
+            postprocessors = [
                 {
                     "key": "FFmpegExtractAudio",
                     "preferredcodec": "mp3",
                     "preferredquality": "5",
                 }
-            ],
+            ]
+        ydl_opts = {
+            "format": audio_format,
+            "outtmpl": output_tpl,
+            "match_filter": _check_duration,
+            "postprocessors": postprocessors,
             "quiet": True,
             "no_warnings": True,
         }
 
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=True)
-            duration = info.get("duration", 0)
+            downloaded = None
+            if info is not None:
+                try:
+                    # Reuse the probed formats instead of re-fetching the page.
+                    downloaded = ydl.process_ie_result(dict(info), download=True)
+                except yt_dlp.utils.DownloadError as e:
+                    logger.warning(
+                        "Download from cached metadata failed for %s, re-probing: %s",
+                        yt_id, e,
+                    )
+            if downloaded is None:
+                downloaded = ydl.extract_info(url, download=True)
+            duration = downloaded.get("duration", 0)
 
         audio_file = os.path.join(work_dir, "audio.mp3")
         if not os.path.exists(audio_file):
-            for ext in ("m4a", "webm", "opus", "ogg"):
-                candidate = os.path.join(work_dir, f"audio.{ext}")
-                if os.path.exists(candidate):
-                    audio_file = candidate
-                    break
-
-        if not os.path.exists(audio_file):
-            raise ValueError("transcript_unavailable: audio download failed")
+            # Without the MP3 postprocessor the native container is kept,
+            # which for the "best" fallback can be mp4 or mkv as well.
+            candidates = sorted(
+                path for path in glob.glob(os.path.join(work_dir, "audio.*"))
+                if not path.endswith((".part", ".ytdl"))
+            )
+            if not candidates:
+                raise ValueError("transcript_unavailable: audio download failed")
+            audio_file = candidates[0]
 
         meta = {
-            "language": info.get("language", "unknown"),
+            "language": downloaded.get("language", "unknown"),
             "duration_sec": duration,
             "source": "whisper",
-            "title": info.get("title", ""),
+            "title": downloaded.get("title", ""),
         }
+        if settings.audio_normalize:
+            audio_file, norm_meta = normalize_speech_audio(audio_file)
+            meta.update(norm_meta)
         return {"source": "whisper", "audio_path": audio_file, "meta": meta}
+
+
+def _duration_error(info: dict) -> str | None:
+    max_dur = settings.max_video_duration
+    duration = info.get("duration") or 0
+    if duration > max_dur:
+        return f"video_too_long: duration {duration}s exceeds {max_dur}s limit"
+    return None
+
+
+def _check_duration_limit(info: dict) -> None:
+    error = _duration_error(info)
+    if error:
+        raise ValueError(error)
+
+
+def choose_caption_track(tracks: list, languages: list[str]) -> tuple[object | None, dict]:
+    """Pick the best caption track from a youtube-transcript-api listing.
+
+    Preference: manual in a preferred language, generated in a preferred
+    language, a track translated into a preferred language, then any track
+    at all (the reduce prompts write Russian regardless of source language).
+    """
+    manual = [t for t in tracks if not t.is_generated]
+    generated = [t for t in tracks if t.is_generated]
+
+    for kind, group in (("manual", manual), ("generated", generated)):
+        for lang in languages:
+            for track in group:
+                if track.language_code == lang:
+                    return track, {"kind": kind, "language": lang}
+
+    for track in manual + generated:
+        if not track.is_translatable:
+            continue
+        available = {t.language_code for t in track.translation_languages}
+        for lang in languages:
+            if lang in available:
+                return track.translate(lang), {
+                    "kind": "translated",
+                    "language": lang,
+                    "from_language": track.language_code,
+                    "generated": track.is_generated,
+                }
+
+    for kind, group in (("manual", manual), ("generated", generated)):
+        if group:
+            return group[0], {"kind": kind, "language": group[0].language_code}
+
+    return None, {"kind": "none"}
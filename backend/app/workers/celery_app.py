@@ -22,6 +22,10 @@ celery_app.conf.update(
     task_track_started=True,
     worker_prefetch_multiplier=1,
     worker_concurrency=2,
+    task_routes={
+        f"app.workers.tasks.{stage}_stage": {"queue": queue}
+        for stage, queue in settings.stage_queues.items()
+    },
 )
 
 celery_app.autodiscover_tasks(["app.workers"])
@@ -1,29 +1,63 @@
+import hashlib
 import logging
+import os
 import uuid
+from collections.abc import Callable, Iterable, Iterator
+from datetime import UTC, datetime
+
+from celery import chain
+from celery.exceptions import Ignore, Retry
 
 from app.core.config import settings
-from app.db.models import GeneratedContent, Source, Transcript, Validation, utcnow
+from app.db.models import (
+    ChunkSummary,
+    GeneratedContent,
+    PipelineCheckpoint,
+    Source,
+    Transcript,
+    Validation,
+)
 from app.db.sync_session import SyncSessionLocal
 from app.providers.factory import get_llm_provider
-from app.services.extractors import get_extractor
-from app.services.generator import PAYLOAD_KEY_TO_PLATFORM, GeneratorService
-from app.services.transcription import TranscriptionService
-from app.services.validator import ValidatorService
+from app.services.extractors import ExtractionResult, get_extractor
+from app.services.extractors.web_extractor import normalize_url
+from app.services.generator import (
+    GENERATOR_PROMPTS_DIGEST,
+    MAP_CHUNK_OVERLAP,
+    MAP_CHUNK_SIZE,
+    MAP_PROMPT_VERSION,
+    MERGE_PROMPT_VERSION,
+    PAYLOAD_KEY_TO_PLATFORM,
+    GeneratorService,
+    chunk_hash,
+)
+from app.services.live_stream import DeltaPublisher
+from app.services.progress import TERMINAL_STATUSES, ProgressReporter
+from app.services.singleflight import (
+    acquire_lease,
+    lease_holder,
+    release_lease,
+    renew_lease,
+)
+from app.services.streaming_ingest import StreamingAudioIngest
+from app.services.transcription_factory import get_transcription_service
+from app.services.validator import VALIDATOR_SYSTEM_PROMPT, ValidatorService
+from app.services.youtube import YT_ID_RE
 from app.workers.celery_app import celery_app
 from app.workers.cleanup import cleanup_source_tmp
 
 logger = logging.getLogger(__name__)
 
+# How often a follower re-checks the leader of its content (see _follow_in_flight).
+SINGLEFLIGHT_RECHECK_SEC = 15
+
+# Label of the placeholder transcript that holds the map summaries of a
+# failed inline-map attempt until the retry completes it (see _save_partial_map).
+PARTIAL_TRANSCRIPT_LABEL = "partial"
 
-def _update_source(session, source_id: uuid.UUID, **kwargs) -> Source:
-    source = session.query(Source).filter(Source.id == source_id).first()
-    if source is None:
-        raise ValueError(f"Source {source_id} not found during update")
-    for k, v in kwargs.items():
-        setattr(source, k, v)
-    source.updated_at = utcnow()
-    session.commit()
-    return source
+
+class _LeaderInFlight(Exception):
+    """Another source is still processing the same content; check back later."""
 
 
 def _classify_error(msg: str) -> str:
@@ -64,6 +98,107 @@ def _merge_validation(old_report: dict, new_report: dict) -> dict:
     return {"overall_verdict": verdict, "report_json": merged}
 
 
+# ---------------------------------------------------------------------------
+# Pipeline stages
+#
+# Each stage is its own Celery task and persists its output as a
+# PipelineCheckpoint.  Stages are linked into a chain by process_source_task,
+# which skips everything that already has a checkpoint, so a retry or a
+# redeploy resumes from the last completed stage.  Stage tasks are routed to
+# queues via settings.stage_queues.
+# ---------------------------------------------------------------------------
+
+PIPELINE_STAGES = ("extract", "transcribe", "chunk", "map", "reduce", "validate")
+
+
+def _run_stage(task, source_id_str: str, stage: str, body) -> None:
+    """Run one stage body with checkpoint skipping, retries and failure handling.
+
+    Transient errors are retried with backoff; ValueErrors (our own classified
+    failures such as too_many_chunks) and exhausted retries mark the source as
+    failed and stop the chain.
+    """
+    source_id = uuid.UUID(source_id_str)
+    session = SyncSessionLocal()
+    progress = ProgressReporter(source_id)
+    source = None
+
+    try:
+        source = session.query(Source).filter(Source.id == source_id).first()
+        if not source:
+            logger.error("Source %s not found", source_id)
+            raise Ignore()
+        if source.status in TERMINAL_STATUSES:
+            logger.info("Source %s is %s, stopping pipeline", source_id, source.status)
+            raise Ignore()
+        if _load_checkpoint(session, source_id, stage) is not None:
+            logger.info("Stage %s already done for %s, skipping", stage, source_id)
+            return
+
+        _renew_singleflight(source)
+        body(session, source, progress)
+
+    except Ignore:
+        raise
+    except _LeaderInFlight:
+        session.rollback()
+        _requeue(task, SINGLEFLIGHT_RECHECK_SEC)
+    except Exception as e:
+        session.rollback()
+        if not isinstance(e, ValueError) and task.request.retries < task.max_retries:
+            logger.warning(
+                "Stage %s failed for source %s (attempt %d), retrying: %s",
+                stage, source_id, task.request.retries + 1, e,
+            )
+            raise task.retry(
+                exc=e,
+                countdown=settings.stage_retry_backoff * 2 ** task.request.retries,
+            )
+
+        logger.exception("Pipeline stage %s failed for source %s", stage, source_id)
+        error_msg = str(e)
+        try:
+            progress.update(
+                status="failed",
+                error_code=_classify_error(error_msg),
+                error_message=error_msg,
+                progress_json={"stage": "failed", "percent": 0},
+            )
+        except Exception:
+            logger.exception("Failed to update source status to failed")
+        if source is not None:
+            _release_singleflight(source)
+        cleanup_source_tmp(source_id_str)
+        raise Ignore()
+    finally:
+        progress.close()
+        session.close()
+
+
+def _requeue(task, countdown: float) -> None:
+    """Send the running stage task again after ``countdown`` seconds, keeping
+    its place in the chain, without using up one of its retries."""
+    sig = task.signature_from_request(countdown=countdown)
+    sig.apply_async()
+    raise Retry(when=countdown, sig=sig)
+
+
+def _stage_task(stage: str):
+    return celery_app.task(
+        bind=True,
+        name=f"app.workers.tasks.{stage}_stage",
+        acks_late=True,
+        reject_on_worker_lost=True,
+        max_retries=settings.stage_max_retries,
+    )
+
+
+def build_pipeline(source_id_str: str, completed: set[str]):
+    """Chain the stage tasks that have no checkpoint yet."""
+    pending = [s for s in PIPELINE_STAGES if s not in completed]
+    return chain(*(_STAGE_TASKS[s].si(source_id_str) for s in pending))
+
+
 @celery_app.task(bind=True)
 def process_source_task(self, source_id_str: str) -> None:
     source_id = uuid.UUID(source_id_str)
@@ -74,165 +209,460 @@ def process_source_task(self, source_id_str: str) -> None:
         if not source:
             logger.error("Source %s not found", source_id)
             return
+        completed = _completed_stages(session, source_id)
+    finally:
+        session.close()
 
-        llm = get_llm_provider()
-        transcription_svc = TranscriptionService()
-        generator_svc = GeneratorService(llm)
-        validator_svc = ValidatorService(llm)
+    if completed:
+        logger.info(
+            "Resuming source %s after stages: %s",
+            source_id,
+            ", ".join(s for s in PIPELINE_STAGES if s in completed),
+        )
+    build_pipeline(source_id_str, completed).apply_async()
 
-        extractor = get_extractor(source.source_type)
 
-        # --- Step 1: Extract ------------------------------------------------
-        _update_source(
-            session,
-            source_id,
+@_stage_task("extract")
+def extract_stage(self, source_id_str: str) -> None:
+    def body(session, source: Source, progress: ProgressReporter) -> None:
+        progress.update(
             status="extracting",
             progress_json={"stage": "extracting", "percent": 0},
         )
+        if settings.result_cache_enabled and _clone_cached_result(session, source, progress):
+            return
 
-        # Check for cached transcript (same URL processed before)
+        # Follow a source already processing the same content, else reuse
+        # the transcript of an earlier one: same YouTube URL, or same upload
+        # digest.  Web pages are always fetched again (see below).  Following
+        # comes first so that a leader's transcript is not picked up before
+        # its map summaries exist.
         cached_transcript = None
-        if source.url and source.source_type == "youtube":
-            cached_transcript = (
-                session.query(Transcript)
-                .join(Source, Source.id == Transcript.source_id)
-                .filter(
-                    Source.url == source.url,
-                    Source.id != source_id,
-                )
-                .order_by(Transcript.id.desc())
-                .first()
+        leader_id = _follow_in_flight(session, source)
+        if leader_id is not None:
+            cached_transcript = _prior_transcript(session, source, Source.id == leader_id)
+        elif source.url and source.source_type == "youtube":
+            cached_transcript = _prior_transcript(session, source, Source.url == source.url)
+        elif source.content_digest:
+            cached_transcript = _prior_transcript(
+                session, source, Source.content_digest == source.content_digest
             )
 
+        checkpoint = {"needs_transcription": False}
         if cached_transcript:
-            raw_text = cached_transcript.raw_text
-            meta = cached_transcript.meta_json or {}
-            source_label = cached_transcript.source_label
-            title = meta.get("title") or source.url or ""
-            logger.info("Reusing cached transcript for URL %s", source.url)
+            meta = _reuse_transcript(session, source, cached_transcript)
         else:
-            extract_result = extractor.extract(source)
-            title = extract_result.meta.get("title") or source.url or ""
-            if source.file_path and not extract_result.meta.get("title"):
-                import os
-                title = os.path.splitext(os.path.basename(source.file_path))[0]
+            extractor = get_extractor(source.source_type)
+            transcript_id, stored = _partial_map(session, source.id)
+            extract_result = ExtractionResult(text="")
+            try:
+                if settings.map_overlap:
+                    parts = _chunk_and_map_parts(
+                        session,
+                        source.id,
+                        transcript_id,
+                        extractor.iter_parts(source, extract_result),
+                        extractor.part_separator,
+                        expected_parts=extractor.count_parts(source),
+                        stored=stored,
+                    )
+                    extract_result.text = extractor.part_separator.join(parts)
+                else:
+                    extract_result = extractor.extract(source)
+            except Exception:
+                # A page that cannot be fetched (nothing was extracted) falls
+                # back to the last transcript of the same address, if any.
+                if source.source_type != "web" or extract_result.meta:
+                    raise
+                cached_transcript = _prior_transcript(
+                    session,
+                    source,
+                    Source.content_digest == _url_digest(normalize_url(source.url)),
+                )
+                if cached_transcript is None:
+                    raise
+                logger.warning(
+                    "Fetching %s failed, using the last transcript of the page",
+                    source.url, exc_info=True,
+                )
+                extract_result = None
 
-        _update_source(
-            session,
-            source_id,
+            if extract_result is None:
+                meta = _reuse_transcript(session, source, cached_transcript)
+            else:
+                meta = extract_result.meta
+                if meta.get("final_url"):
+                    source.content_digest = _url_digest(meta["final_url"])
+                    cached_transcript = _prior_transcript(
+                        session, source, Source.content_digest == source.content_digest
+                    )
+                    if settings.map_overlap:
+                        cached_transcript = None  # the fresh text is already mapped
+
+                if extract_result.needs_transcription:
+                    checkpoint = {
+                        "needs_transcription": True,
+                        "audio_path": extract_result.audio_path,
+                        "stream_url": extract_result.stream_url,
+                        "meta": extract_result.meta,
+                    }
+                elif cached_transcript and cached_transcript.raw_text == extract_result.text:
+                    meta = _reuse_transcript(session, source, cached_transcript)
+                else:
+                    session.merge(
+                        Transcript(
+                            id=transcript_id,
+                            source_id=source.id,
+                            source_label=meta.get("source", source.source_type),
+                            raw_text=extract_result.text,
+                            meta_json=meta,
+                        )
+                    )
+                    if cached_transcript:
+                        # The page was edited: keep the fresh text.  Summaries
+                        # are keyed by chunk position and hash, so the map
+                        # stage still reuses those of unchanged chunks.
+                        _copy_summaries(session, cached_transcript.id, transcript_id)
+
+        title = meta.get("title") or source.url or ""
+        if source.file_path and not meta.get("title"):
+            title = os.path.splitext(os.path.basename(source.file_path))[0]
+
+        _save_checkpoint(session, source.id, "extract", checkpoint)
+        progress.update(
             title=title,
             progress_json={"stage": "extracting", "percent": 10},
         )
 
-        # --- Step 2: Transcribe (YouTube whisper only) ----------------------
-        _update_source(
-            session,
-            source_id,
+    _run_stage(self, source_id_str, "extract", body)
+
+
+@_stage_task("transcribe")
+def transcribe_stage(self, source_id_str: str) -> None:
+    def body(session, source: Source, progress: ProgressReporter) -> None:
+        progress.update(
             status="transcribing",
             progress_json={"stage": "transcribing", "percent": 10},
         )
 
-        if not cached_transcript:
-            if extract_result.needs_transcription:
-                raw_text, whisper_meta = transcription_svc.transcribe(
-                    extract_result.audio_path
+        extracted = _load_checkpoint(session, source.id, "extract")
+        if extracted.get("needs_transcription"):
+            meta = dict(extracted["meta"])
+            transcript_id, stored = _partial_map(session, source.id)
+            if extracted.get("stream_url"):
+                parts = _streamed_texts(source, extracted, meta, progress)
+            else:
+                parts = get_transcription_service().iter_texts(
+                    extracted["audio_path"], meta
+                )
+
+            if settings.map_overlap:
+                texts = _chunk_and_map_parts(
+                    session, source.id, transcript_id, parts, " ", stored=stored
                 )
-                meta = {**extract_result.meta, **whisper_meta}
-                source_label = "whisper"
             else:
-                raw_text = extract_result.text
-                meta = extract_result.meta
-                source_label = meta.get("source", source.source_type)
+                texts = list(parts)
+            session.merge(
+                Transcript(
+                    id=transcript_id,
+                    source_id=source.id,
+                    source_label="whisper",
+                    raw_text=" ".join(texts),
+                    meta_json=meta,
+                )
+            )
+
+        _save_checkpoint(session, source.id, "transcribe", {})
+        progress.update(
+            progress_json={"stage": "transcribing", "percent": 30},
+        )
+
+    _run_stage(self, source_id_str, "transcribe", body)
+
+
+def _streamed_texts(
+    source: Source, extracted: dict, meta: dict, progress: ProgressReporter
+) -> Iterator[str]:
+    """Transcribe while downloading, reporting progress per closed segment."""
+    ingest = StreamingAudioIngest(get_transcription_service())
+    work_dir = os.path.join(settings.tmp_dir, str(source.id))
+    duration = meta.get("duration_sec") or 0
+
+    count = 0
+    for text in ingest.iter_texts(extracted["stream_url"], work_dir):
+        count += 1
+        yield text
+        if duration:
+            done = min(1.0, count * settings.streaming_segment_sec / duration)
+            progress.update(
+                progress_json={"stage": "transcribing", "percent": 10 + int(19 * done)}
+            )
+    meta.update({"whisper_chunks": count, "streamed": True})
+
+
+def _chunk_and_map_parts(
+    session,
+    source_id: uuid.UUID,
+    transcript_id: uuid.UUID,
+    parts: Iterable[str],
+    separator: str,
+    expected_parts: int | None = None,
+    stored: dict[tuple[int, str], str] | None = None,
+) -> list[str]:
+    """Chunk and map text while it is still being produced.
+
+    Adds the map summaries and the chunk and map checkpoints to the session;
+    the caller merges the transcript row with ``transcript_id`` and commits
+    it all with its own stage checkpoint, so the chunk and map stages are
+    skipped.  Chunks in ``stored`` (see _partial_map) are not mapped again.
+    If the task fails partway, the summaries finished so far are saved
+    right away for the retry.  Returns the consumed parts.
+    """
+    consumed: list[str] = []
+    stored = stored or {}
+    mapped = dict(stored)
+
+    def _collect() -> Iterator[str]:
+        for part in parts:
+            consumed.append(part)
+            yield part
+
+    generator_svc = _map_generator()
+    try:
+        chunks, summaries = generator_svc.map_stream(
+            _collect(),
+            separator=separator,
+            max_chunks=settings.max_chunks,
+            expected_parts=expected_parts,
+            mapped=mapped,
+        )
+    except Exception:
+        new = {key: summary for key, summary in mapped.items() if key not in stored}
+        if new:
+            _save_partial_map(source_id, transcript_id, separator.join(consumed), new)
+        raise
+    if not chunks:
+        # Nothing to map; let the chunk and map stages handle the empty text.
+        return consumed
 
-        transcript_row = Transcript(
+    for i, (chunk, summary) in enumerate(zip(chunks, summaries)):
+        if (i, chunk_hash(chunk)) in stored:
+            continue
+        session.add(
+            ChunkSummary(
+                transcript_id=transcript_id,
+                chunk_index=i,
+                chunk_hash=chunk_hash(chunk),
+                map_model=settings.map_model,
+                prompt_version=MAP_PROMPT_VERSION,
+                summary=summary,
+            )
+        )
+    session.add(
+        PipelineCheckpoint(source_id=source_id, stage="chunk", payload={"chunks": chunks})
+    )
+    session.add(
+        PipelineCheckpoint(
             source_id=source_id,
-            source_label=source_label,
-            raw_text=raw_text,
-            meta_json=meta,
+            stage="map",
+            payload=_map_checkpoint(len(chunks), generator_svc),
         )
-        session.add(transcript_row)
-        session.commit()
-        _update_source(
-            session,
-            source_id,
-            progress_json={"stage": "transcribing", "percent": 30},
+    )
+    return consumed
+
+
+def _partial_map(
+    session, source_id: uuid.UUID
+) -> tuple[uuid.UUID, dict[tuple[int, str], str]]:
+    """Transcript id for a source's text, with the map summaries a failed
+    attempt left behind (see _save_partial_map), else a new id."""
+    partial = (
+        session.query(Transcript)
+        .filter(
+            Transcript.source_id == source_id,
+            Transcript.source_label == PARTIAL_TRANSCRIPT_LABEL,
         )
+        .first()
+    )
+    if partial is None:
+        return uuid.uuid4(), {}
+    rows = (
+        session.query(ChunkSummary)
+        .filter(
+            ChunkSummary.transcript_id == partial.id,
+            ChunkSummary.map_model == settings.map_model,
+            ChunkSummary.prompt_version == MAP_PROMPT_VERSION,
+        )
+        .all()
+    )
+    logger.info("Resuming %d map summaries for source %s", len(rows), source_id)
+    return partial.id, {(r.chunk_index, r.chunk_hash): r.summary for r in rows}
 
-        # --- Step 3: Chunk --------------------------------------------------
-        _update_source(
-            session,
-            source_id,
+
+def _save_partial_map(
+    source_id: uuid.UUID,
+    transcript_id: uuid.UUID,
+    text: str,
+    summaries: dict[tuple[int, str], str],
+) -> None:
+    """Store the summaries of an interrupted inline map in chunk_summaries.
+
+    The stage session is rolled back on failure, so this commits on its own,
+    under a placeholder transcript the next attempt completes (session.merge).
+    """
+    session = SyncSessionLocal()
+    try:
+        session.merge(
+            Transcript(
+                id=transcript_id,
+                source_id=source_id,
+                source_label=PARTIAL_TRANSCRIPT_LABEL,
+                raw_text=text,
+                meta_json={"partial": True},
+            )
+        )
+        for (i, digest), summary in summaries.items():
+            session.add(
+                ChunkSummary(
+                    transcript_id=transcript_id,
+                    chunk_index=i,
+                    chunk_hash=digest,
+                    map_model=settings.map_model,
+                    prompt_version=MAP_PROMPT_VERSION,
+                    summary=summary,
+                )
+            )
+        session.commit()
+        logger.info("Saved %d map summaries of source %s for the retry", len(summaries), source_id)
+    except Exception:
+        session.rollback()
+        logger.warning("Could not save partial map of source %s", source_id, exc_info=True)
+    finally:
+        session.close()
+
+
+def _map_generator() -> GeneratorService:
+    """GeneratorService for map work, hedging to HEDGE_LLM_PROVIDER if set."""
+    hedge_llm = (
+        get_llm_provider(settings.hedge_llm_provider) if settings.hedge_llm_provider else None
+    )
+    return GeneratorService(get_llm_provider(), hedge_llm=hedge_llm)
+
+
+def _map_checkpoint(chunk_count: int, generator_svc: GeneratorService) -> dict:
+    payload: dict = {"chunk_count": chunk_count}
+    if generator_svc.last_map_hedges is not None:
+        payload["hedges"] = generator_svc.last_map_hedges
+    return payload
+
+
+@_stage_task("chunk")
+def chunk_stage(self, source_id_str: str) -> None:
+    def body(session, source: Source, progress: ProgressReporter) -> None:
+        progress.update(
             status="chunking",
             progress_json={"stage": "chunking", "percent": 30},
         )
-        chunks = generator_svc.chunk_transcript(raw_text)
-        if len(chunks) > settings.max_chunks:
-            raise ValueError(
-                f"too_many_chunks: {len(chunks)} exceeds {settings.max_chunks} limit"
-            )
-        _update_source(
-            session,
-            source_id,
+        transcript_row = _get_transcript(session, source.id)
+        chunks = GeneratorService(get_llm_provider()).chunk_transcript(
+            transcript_row.raw_text
+        )
+        _check_chunk_limit(len(chunks))
+        _save_checkpoint(session, source.id, "chunk", {"chunks": chunks})
+        progress.update(
             progress_json={"stage": "chunking", "percent": 35},
         )
 
-        # --- Step 4: Map ----------------------------------------------------
-        _update_source(
-            session,
-            source_id,
+    _run_stage(self, source_id_str, "chunk", body)
+
+
+@_stage_task("map")
+def map_stage(self, source_id_str: str) -> None:
+    def body(session, source: Source, progress: ProgressReporter) -> None:
+        progress.update(
             status="mapping",
             progress_json={"stage": "mapping", "percent": 35},
         )
-        summaries = generator_svc.map_chunks(chunks)
-        _update_source(
+        chunks = _load_checkpoint(session, source.id, "chunk")["chunks"]
+        generator_svc = _map_generator()
+        _map_with_stored_summaries(
             session,
-            source_id,
+            generator_svc,
+            _get_transcript(session, source.id).id,
+            chunks,
+        )
+        _save_checkpoint(
+            session, source.id, "map", _map_checkpoint(len(chunks), generator_svc)
+        )
+        progress.update(
             progress_json={"stage": "mapping", "percent": 60},
         )
 
-        # --- Step 5: Reduce -------------------------------------------------
-        _update_source(
-            session,
-            source_id,
+    _run_stage(self, source_id_str, "map", body)
+
+
+@_stage_task("reduce")
+def reduce_stage(self, source_id_str: str) -> None:
+    def body(session, source: Source, progress: ProgressReporter) -> None:
+        progress.update(
             status="reducing",
             progress_json={"stage": "reducing", "percent": 60},
         )
-        content = generator_svc.reduce(summaries)
+        generator_svc = GeneratorService(get_llm_provider())
+        summaries = _stored_summaries(session, generator_svc, source.id)
+        content = _live_reduce(generator_svc, source.id, summaries)
         reduce_summary = content.pop("reduce_summary_text", "")
-        _save_generated_content(session, source_id, content)
-        _update_source(
+        _save_generated_content(session, source.id, content, _result_cache_key(source))
+        _save_checkpoint(
             session,
-            source_id,
+            source.id,
+            "reduce",
+            {
+                "reduce_summary_text": reduce_summary,
+                "usage": generator_svc.last_reduce_usage,
+            },
+        )
+        progress.update(
             progress_json={"stage": "reducing", "percent": 85},
         )
 
-        # --- Step 6: Validate -----------------------------------------------
-        _update_source(
-            session,
-            source_id,
+    _run_stage(self, source_id_str, "reduce", body)
+
+
+@_stage_task("validate")
+def validate_stage(self, source_id_str: str) -> None:
+    def body(session, source: Source, progress: ProgressReporter) -> None:
+        llm = get_llm_provider()
+        generator_svc = GeneratorService(llm)
+        validator_svc = ValidatorService(llm)
+
+        progress.update(
             status="validating",
             progress_json={"stage": "validating", "percent": 85},
         )
-        validation_source_text = reduce_summary or raw_text
+        content = _get_generated_content(session, source.id)
+        reduce_summary = _load_checkpoint(session, source.id, "reduce")[
+            "reduce_summary_text"
+        ]
+        validation_source_text = (
+            reduce_summary or _get_transcript(session, source.id).raw_text
+        )
         val_result = validator_svc.validate(content, validation_source_text)
-        _save_validation(session, source_id, val_result)
-
-        # --- Step 7: Finalize (with optional partial autofix) ----------------
-        source = session.query(Source).filter(Source.id == source_id).first()
+        _save_validation(session, source.id, val_result)
 
+        # --- Finalize (with optional partial autofix) -----------------------
         if (
             val_result["overall_verdict"] == "needs_revision"
             and source.regen_count == 0
         ):
             failed = _get_failed_channels(val_result["report_json"])
             if failed:
-                _update_source(
-                    session,
-                    source_id,
+                progress.update(
                     status="reducing",
                     regen_count=1,
                     progress_json={"stage": "reducing", "percent": 60},
                 )
+                summaries = _stored_summaries(session, generator_svc, source.id)
                 patched = generator_svc.reduce(
                     summaries,
                     validation_report=val_result["report_json"],
@@ -241,11 +671,9 @@ def process_source_task(self, source_id_str: str) -> None:
                 )
                 patched.pop("reduce_summary_text", None)
                 content = {**content, **patched}
-                _save_generated_content(session, source_id, content)
+                _save_generated_content(session, source.id, content)
 
-                _update_source(
-                    session,
-                    source_id,
+                progress.update(
                     status="validating",
                     progress_json={"stage": "validating", "percent": 85},
                 )
@@ -253,47 +681,39 @@ def process_source_task(self, source_id_str: str) -> None:
                 val_result = _merge_validation(
                     val_result["report_json"], new_val["report_json"]
                 )
-                _save_validation(session, source_id, val_result)
+                _save_validation(session, source.id, val_result)
 
         if val_result["overall_verdict"] == "approved":
-            _update_source(
-                session,
-                source_id,
+            progress.update(
                 status="approved",
                 progress_json={"stage": "done", "percent": 100},
             )
         else:
-            _update_source(
-                session,
-                source_id,
+            progress.update(
                 status="needs_review",
                 progress_json={"stage": "done", "percent": 100},
             )
+        _release_singleflight(source)
+        cleanup_source_tmp(str(source.id))
 
-    except Exception as e:
-        logger.exception("Pipeline failed for source %s", source_id)
-        error_msg = str(e)
-        session.rollback()
-        try:
-            _update_source(
-                session,
-                source_id,
-                status="failed",
-                error_code=_classify_error(error_msg),
-                error_message=error_msg,
-                progress_json={"stage": "failed", "percent": 0},
-            )
-        except Exception:
-            logger.exception("Failed to update source status to failed")
-    finally:
-        cleanup_source_tmp(source_id_str)
-        session.close()
+    _run_stage(self, source_id_str, "validate", body)
+
+
+_STAGE_TASKS = {
+    "extract": extract_stage,
+    "transcribe": transcribe_stage,
+    "chunk": chunk_stage,
+    "map": map_stage,
+    "reduce": reduce_stage,
+    "validate": validate_stage,
+}
 
 
 @celery_app.task(bind=True)
 def regenerate_task(self, source_id_str: str) -> None:
     source_id = uuid.UUID(source_id_str)
     session = SyncSessionLocal()
+    progress = ProgressReporter(source_id)
 
     try:
         source = session.query(Source).filter(Source.id == source_id).first()
@@ -304,13 +724,7 @@ def regenerate_task(self, source_id_str: str) -> None:
         generator_svc = GeneratorService(llm)
         validator_svc = ValidatorService(llm)
 
-        transcript_row = (
-            session.query(Transcript)
-            .filter(Transcript.source_id == source_id)
-            .first()
-        )
-        if not transcript_row:
-            raise ValueError("transcript_unavailable")
+        transcript_row = _get_transcript(session, source_id)
 
         latest_val = (
             session.query(Validation)
@@ -332,29 +746,14 @@ def regenerate_task(self, source_id_str: str) -> None:
             logger.info("No failed channels to regenerate for %s", source_id)
             return
 
-        _update_source(
-            session,
-            source_id,
-            status="chunking",
-            progress_json={"stage": "chunking", "percent": 30},
-        )
-        chunks = generator_svc.chunk_transcript(transcript_row.raw_text)
-
-        _update_source(
-            session,
-            source_id,
-            status="mapping",
-            progress_json={"stage": "mapping", "percent": 35},
-        )
-        summaries = generator_svc.map_chunks(chunks)
-
-        _update_source(
-            session,
-            source_id,
+        progress.update(
             status="reducing",
             progress_json={"stage": "reducing", "percent": 60},
         )
-        patched = generator_svc.reduce(
+        summaries = _stored_summaries(session, generator_svc, source_id)
+        patched = _live_reduce(
+            generator_svc,
+            source_id,
             summaries,
             validation_report=validation_report,
             previous_texts=previous_texts,
@@ -364,9 +763,7 @@ def regenerate_task(self, source_id_str: str) -> None:
         content = {**(previous_texts or {}), **patched}
         _save_generated_content(session, source_id, content)
 
-        _update_source(
-            session,
-            source_id,
+        progress.update(
             status="validating",
             progress_json={"stage": "validating", "percent": 85},
         )
@@ -380,16 +777,12 @@ def regenerate_task(self, source_id_str: str) -> None:
         _save_validation(session, source_id, val_result)
 
         if val_result["overall_verdict"] == "approved":
-            _update_source(
-                session,
-                source_id,
+            progress.update(
                 status="approved",
                 progress_json={"stage": "done", "percent": 100},
             )
         else:
-            _update_source(
-                session,
-                source_id,
+            progress.update(
                 status="needs_review",
                 progress_json={"stage": "done", "percent": 100},
             )
@@ -398,9 +791,7 @@ def regenerate_task(self, source_id_str: str) -> None:
         logger.exception("Regeneration failed for source %s", source_id)
         session.rollback()
         try:
-            _update_source(
-                session,
-                source_id,
+            progress.update(
                 status="failed",
                 error_code=_classify_error(str(e)),
                 error_message=str(e),
@@ -409,6 +800,7 @@ def regenerate_task(self, source_id_str: str) -> None:
         except Exception:
             logger.exception("Failed to update source status to failed")
     finally:
+        progress.close()
         cleanup_source_tmp(source_id_str)
         session.close()
 
@@ -417,7 +809,9 @@ def regenerate_task(self, source_id_str: str) -> None:
 # Helpers
 # ---------------------------------------------------------------------------
 
-def _save_generated_content(session, source_id: uuid.UUID, content: dict) -> None:
+def _save_generated_content(
+    session, source_id: uuid.UUID, content: dict, result_key: str | None = None
+) -> None:
     existing = (
         session.query(GeneratedContent)
         .filter(GeneratedContent.source_id == source_id)
@@ -426,7 +820,11 @@ def _save_generated_content(session, source_id: uuid.UUID, content: dict) -> Non
     if existing:
         existing.content_payload = content
     else:
-        session.add(GeneratedContent(source_id=source_id, content_payload=content))
+        session.add(
+            GeneratedContent(
+                source_id=source_id, content_payload=content, result_key=result_key
+            )
+        )
     session.commit()
 
 
@@ -439,3 +837,369 @@ def _save_validation(session, source_id: uuid.UUID, val_result: dict) -> None:
         )
     )
     session.commit()
+
+
+def _live_reduce(
+    generator_svc: GeneratorService, source_id: uuid.UUID, summaries: list[str], **kwargs
+) -> dict:
+    """Run reduce, streaming the channel texts to the source's live stream."""
+    if not settings.reduce_streaming:
+        return generator_svc.reduce(summaries, **kwargs)
+    publisher = DeltaPublisher(source_id)
+    try:
+        return generator_svc.reduce(summaries, on_delta=publisher, **kwargs)
+    finally:
+        publisher.close()
+
+
+def _check_chunk_limit(count: int) -> None:
+    if count > settings.max_chunks:
+        raise ValueError(
+            f"too_many_chunks: {count} exceeds {settings.max_chunks} limit"
+        )
+
+
+def _get_transcript(session, source_id: uuid.UUID) -> Transcript:
+    transcript_row = (
+        session.query(Transcript)
+        .filter(Transcript.source_id == source_id)
+        .first()
+    )
+    if not transcript_row:
+        raise ValueError("transcript_unavailable")
+    return transcript_row
+
+
+def _get_generated_content(session, source_id: uuid.UUID) -> dict:
+    gen_content = (
+        session.query(GeneratedContent)
+        .filter(GeneratedContent.source_id == source_id)
+        .first()
+    )
+    return dict(gen_content.content_payload) if gen_content else {}
+
+
+def _load_checkpoint(session, source_id: uuid.UUID, stage: str) -> dict | None:
+    checkpoint = (
+        session.query(PipelineCheckpoint)
+        .filter(
+            PipelineCheckpoint.source_id == source_id,
+            PipelineCheckpoint.stage == stage,
+        )
+        .first()
+    )
+    return checkpoint.payload if checkpoint else None
+
+
+def _save_checkpoint(session, source_id: uuid.UUID, stage: str, payload: dict) -> None:
+    """Record a finished stage; commits together with any pending stage output."""
+    session.add(PipelineCheckpoint(source_id=source_id, stage=stage, payload=payload))
+    session.commit()
+
+
+def _completed_stages(session, source_id: uuid.UUID) -> set[str]:
+    rows = (
+        session.query(PipelineCheckpoint.stage)
+        .filter(PipelineCheckpoint.source_id == source_id)
+        .all()
+    )
+    return {stage for (stage,) in rows}
+
+
+def _content_key(source: Source) -> str | None:
+    """What makes two submissions the same work: video ID, normalized page
+    URL or upload digest.  Known before extraction starts."""
+    if source.source_type == "youtube":
+        match = YT_ID_RE.search(source.url or "")
+        return f"youtube:{match.group(1)}" if match else None
+    if source.url:
+        return f"url:{normalize_url(source.url)}"
+    if source.content_digest:
+        return f"sha256:{source.content_digest}"
+    return None
+
+
+def _result_cache_key(source: Source) -> str | None:
+    """Key of a finished payload: content, prompt set, model routing and
+    the transcription, chunking and tree-reduce settings that shape it."""
+    content_key = _content_key(source)
+    if content_key is None:
+        return None
+    parts = [
+        content_key,
+        GENERATOR_PROMPTS_DIGEST,
+        chunk_hash(VALIDATOR_SYSTEM_PROMPT),
+        settings.llm_provider,
+        settings.map_model,
+        settings.reduce_model,
+        settings.validation_model,
+        settings.reduce_prompt_layout,
+        settings.transcription_provider,
+        settings.transcription_model,
+        settings.local_whisper_model,
+        str(MAP_CHUNK_SIZE),
+        str(MAP_CHUNK_OVERLAP),
+        str(settings.reduce_token_budget),
+        str(settings.reduce_fan_in),
+    ]
+    return chunk_hash("\n".join(parts))
+
+
+def _clone_cached_result(session, source: Source, progress: ProgressReporter) -> bool:
+    """Finish ``source`` with the approved result of an identical earlier one.
+
+    Copies the transcript (with its summaries, for regeneration), payload
+    and latest validation, and marks the source approved, which stops the
+    rest of the chain.  Returns False when there is nothing to clone.
+    """
+    key = _result_cache_key(source)
+    if key is None:
+        return False
+    hit = (
+        session.query(GeneratedContent, Source)
+        .join(Source, Source.id == GeneratedContent.source_id)
+        .filter(
+            GeneratedContent.result_key == key,
+            Source.status == "approved",
+            Source.id != source.id,
+        )
+        .order_by(Source.created_at.desc())
+        .first()
+    )
+    if hit is None:
+        return False
+    cached, origin = hit
+    logger.info("Result cache hit: source %s reuses source %s", source.id, origin.id)
+
+    transcript = (
+        session.query(Transcript).filter(Transcript.source_id == origin.id).first()
+    )
+    if transcript is not None:
+        _reuse_transcript(session, source, transcript)
+    session.add(
+        GeneratedContent(
+            source_id=source.id,
+            content_payload=cached.content_payload,
+            result_key=key,
+            cached_from=origin.id,
+        )
+    )
+    validation = (
+        session.query(Validation)
+        .filter(Validation.source_id == origin.id)
+        .order_by(Validation.created_at.desc())
+        .first()
+    )
+    if validation is not None:
+        session.add(
+            Validation(
+                source_id=source.id,
+                overall_verdict=validation.overall_verdict,
+                report_json=validation.report_json,
+            )
+        )
+    _save_checkpoint(session, source.id, "extract", {"cached_from": str(origin.id)})
+    progress.update(
+        title=origin.title,
+        status="approved",
+        progress_json={"stage": "done", "percent": 100},
+    )
+    cleanup_source_tmp(str(source.id))
+    return True
+
+
+def _follow_in_flight(session, source: Source) -> uuid.UUID | None:
+    """Check for another source already processing the same content.
+
+    Takes the single-flight lease for the content.  When another source
+    holds it, returns that leader's ID once it has committed its map
+    summaries and raises _LeaderInFlight while it is still working, so the
+    stage is re-queued rather than holding a worker slot.  Returns None
+    when this source should do the work itself: it is the leader, the
+    leader failed or gave up the lease, or SINGLEFLIGHT_WAIT_SEC have
+    passed since this source was submitted.
+    """
+    key = _content_key(source)
+    if not settings.singleflight_enabled or key is None:
+        return None
+    owner = str(source.id)
+    holder = acquire_lease(key, owner, settings.singleflight_lease_sec)
+    if holder == owner:
+        return None
+
+    leader_id = uuid.UUID(holder)
+    if _load_checkpoint(session, leader_id, "map") is not None:
+        return leader_id
+    status = session.query(Source.status).filter(Source.id == leader_id).scalar()
+    if status is None or status == "failed" or lease_holder(key) != holder:
+        logger.info("In-flight source %s gone, source %s proceeds", leader_id, source.id)
+        return None
+    waited = (datetime.now(UTC) - source.created_at).total_seconds()
+    if waited >= settings.singleflight_wait_sec:
+        logger.info(
+            "Source %s stops waiting for in-flight source %s after %ds",
+            source.id, leader_id, waited,
+        )
+        return None
+    logger.info("Source %s waits for in-flight source %s (%s)", source.id, leader_id, key)
+    raise _LeaderInFlight(leader_id)
+
+
+def _renew_singleflight(source: Source) -> None:
+    """Keep the lease alive while the leader moves through its stages."""
+    key = _content_key(source)
+    if settings.singleflight_enabled and key is not None:
+        renew_lease(key, str(source.id), settings.singleflight_lease_sec)
+
+
+def _release_singleflight(source: Source) -> None:
+    key = _content_key(source)
+    if settings.singleflight_enabled and key is not None:
+        release_lease(key, str(source.id))
+
+
+def _url_digest(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def _prior_transcript(session, source: Source, *criteria) -> Transcript | None:
+    """Transcript of the most recent other source matching ``criteria``."""
+    return (
+        session.query(Transcript)
+        .join(Source, Source.id == Transcript.source_id)
+        .filter(
+            *criteria,
+            Source.id != source.id,
+            Transcript.source_label != PARTIAL_TRANSCRIPT_LABEL,
+        )
+        .order_by(Source.created_at.desc())
+        .first()
+    )
+
+
+def _reuse_transcript(session, source: Source, cached: Transcript) -> dict:
+    """Copy a prior transcript and its stored summaries to ``source``.
+
+    The map and tree-reduce summaries are keyed by chunk position and hash,
+    so with the same text the map stage finds them all and calls no LLM.
+    Returns the transcript meta.
+    """
+    meta = cached.meta_json or {}
+    logger.info(
+        "Reusing transcript of source %s for source %s", cached.source_id, source.id
+    )
+    transcript = Transcript(
+        id=uuid.uuid4(),
+        source_id=source.id,
+        source_label=cached.source_label,
+        raw_text=cached.raw_text,
+        meta_json=meta,
+    )
+    session.add(transcript)
+    _copy_summaries(session, cached.id, transcript.id)
+    return meta
+
+
+def _copy_summaries(session, from_id: uuid.UUID, to_id: uuid.UUID) -> None:
+    """Copy the stored map and tree-reduce summaries of one transcript to another."""
+    rows = (
+        session.query(ChunkSummary)
+        .filter(ChunkSummary.transcript_id == from_id)
+        .all()
+    )
+    for row in rows:
+        session.add(
+            ChunkSummary(
+                transcript_id=to_id,
+                chunk_index=row.chunk_index,
+                chunk_hash=row.chunk_hash,
+                map_model=row.map_model,
+                prompt_version=row.prompt_version,
+                summary=row.summary,
+            )
+        )
+
+
+def _map_with_stored_summaries(
+    session, generator_svc: GeneratorService, transcript_id: uuid.UUID, chunks: list[str]
+) -> list[str]:
+    """Return map summaries for chunks, calling the LLM only for chunks
+    without a stored summary for the current map model and prompt version."""
+    return _with_stored_summaries(
+        session, transcript_id, MAP_PROMPT_VERSION, chunks, generator_svc.map_chunks
+    )
+
+
+def _with_stored_summaries(
+    session,
+    transcript_id: uuid.UUID,
+    prompt_version: str,
+    texts: list[str],
+    summarize: Callable[[list[str]], list[str]],
+) -> list[str]:
+    """Summaries of texts from chunk_summaries, summarizing only the missing ones.
+
+    Rows are keyed by position and content hash, so map output and every
+    tree-reduce level (see MERGE_PROMPT_VERSION) share the table.
+    """
+    hashes = [chunk_hash(t) for t in texts]
+    rows = (
+        session.query(ChunkSummary)
+        .filter(
+            ChunkSummary.transcript_id == transcript_id,
+            ChunkSummary.map_model == settings.map_model,
+            ChunkSummary.prompt_version == prompt_version,
+        )
+        .all()
+    )
+    stored = {(r.chunk_index, r.chunk_hash): r.summary for r in rows}
+    summaries: list[str | None] = [stored.get((i, h)) for i, h in enumerate(hashes)]
+
+    missing = [i for i, summary in enumerate(summaries) if summary is None]
+    if len(missing) < len(texts):
+        logger.info(
+            "Reusing %d/%d stored %s summaries for transcript %s",
+            len(texts) - len(missing), len(texts), prompt_version, transcript_id,
+        )
+    if missing:
+        produced = summarize([texts[i] for i in missing])
+        for i, summary in zip(missing, produced):
+            summaries[i] = summary
+            session.add(
+                ChunkSummary(
+                    transcript_id=transcript_id,
+                    chunk_index=i,
+                    chunk_hash=hashes[i],
+                    map_model=settings.map_model,
+                    prompt_version=prompt_version,
+                    summary=summary,
+                )
+            )
+        session.commit()
+    return summaries
+
+
+def _stored_summaries(
+    session, generator_svc: GeneratorService, source_id: uuid.UUID
+) -> list[str]:
+    """Reduce input for a source: its map summaries, re-mapping only what is
+    missing, tree-merged to fit the reduce budget with stored merges reused."""
+    transcript_row = _get_transcript(session, source_id)
+    chunk_checkpoint = _load_checkpoint(session, source_id, "chunk")
+    if chunk_checkpoint is not None:
+        chunks = chunk_checkpoint["chunks"]
+    else:
+        chunks = generator_svc.chunk_transcript(transcript_row.raw_text)
+    summaries = _map_with_stored_summaries(
+        session, generator_svc, transcript_row.id, chunks
+    )
+    return generator_svc.collapse_summaries(
+        summaries,
+        merge=lambda level, groups: _with_stored_summaries(
+            session,
+            transcript_row.id,
+            MERGE_PROMPT_VERSION,
+            groups,
+            generator_svc.merge_summaries,
+        ),
+    )
@@ -0,0 +1,60 @@
+"""Compare the legacy MP3 q5 transcode with 16 kHz mono Opus normalization.
+
+Usage (from backend/):
+    python -m benchmarks.bench_audio_normalize [path/to/source_audio]
+
+Reports output size, encode time and the number of Whisper uploads
+(chunks of at most MAX_CHUNK_BYTES) each variant would need.
+"""
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from app.services.transcription import MAX_CHUNK_BYTES, normalize_speech_audio
+from benchmarks.bench_audio_split import DURATION_SEC, synthesize
+
+
+def _legacy_mp3(src: str, work_dir: str) -> str:
+    out = os.path.join(work_dir, "legacy.mp3")
+    subprocess.run(
+        ["ffmpeg", "-y", "-loglevel", "error", "-i", src, "-vn", "-q:a", "5", out],
+        check=True,
+    )
+    return out
+
+
+def _report(label: str, path: str, elapsed: float) -> None:
+    size = os.path.getsize(path)
+    uploads = math.ceil(size / MAX_CHUNK_BYTES)
+    print(
+        f"{label:<8} size={size / 1024 / 1024:7.1f} MB "
+        f"encode={elapsed:6.2f}s whisper_uploads={uploads}"
+    )
+
+
+def main() -> None:
+    work_dir = tempfile.mkdtemp(prefix="normalize_bench_")
+    try:
+        if len(sys.argv) > 1:
+            src = sys.argv[1]
+        else:
+            src = os.path.join(work_dir, "source.mp3")
+            print(f"Synthesizing {DURATION_SEC}s test audio ...")
+            synthesize(src)
+
+        t0 = time.monotonic()
+        legacy = _legacy_mp3(src, work_dir)
+        _report("mp3-q5", legacy, time.monotonic() - t0)
+
+        opus, meta = normalize_speech_audio(legacy)
+        _report("opus16k", opus, meta["audio_normalize_sec"])
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
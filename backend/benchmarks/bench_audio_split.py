@@ -0,0 +1,83 @@
+"""Compare the per-chunk ffmpeg loop with the single-pass segmenter.
+
+Usage (from backend/):
+    python -m benchmarks.bench_audio_split [path/to/long.mp3]
+
+Without an argument a 2-hour speech-like MP3 (tone bursts separated by
+short silences) is synthesized with ffmpeg into a temp dir first.
+Reports wall time and child-process CPU time for each split mode; the
+segmenter is run with and without snapping cuts to silence.
+"""
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from app.core.config import settings
+from app.services.transcription import TranscriptionService
+
+DURATION_SEC = 2 * 3600
+
+
+def synthesize(path: str) -> None:
+    # 9s of tone followed by 1s of silence, repeated for DURATION_SEC.
+    subprocess.run(
+        [
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-f", "lavfi",
+            "-i", f"sine=frequency=220:duration={DURATION_SEC}",
+            "-af", "volume='if(lt(mod(t,10),9),1,0)':eval=frame",
+            "-ac", "2", "-ar", "44100", "-q:a", "5",
+            path,
+        ],
+        check=True,
+    )
+
+
+def _run(label: str, split, audio_path: str) -> None:
+    work_dir = tempfile.mkdtemp(prefix=f"split_{label}_")
+    try:
+        src = os.path.join(work_dir, os.path.basename(audio_path))
+        shutil.copy(audio_path, src)
+
+        cpu_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+        t0 = time.perf_counter()
+        chunks = split(src)
+        wall = time.perf_counter() - t0
+        cpu_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+        cpu = (cpu_after.ru_utime - cpu_before.ru_utime) + (
+            cpu_after.ru_stime - cpu_before.ru_stime
+        )
+        print(f"{label:<13} chunks={len(chunks):<3} wall={wall:7.2f}s cpu={cpu:7.2f}s")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main() -> None:
+    if len(sys.argv) > 1:
+        audio_path = sys.argv[1]
+        tmp = None
+    else:
+        tmp = tempfile.mkdtemp(prefix="split_bench_")
+        audio_path = os.path.join(tmp, "audio.mp3")
+        print(f"Synthesizing {DURATION_SEC}s test audio ...")
+        synthesize(audio_path)
+
+    size_mb = os.path.getsize(audio_path) / 1024 / 1024
+    print(f"Input: {audio_path} ({size_mb:.1f} MB)")
+    try:
+        _run("seek", TranscriptionService._split_with_ffmpeg, audio_path)
+        for snap in (False, True):
+            settings.transcription_snap_to_silence = snap
+            label = "segment+snap" if snap else "segment"
+            _run(label, TranscriptionService._split_with_segmenter, audio_path)
+    finally:
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
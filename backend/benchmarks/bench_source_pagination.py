@@ -0,0 +1,100 @@
+"""Compare OFFSET and keyset pagination of the history feed at 1M rows.
+
+Usage (from backend/, against a scratch Postgres database):
+    python -m benchmarks.bench_source_pagination [rows]
+
+Copies the ``sources`` layout into a temporary table, fills it with
+generate_series, adds the (created_at, id) index from migration 006 and
+times, per page depth: the old ``ORDER BY created_at DESC OFFSET n``
+query, the keyset seek, and ``count(*)`` against the pg_class estimate.
+"""
+import sys
+import time
+
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+
+ROWS = 1_000_000
+PAGE = 20
+DEPTHS = (0, 1_000, 100_000, 900_000)
+REPEATS = 5
+
+
+def _time(conn, sql: str, **params) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        conn.execute(text(sql), params).fetchall()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    engine = create_engine(settings.sync_database_url)
+    with engine.connect() as conn:
+        print(f"Filling bench_sources with {rows} rows ...")
+        conn.execute(text("DROP TABLE IF EXISTS bench_sources"))
+        conn.execute(
+            text("CREATE TABLE bench_sources (LIKE sources INCLUDING DEFAULTS)")
+        )
+        conn.execute(
+            text(
+                "INSERT INTO bench_sources (id, source_type, status, regen_count, "
+                "title, created_at, updated_at) "
+                "SELECT gen_random_uuid(), 'youtube', 'approved', 0, 'title ' || g, "
+                "now() - g * interval '1 second', now() "
+                "FROM generate_series(1, :rows) AS g"
+            ),
+            {"rows": rows},
+        )
+        conn.execute(
+            text("CREATE INDEX ix_bench_sources_created_at_id ON bench_sources (created_at, id)")
+        )
+        conn.execute(text("ANALYZE bench_sources"))
+        conn.commit()
+
+        columns = "id, title, source_type, status, created_at"
+        for depth in DEPTHS:
+            if depth >= rows:
+                continue
+            offset_ms = _time(
+                conn,
+                f"SELECT {columns} FROM bench_sources "
+                "ORDER BY created_at DESC OFFSET :offset LIMIT :limit",
+                offset=depth,
+                limit=PAGE,
+            )
+            # The cursor a client holds after paging down to ``depth``.
+            last = conn.execute(
+                text(
+                    "SELECT created_at, id FROM bench_sources "
+                    "ORDER BY created_at DESC, id DESC OFFSET :offset LIMIT 1"
+                ),
+                {"offset": max(depth - 1, 0)},
+            ).one()
+            keyset_ms = _time(
+                conn,
+                f"SELECT {columns} FROM bench_sources "
+                "WHERE (created_at, id) < (:created_at, :id) "
+                "ORDER BY created_at DESC, id DESC LIMIT :limit",
+                created_at=last.created_at,
+                id=last.id,
+                limit=PAGE,
+            )
+            print(f"depth={depth:>7}  offset={offset_ms:8.2f} ms  keyset={keyset_ms:6.2f} ms")
+
+        count_ms = _time(conn, "SELECT count(*) FROM bench_sources")
+        estimate_ms = _time(
+            conn,
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = 'bench_sources'::regclass",
+        )
+        print(f"count(*)={count_ms:8.2f} ms  reltuples={estimate_ms:6.2f} ms")
+
+        conn.execute(text("DROP TABLE bench_sources"))
+        conn.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,8 @@
 import asyncio
 import os
 import uuid
-from collections.abc import AsyncGenerator, Generator
-from unittest.mock import MagicMock
+from collections.abc import AsyncGenerator, Callable, Generator
+from unittest.mock import MagicMock, patch
 
 import pytest
 import pytest_asyncio
@@ -13,8 +13,16 @@ from app.core.config import settings
 from app.core.dependencies import get_async_session
 from app.core.rate_limit import limiter
 from app.db.base import Base
-from app.db.models import GeneratedContent, Source, Transcript, Validation  # noqa: F401
+from app.db.models import (  # noqa: F401
+    ChunkSummary,
+    GeneratedContent,
+    PipelineCheckpoint,
+    Source,
+    Transcript,
+    Validation,
+)
 from app.main import app
+from app.services.generator import GeneratorService, IncrementalChunker
 
 TEST_DB_URL = os.environ.get(
     "TEST_DATABASE_URL",
@@ -81,3 +89,37 @@ def mock_llm() -> MagicMock:
 @pytest.fixture
 def sample_source_id() -> uuid.UUID:
     return uuid.uuid4()
+
+
+class CharEncoding:
+    """Stand-in for a tiktoken encoding: one token per character."""
+
+    def encode(self, text: str) -> list[str]:
+        return list(text)
+
+    def decode(self, tokens: list[str]) -> str:
+        return "".join(tokens)
+
+
+@pytest.fixture
+def char_encoding() -> CharEncoding:
+    return CharEncoding()
+
+
+@pytest.fixture
+def make_generator(char_encoding: CharEncoding) -> Callable[..., GeneratorService]:
+    """Build a GeneratorService around ``llm`` on the one-token-per-character
+    encoding; ``chunk_size`` and ``overlap`` shrink the map_stream windows."""
+
+    def _make(
+        llm, chunk_size: int | None = None, overlap: int | None = None
+    ) -> GeneratorService:
+        with patch("app.services.generator.tiktoken.get_encoding", return_value=char_encoding):
+            svc = GeneratorService(llm)
+        if chunk_size is not None:
+            svc.incremental_chunker = lambda separator=" ": IncrementalChunker(
+                char_encoding, chunk_size, overlap or 0, separator
+            )
+        return svc
+
+    return _make
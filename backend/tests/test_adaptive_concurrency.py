@@ -0,0 +1,144 @@
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.core.config import settings
+from app.providers.adaptive_provider import AdaptiveConcurrencyLLMProvider
+from app.providers.concurrency_limiter import AIMDLimiter, call_kind, get_limiter
+
+
+class RateLimitError(Exception):
+    """Stand-in named like openai.RateLimitError."""
+
+
+def _run(limiter: AIMDLimiter, latency: float, times: int = 1) -> None:
+    clock = [100.0]
+    with patch("app.providers.concurrency_limiter.time.monotonic", side_effect=lambda: clock[0]):
+        for _ in range(times):
+            with limiter.slot():
+                clock[0] += latency
+
+
+def test_additive_increase_while_latency_is_flat():
+    limiter = AIMDLimiter(initial=2, min_limit=1, max_limit=16, tolerance=2.0)
+    _run(limiter, 1.0, times=6)
+    # +1/limit per request: about one per window of `limit` requests.
+    assert 3.5 < limiter.limit < 4.5
+
+
+def test_rate_limit_halves_once_per_episode():
+    limiter = AIMDLimiter(initial=8, min_limit=1, max_limit=16, tolerance=2.0)
+    started = threading.Barrier(2)
+    release = threading.Event()
+
+    def _failing():
+        with pytest.raises(RateLimitError), limiter.slot():
+            started.wait()
+            release.wait()
+            raise RateLimitError()
+
+    threads = [threading.Thread(target=_failing) for _ in range(2)]
+    for t in threads:
+        t.start()
+    release.set()
+    for t in threads:
+        t.join()
+
+    # Both requests were in flight before the first backoff: one decrease.
+    assert limiter.limit == 4
+    assert limiter.in_flight == 0
+
+
+def test_latency_spike_backs_off_and_baseline_ignores_outliers():
+    limiter = AIMDLimiter(initial=8, min_limit=1, max_limit=16, tolerance=2.0)
+    _run(limiter, 1.0)
+    baseline = limiter.baseline
+    limit = limiter.limit
+
+    _run(limiter, 30.0)
+
+    assert limiter.limit == limit * 0.5
+    assert limiter.baseline <= baseline * 1.1
+
+
+def test_other_errors_leave_the_limit_alone():
+    limiter = AIMDLimiter(initial=4, min_limit=1, max_limit=16, tolerance=2.0)
+    with pytest.raises(ValueError), limiter.slot():
+        raise ValueError("bad request")
+    assert limiter.limit == 4
+
+
+def test_requests_beyond_the_limit_wait_for_a_slot():
+    limiter = AIMDLimiter(initial=1, min_limit=1, max_limit=1, tolerance=2.0)
+    order: list[str] = []
+    first_in = threading.Event()
+
+    def _first():
+        with limiter.slot():
+            first_in.set()
+            time.sleep(0.05)
+            order.append("first")
+
+    def _second():
+        first_in.wait()
+        with limiter.slot():
+            order.append("second")
+
+    threads = [threading.Thread(target=_first), threading.Thread(target=_second)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert order == ["first", "second"]
+
+
+def test_call_kinds_of_one_model_get_their_own_limiters():
+    model = "shared-mini-model"
+    assert get_limiter(model, "map", 8).limit == 8
+    reduce = get_limiter(model, "reduce", 5)
+    assert reduce is not get_limiter(model, "map", 8)
+    assert reduce.limit == 5
+    assert get_limiter(model).limit == settings.llm_concurrency_initial
+
+
+def test_provider_uses_the_limiter_of_the_calling_kind():
+    inner = MagicMock()
+    provider = AdaptiveConcurrencyLLMProvider(inner)
+    limiters = {}
+
+    def _get_limiter(model, kind, initial):
+        limiters[kind] = initial
+        return MagicMock()
+
+    with patch("app.providers.adaptive_provider.get_limiter", side_effect=_get_limiter):
+        with call_kind("reduce", 5):
+            provider.complete("s", "u", "m")
+        provider.complete_json("s", "u", "m")
+
+    assert limiters == {"reduce": 5, "default": None}
+
+
+@pytest.mark.parametrize("fan_out", ["map_chunks", "merge_summaries"])
+def test_fan_out_pools_grow_to_the_adaptive_maximum(fan_out, make_generator):
+    calls = 12
+    all_in_flight = threading.Barrier(calls, timeout=5)
+
+    def _complete(system, user, model):
+        all_in_flight.wait()
+        return user
+
+    llm = MagicMock()
+    llm.complete.side_effect = _complete
+
+    svc = make_generator(llm)
+    with (
+        patch.object(settings, "adaptive_concurrency", True),
+        patch.object(settings, "llm_concurrency_max", calls),
+        patch.object(settings, "map_concurrency", 8),
+    ):
+        # Every call waits for all of them: this only returns with 12 in flight.
+        getattr(svc, fan_out)([str(i) for i in range(calls)])
+
+    assert llm.complete.call_count == calls
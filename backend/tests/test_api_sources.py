@@ -88,6 +88,42 @@ async def test_get_source_queued(client: AsyncClient, db_session):
     assert data["source_type"] == "youtube"
 
 
+@pytest.mark.asyncio
+async def test_get_source_not_modified(client: AsyncClient, db_session):
+    source = Source(url="https://www.youtube.com/watch?v=dQw4w9WgXcQ", source_type="youtube")
+    db_session.add(source)
+    await db_session.commit()
+    await db_session.refresh(source)
+
+    first = await client.get(f"/api/sources/{source.id}")
+    etag = first.headers["etag"]
+
+    resp = await client.get(f"/api/sources/{source.id}", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.content == b""
+
+    source.status = "extracting"
+    await db_session.commit()
+    resp = await client.get(f"/api/sources/{source.id}", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["etag"] != etag
+
+
+def test_source_etag_tracks_version_and_live_progress():
+    from datetime import UTC, datetime
+
+    from app.api.sources import _etag_matches, _source_etag
+
+    ts = datetime(2026, 1, 1, tzinfo=UTC)
+    etag = _source_etag(ts, 0, None)
+
+    assert _source_etag(ts, 1, None) != etag
+    assert _source_etag(ts, 0, {"status": "mapping"}) != etag
+    assert _etag_matches(f'W/{etag}, "other"', etag)
+    assert _etag_matches("*", etag)
+    assert not _etag_matches('"other"', etag)
+
+
 @pytest.mark.asyncio
 async def test_regenerate_wrong_status(client: AsyncClient, db_session):
     source = Source(url="https://www.youtube.com/watch?v=dQw4w9WgXcQ", source_type="youtube", status="queued")
@@ -104,3 +140,37 @@ async def test_health(client: AsyncClient):
     resp = await client.get("/api/health")
     assert resp.status_code == 200
     assert resp.json() == {"status": "ok"}
+
+
+@pytest.mark.asyncio
+async def test_list_sources_keyset_pages(client: AsyncClient, db_session):
+    for i in range(5):
+        db_session.add(Source(url=f"https://example.com/{i}", source_type="web"))
+    await db_session.commit()
+
+    first = (await client.get("/api/sources?limit=3&count=exact")).json()
+    assert len(first["items"]) == 3
+    assert first["total"] >= 5
+    assert first["total_is_estimate"] is False
+    assert first["next_cursor"]
+
+    second = (await client.get(f"/api/sources?limit=3&cursor={first['next_cursor']}")).json()
+    assert second["total"] is None
+    seen = {item["source_id"] for item in first["items"]}
+    assert not seen & {item["source_id"] for item in second["items"]}
+
+
+def test_list_cursor_round_trip():
+    from datetime import UTC, datetime
+
+    from fastapi import HTTPException
+
+    from app.api.sources import _decode_cursor, _encode_cursor
+
+    created_at = datetime(2026, 1, 1, 12, 30, 15, 123456, tzinfo=UTC)
+    source_id = uuid.uuid4()
+
+    assert _decode_cursor(_encode_cursor(created_at, source_id)) == (created_at, source_id)
+    with pytest.raises(HTTPException) as exc:
+        _decode_cursor("not-a-cursor")
+    assert exc.value.status_code == 422
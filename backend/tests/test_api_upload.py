@@ -1,9 +1,14 @@
+import hashlib
 import io
 from unittest.mock import patch
 
 import pytest
+from fastapi import HTTPException, UploadFile
 from httpx import AsyncClient
 
+from app.api.sources import READ_CHUNK_SIZE, _save_upload
+from app.core.config import settings
+
 
 @pytest.mark.asyncio
 async def test_upload_pdf_happy_path(client: AsyncClient, db_session):
@@ -39,11 +44,12 @@ async def test_upload_epub_happy_path(client: AsyncClient, db_session):
 
 @pytest.mark.asyncio
 async def test_upload_too_large(client: AsyncClient, db_session):
-    big_content = b"%PDF" + b"x" * (10 * 1024 * 1024)
-    resp = await client.post(
-        "/api/sources/upload",
-        files={"file": ("big.pdf", io.BytesIO(big_content), "application/pdf")},
-    )
+    big_content = b"%PDF" + b"x" * (3 * 1024 * 1024)
+    with patch.object(settings, "max_upload_bytes", 2 * 1024 * 1024):
+        resp = await client.post(
+            "/api/sources/upload",
+            files={"file": ("big.pdf", io.BytesIO(big_content), "application/pdf")},
+        )
     assert resp.status_code == 413
 
 
@@ -79,3 +85,34 @@ async def test_upload_path_traversal(client: AsyncClient, db_session):
         )
 
     assert resp.status_code == 201
+
+
+async def test_save_upload_hashes_while_writing(tmp_path):
+    content = b"%PDF" + bytes(range(256)) * (READ_CHUNK_SIZE // 64)
+    path = tmp_path / "doc.pdf"
+
+    size, digest = await _save_upload(
+        UploadFile(io.BytesIO(content)), str(path), "pdf", len(content)
+    )
+
+    assert size == len(content)
+    assert digest == hashlib.sha256(content).hexdigest()
+    assert path.read_bytes() == content
+
+
+async def test_save_upload_stops_at_limit(tmp_path):
+    content = b"%PDF" + b"x" * (3 * READ_CHUNK_SIZE)
+    path = tmp_path / "big.pdf"
+
+    with pytest.raises(HTTPException) as exc:
+        await _save_upload(UploadFile(io.BytesIO(content)), str(path), "pdf", READ_CHUNK_SIZE)
+
+    assert exc.value.status_code == 413
+    # Nothing past the limit was written.
+    assert path.stat().st_size <= READ_CHUNK_SIZE
+
+
+async def test_save_upload_rejects_empty_file(tmp_path):
+    with pytest.raises(HTTPException) as exc:
+        await _save_upload(UploadFile(io.BytesIO(b"")), str(tmp_path / "e.pdf"), "pdf", 100)
+    assert exc.value.status_code == 422
@@ -8,7 +8,7 @@ from app.services.extractors.base import ExtractionResult
 from app.services.extractors.epub_extractor import EpubExtractor
 from app.services.extractors.factory import get_extractor
 from app.services.extractors.pdf_extractor import PdfExtractor
-from app.services.extractors.web_extractor import WebExtractor
+from app.services.extractors.web_extractor import WebExtractor, normalize_url
 from app.services.extractors.youtube_extractor import YoutubeExtractor
 
 
@@ -103,6 +103,7 @@ class TestWebExtractor:
         mock_article.text = "Article content here"
         mock_article.title = "Test Title"
         mock_article.authors = ["Author"]
+        mock_article.canonical_link = "https://Example.com/article/?utm_source=feed"
         mock_article_cls.return_value = mock_article
 
         ext = WebExtractor()
@@ -112,6 +113,7 @@ class TestWebExtractor:
         assert isinstance(result, ExtractionResult)
         assert "Article content here" in result.text
         assert result.meta["source"] == "web"
+        assert result.meta["final_url"] == "https://example.com/article"
         mock_article.download.assert_called_once()
         mock_article.parse.assert_called_once()
 
@@ -126,6 +128,35 @@ class TestWebExtractor:
         with pytest.raises(ValueError, match="transcript_unavailable"):
             ext.extract(source)
 
+    @patch("app.services.extractors.web_extractor.Article")
+    def test_default_iter_parts_yields_the_text_once(self, mock_article_cls):
+        mock_article = MagicMock(text="Article body", title="Title", authors=[])
+        mock_article.canonical_link = None
+        mock_article_cls.return_value = mock_article
+        result = ExtractionResult(text="")
+
+        parts = list(WebExtractor().iter_parts(FakeSource(source_type="web"), result))
+
+        assert parts == ["Article body"]
+        assert result.meta["source"] == "web"
+        assert result.needs_transcription is False
+
+
+class TestNormalizeUrl:
+    def test_equivalent_urls_normalize_alike(self):
+        variants = [
+            "https://example.com/post?b=2&a=1",
+            "HTTPS://Example.COM:443/post/?a=1&b=2#comments",
+            "https://example.com/post?a=1&utm_campaign=x&b=2&fbclid=abc",
+        ]
+        assert {normalize_url(u) for u in variants} == {"https://example.com/post?a=1&b=2"}
+
+    def test_keeps_distinguishing_parts(self):
+        assert normalize_url("http://example.com:8080/") == "http://example.com:8080/"
+        assert normalize_url("https://example.com/p?id=1") != normalize_url(
+            "https://example.com/p?id=2"
+        )
+
 
 class TestYoutubeExtractor:
     @patch("app.services.extractors.youtube_extractor.YouTubeService")
@@ -163,3 +194,22 @@ class TestYoutubeExtractor:
 
         assert result.needs_transcription is True
         assert result.audio_path == "/tmp/audio.mp3"
+
+    @patch("app.services.extractors.youtube_extractor.YouTubeService")
+    def test_default_iter_parts_carries_the_whole_result(self, mock_yt_cls):
+        mock_svc = MagicMock()
+        mock_svc.extract.return_value = {
+            "source": "whisper",
+            "stream_url": "https://example.com/audio",
+            "meta": {"duration_sec": 300},
+        }
+        mock_yt_cls.return_value = mock_svc
+
+        ext = YoutubeExtractor()
+        source = FakeSource(source_type="youtube", url="https://youtube.com/watch?v=test1234567")
+        result = ExtractionResult(text="")
+
+        assert list(ext.iter_parts(source, result)) == []
+        assert result.needs_transcription is True
+        assert result.stream_url == "https://example.com/audio"
+        assert result.meta == {"duration_sec": 300}
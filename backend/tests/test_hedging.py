@@ -0,0 +1,137 @@
+import threading
+import time
+
+import pytest
+
+from app.providers.base_llm import record_cache_hit
+from app.services.hedging import Hedger
+
+
+def _warm(hedger: Hedger, model: str, n: int) -> None:
+    for _ in range(n):
+        hedger.call(model, lambda: "ok", lambda: "unused")
+
+
+def _slow(release: threading.Event, value: str = "slow"):
+    def _call() -> str:
+        release.wait(5)
+        return value
+
+    return _call
+
+
+def test_no_hedging_until_latency_is_known():
+    hedger = Hedger(budget=1.0, min_samples=5, max_workers=4, max_hedges=2)
+    _warm(hedger, "m", 4)
+    assert hedger.p90("m") is None
+    assert hedger.stats("m")["fired"] == 0
+
+
+def test_straggler_is_hedged_and_first_answer_wins():
+    hedger = Hedger(budget=1.0, min_samples=3, max_workers=4, max_hedges=2)
+    _warm(hedger, "m", 3)
+    release = threading.Event()
+    tally: dict[str, int] = {}
+
+    try:
+        assert hedger.call("m", _slow(release), lambda: "hedge", tally=tally) == "hedge"
+    finally:
+        release.set()
+
+    assert tally == {"requests": 1, "fired": 1, "won": 1}
+    assert hedger.stats("m") == {"requests": 4, "fired": 1, "won": 1, "denied": 0}
+
+
+def test_hedge_budget_caps_duplicates():
+    hedger = Hedger(budget=0.0, min_samples=3, max_workers=4, max_hedges=2)
+    _warm(hedger, "m", 3)
+    release = threading.Event()
+    threading.Timer(0.2, release.set).start()
+
+    assert hedger.call("m", _slow(release), lambda: "hedge") == "slow"
+    assert hedger.stats("m")["fired"] == 0
+    assert hedger.stats("m")["denied"] == 1
+
+
+def test_failed_hedge_falls_back_to_primary():
+    hedger = Hedger(budget=1.0, min_samples=3, max_workers=4, max_hedges=2)
+    _warm(hedger, "m", 3)
+    release = threading.Event()
+
+    def _failing() -> str:
+        threading.Timer(0.1, release.set).start()
+        raise TimeoutError("backup down")
+
+    assert hedger.call("m", _slow(release), _failing) == "slow"
+    assert hedger.stats("m")["won"] == 0
+
+
+def test_primary_error_propagates():
+    hedger = Hedger(budget=1.0, min_samples=1, max_workers=4, max_hedges=2)
+
+    def _boom() -> str:
+        raise ValueError("primary")
+
+    with pytest.raises(ValueError, match="primary"):
+        hedger.call("m", _boom, lambda: "unused")
+
+
+def test_latency_is_timed_from_when_the_call_starts():
+    # One primary thread plus one for the single hedge slot.
+    hedger = Hedger(budget=1.0, min_samples=100, max_workers=1, max_hedges=1)
+    release = threading.Event()
+    running = threading.Semaphore(0)
+
+    def _blocking() -> str:
+        running.release()
+        release.wait(5)
+        return "slow"
+
+    blockers = [
+        threading.Thread(target=hedger.call, args=("m", _blocking, lambda: "unused"))
+        for _ in range(2)
+    ]
+    for blocker in blockers:
+        blocker.start()
+    for _ in blockers:
+        assert running.acquire(timeout=5)
+
+    # The fast call waits in the queue until the blockers are released.
+    threading.Timer(0.2, release.set).start()
+    assert hedger.call("m", lambda: "fast", lambda: "unused") == "fast"
+    for blocker in blockers:
+        blocker.join()
+
+    assert min(hedger._latencies["m"]) < 0.1
+
+
+def test_cache_hits_are_not_sampled():
+    hedger = Hedger(budget=1.0, min_samples=1, max_workers=4, max_hedges=1)
+
+    def _cached() -> str:
+        record_cache_hit(True)
+        return "cached"
+
+    hedger.call("m", _cached, lambda: "unused")
+    assert hedger.p90("m") is None
+
+
+def test_hedges_beyond_capacity_are_denied():
+    hedger = Hedger(budget=1.0, min_samples=3, max_workers=4, max_hedges=1)
+    _warm(hedger, "m", 3)
+    release = threading.Event()
+    results: list[str] = []
+
+    # The first straggler's hedge is slow too, so its pair holds the only slot.
+    first = threading.Thread(
+        target=lambda: results.append(hedger.call("m", _slow(release), _slow(release, "hedge")))
+    )
+    first.start()
+    while hedger.stats("m")["fired"] == 0:
+        time.sleep(0.005)
+    threading.Timer(0.2, release.set).start()
+
+    assert hedger.call("m", _slow(release, "second"), lambda: "hedge") == "second"
+    first.join()
+    assert hedger.stats("m")["fired"] == 1
+    assert hedger.stats("m")["denied"] == 1
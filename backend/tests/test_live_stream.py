@@ -0,0 +1,95 @@
+import json
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.live_stream import DeltaPublisher, sse_events
+
+SOURCE_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
+
+
+def _published(redis: MagicMock) -> list[dict]:
+    return [json.loads(c.args[1]["event"]) for c in redis.xadd.call_args_list]
+
+
+def test_publisher_coalesces_deltas_per_channel():
+    redis = MagicMock()
+    with patch("app.services.live_stream.get_redis", return_value=redis):
+        publisher = DeltaPublisher(SOURCE_ID, flush_sec=3600)
+        for delta in ("Hel", "lo", " world"):
+            publisher("medium_text", delta)
+        publisher("habr_text", "Привет")
+        publisher.close()
+
+    events = _published(redis)
+    assert events[0] == {"type": "start"}
+    # The first delta of each channel goes out at once, the rest on close.
+    assert {"type": "delta", "channel": "medium_text", "text": "Hel"} in events
+    assert {"type": "delta", "channel": "medium_text", "text": "lo world"} in events
+    assert {"type": "delta", "channel": "habr_text", "text": "Привет"} in events
+    assert events[-1] == {"type": "end"}
+    redis.delete.assert_called_once()
+    redis.expire.assert_called_once()
+
+
+def test_publisher_ignores_redis_errors():
+    redis = MagicMock()
+    redis.xadd.side_effect = ConnectionError("redis down")
+    with patch("app.services.live_stream.get_redis", return_value=redis):
+        publisher = DeltaPublisher(SOURCE_ID, flush_sec=0)
+        publisher("medium_text", "text")
+        publisher.close()
+
+
+def test_reduce_streams_text_channels(make_generator):
+    llm = MagicMock()
+    llm.complete_stream.side_effect = lambda s, u, m: iter(["a", "b", "c"])
+    llm.complete_json.return_value = {"scenes": []}
+    deltas = []
+    svc = make_generator(llm)
+
+    result = svc.reduce(
+        ["summary"], channels=["medium_text", "banana_video_prompt"],
+        on_delta=lambda key, text: deltas.append((key, text)),
+    )
+
+    assert result["medium_text"] == "abc"
+    assert deltas == [("medium_text", "a"), ("medium_text", "b"), ("medium_text", "c")]
+    llm.complete.assert_not_called()
+
+
+async def test_sse_replays_stream_until_end():
+    redis = MagicMock()
+    redis.exists = AsyncMock(return_value=1)
+    redis.xread = AsyncMock(
+        side_effect=[
+            [],
+            [
+                (
+                    "key",
+                    [
+                        ("1-0", {"event": json.dumps({"type": "start"})}),
+                        ("2-0", {"event": json.dumps({"type": "delta", "channel": "x", "text": "hi"})}),
+                        ("3-0", {"event": json.dumps({"type": "end"})}),
+                    ],
+                )
+            ],
+        ]
+    )
+    with patch("app.services.live_stream.get_async_redis", return_value=redis):
+        frames = [frame async for frame in sse_events(SOURCE_ID, last_event_id="0-0")]
+
+    assert frames[0] == ": keep-alive\n\n"
+    assert frames[2] == 'id: 2-0\nevent: delta\ndata: {"channel": "x", "text": "hi"}\n\n'
+    assert frames[-1].startswith("id: 3-0\nevent: end")
+    assert redis.xread.call_args_list[1].args[0] == {"source:" + str(SOURCE_ID) + ":stream": "0-0"}
+
+
+async def test_sse_ends_at_once_for_finished_source_without_stream():
+    redis = MagicMock()
+    redis.exists = AsyncMock(return_value=0)
+    redis.xread = AsyncMock()
+    with patch("app.services.live_stream.get_async_redis", return_value=redis):
+        frames = [frame async for frame in sse_events(SOURCE_ID, finished=True)]
+
+    assert frames == ["event: end\ndata: {}\n\n"]
+    redis.xread.assert_not_called()
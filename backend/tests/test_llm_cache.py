@@ -0,0 +1,117 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.core.config import settings
+from app.main import app
+from app.providers.cached_provider import CachedLLMProvider
+from app.providers.llm_cache import RedisLLMCache, SqliteLLMCache
+
+
+def _inner() -> MagicMock:
+    inner = MagicMock()
+    inner.name = "openai"
+    inner.temperature = 0.3
+    inner.json_temperature = 0.1
+    inner.complete.return_value = "summary"
+    inner.complete_json.return_value = {"scenes": []}
+    return inner
+
+
+class TestSqliteLLMCache:
+    def test_roundtrip(self, tmp_path):
+        cache = SqliteLLMCache(ttl_sec=60, max_entries=10, path=str(tmp_path / "c.db"))
+        cache.set("a", "text")
+        cache.set("b", {"k": [1, 2]})
+        assert cache.get("a") == "text"
+        assert cache.get("b") == {"k": [1, 2]}
+        assert cache.get("missing") is None
+
+    def test_expired_entries_are_dropped(self, tmp_path):
+        cache = SqliteLLMCache(ttl_sec=60, max_entries=10, path=str(tmp_path / "c.db"))
+        with patch("app.providers.llm_cache.time.time", return_value=1000.0):
+            cache.set("a", "text")
+        with patch("app.providers.llm_cache.time.time", return_value=1061.0):
+            assert cache.get("a") is None
+
+    def test_least_recently_used_is_evicted(self, tmp_path):
+        cache = SqliteLLMCache(ttl_sec=10**10, max_entries=2, path=str(tmp_path / "c.db"))
+        with patch("app.providers.llm_cache.time.time", side_effect=[1.0, 2.0, 3.0, 4.0]):
+            cache.set("a", "1")
+            cache.set("b", "2")
+            cache.get("a")
+            cache.set("c", "3")
+        assert cache.get("a") == "1"
+        assert cache.get("b") is None
+        assert cache.get("c") == "3"
+
+
+    def test_counters_are_shared_through_the_file(self, tmp_path):
+        path = str(tmp_path / "c.db")
+        worker = SqliteLLMCache(ttl_sec=60, max_entries=10, path=path)
+        for hit in (True, True, True, False):
+            worker.record(hit)
+
+        api = SqliteLLMCache(ttl_sec=60, max_entries=10, path=path)
+        assert api.stats() == {"hits": 3, "misses": 1, "hit_rate": 0.75}
+
+
+class TestRedisLLMCache:
+    def test_counters_live_in_redis(self):
+        with patch("app.core.redis.get_redis") as get_redis:
+            cache = RedisLLMCache(ttl_sec=60, max_entries=10)
+        client = get_redis.return_value
+        client.hgetall.return_value = {"hits": "9", "misses": "1"}
+
+        cache.record(hit=True)
+
+        client.hincrby.assert_called_once_with("llm_cache:stats", "hits", 1)
+        assert cache.stats() == {"hits": 9, "misses": 1, "hit_rate": 0.9}
+
+
+class TestCachedLLMProvider:
+    def test_identical_requests_hit_cache(self, tmp_path):
+        inner = _inner()
+        cache = SqliteLLMCache(ttl_sec=60, max_entries=10, path=str(tmp_path / "c.db"))
+        provider = CachedLLMProvider(inner, cache)
+
+        assert provider.complete("sys", "user", "gpt-4o-mini") == "summary"
+        assert provider.complete("sys", "user", "gpt-4o-mini") == "summary"
+        assert inner.complete.call_count == 1
+        assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+    def test_key_covers_model_and_response_format(self, tmp_path):
+        inner = _inner()
+        cache = SqliteLLMCache(ttl_sec=60, max_entries=10, path=str(tmp_path / "c.db"))
+        provider = CachedLLMProvider(inner, cache)
+
+        provider.complete("sys", "user", "gpt-4o-mini")
+        provider.complete("sys", "user", "gpt-4o")
+        assert provider.complete_json("sys", "user", "gpt-4o") == {"scenes": []}
+        assert inner.complete.call_count == 2
+        assert inner.complete_json.call_count == 1
+        assert cache.stats()["hits"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cache_endpoint_reports_hit_rate(tmp_path):
+    cache = SqliteLLMCache(ttl_sec=60, max_entries=10, path=str(tmp_path / "c.db"))
+    cache.record(hit=True)
+    cache.record(hit=False)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        with patch.object(settings, "llm_cache_enabled", False):
+            assert (await client.get("/api/llm/cache")).json() == {"enabled": False}
+        with (
+            patch.object(settings, "llm_cache_enabled", True),
+            patch.object(settings, "llm_cache_backend", "sqlite"),
+            patch("app.providers.factory.get_llm_cache", return_value=cache),
+        ):
+            resp = await client.get("/api/llm/cache")
+
+    assert resp.status_code == 200
+    assert resp.json() == {
+        "enabled": True, "backend": "sqlite", "hits": 1, "misses": 1, "hit_rate": 0.5,
+    }
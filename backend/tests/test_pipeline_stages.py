@@ -0,0 +1,194 @@
+import uuid
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.core.config import settings
+from app.db.models import ChunkSummary, Transcript
+from app.services.extractors import ExtractionResult
+from app.services.generator import MAP_PROMPT_VERSION, chunk_hash
+from app.workers.tasks import (
+    PIPELINE_STAGES,
+    _chunk_and_map_parts,
+    _map_with_stored_summaries,
+    _reuse_transcript,
+    build_pipeline,
+    extract_stage,
+)
+
+
+def _stage_names(sig) -> list[str]:
+    return [task.task.rsplit(".", 1)[-1].removesuffix("_stage") for task in sig.tasks]
+
+
+def test_fresh_source_runs_every_stage():
+    sig = build_pipeline("00000000-0000-0000-0000-000000000001", set())
+    assert _stage_names(sig) == list(PIPELINE_STAGES)
+
+
+def test_resume_skips_checkpointed_stages():
+    sig = build_pipeline(
+        "00000000-0000-0000-0000-000000000001",
+        {"extract", "transcribe", "chunk", "map"},
+    )
+    assert _stage_names(sig) == ["reduce", "validate"]
+
+
+def test_stage_signatures_are_immutable():
+    sig = build_pipeline("00000000-0000-0000-0000-000000000001", set())
+    assert all(task.immutable for task in sig.tasks)
+    assert all(task.args == ("00000000-0000-0000-0000-000000000001",) for task in sig.tasks)
+
+
+def test_map_reuses_stored_summaries():
+    chunks = ["first chunk", "second chunk", "third chunk"]
+    stored = MagicMock(
+        chunk_index=1,
+        chunk_hash=chunk_hash("second chunk"),
+        map_model=settings.map_model,
+        prompt_version=MAP_PROMPT_VERSION,
+        summary="stored summary",
+    )
+    session = MagicMock()
+    session.query.return_value.filter.return_value.all.return_value = [stored]
+    generator_svc = MagicMock()
+    generator_svc.map_chunks.return_value = ["mapped 0", "mapped 2"]
+
+    summaries = _map_with_stored_summaries(session, generator_svc, uuid.uuid4(), chunks)
+
+    assert summaries == ["mapped 0", "stored summary", "mapped 2"]
+    generator_svc.map_chunks.assert_called_once_with(["first chunk", "third chunk"])
+    assert session.add.call_count == 2
+
+
+def test_reused_transcript_carries_stored_summaries():
+    cached = Transcript(
+        id=uuid.uuid4(),
+        source_id=uuid.uuid4(),
+        source_label="pdf",
+        raw_text="book text",
+        meta_json={"title": "Book"},
+    )
+    stored = ChunkSummary(
+        transcript_id=cached.id,
+        chunk_index=0,
+        chunk_hash=chunk_hash("book text"),
+        map_model=settings.map_model,
+        prompt_version=MAP_PROMPT_VERSION,
+        summary="stored summary",
+    )
+    session = MagicMock()
+    session.query.return_value.filter.return_value.all.return_value = [stored]
+    source = MagicMock(id=uuid.uuid4())
+
+    meta = _reuse_transcript(session, source, cached)
+
+    assert meta == {"title": "Book"}
+    transcript, summary = [call.args[0] for call in session.add.call_args_list]
+    assert transcript.source_id == source.id
+    assert transcript.raw_text == "book text"
+    assert summary.transcript_id == transcript.id
+    assert (summary.chunk_index, summary.chunk_hash, summary.summary) == (
+        0, chunk_hash("book text"), "stored summary",
+    )
+
+
+def test_interrupted_inline_map_saves_finished_summaries():
+    generator_svc = MagicMock()
+
+    def _map_stream(parts, mapped, **kwargs):
+        list(parts)
+        mapped[(0, chunk_hash("first"))] = "first summary"
+        raise RuntimeError("llm down")
+
+    generator_svc.map_stream.side_effect = _map_stream
+    transcript_id = uuid.uuid4()
+    stored = {(1, chunk_hash("old")): "old summary"}
+
+    with (
+        patch("app.workers.tasks._map_generator", return_value=generator_svc),
+        patch("app.workers.tasks._save_partial_map") as save,
+        pytest.raises(RuntimeError, match="llm down"),
+    ):
+        _chunk_and_map_parts(
+            MagicMock(), uuid.uuid4(), transcript_id, iter(["a", "b"]), " ", stored=stored
+        )
+
+    _, saved_id, text, summaries = save.call_args.args
+    assert saved_id == transcript_id
+    assert text == "a b"
+    # Summaries already stored by an earlier attempt are not saved twice.
+    assert summaries == {(0, chunk_hash("first")): "first summary"}
+
+
+def _extract_body():
+    bodies = []
+    with patch(
+        "app.workers.tasks._run_stage",
+        side_effect=lambda task, source_id, stage, body: bodies.append(body),
+    ):
+        extract_stage("00000000-0000-0000-0000-000000000001")
+    return bodies[0]
+
+
+def _run_web_extract(prior: Transcript | None, fetched: str | Exception):
+    session = MagicMock()
+    source = MagicMock(
+        id=uuid.uuid4(), url="https://example.com/post", source_type="web", content_digest=None
+    )
+    extractor = MagicMock()
+    if isinstance(fetched, Exception):
+        extractor.extract.side_effect = fetched
+    else:
+        extractor.extract.return_value = ExtractionResult(
+            text=fetched, meta={"final_url": "https://example.com/post", "title": "Post"}
+        )
+    with (
+        patch("app.workers.tasks._follow_in_flight", return_value=None),
+        patch("app.workers.tasks._partial_map", return_value=(uuid.uuid4(), {})),
+        patch("app.workers.tasks.get_extractor", return_value=extractor),
+        patch("app.workers.tasks._prior_transcript", return_value=prior),
+        patch("app.workers.tasks._reuse_transcript", return_value={}) as reuse,
+        patch("app.workers.tasks._copy_summaries") as copy,
+        patch("app.workers.tasks._save_checkpoint"),
+        patch.object(settings, "map_overlap", False),
+    ):
+        _extract_body()(session, source, MagicMock())
+    return session, reuse, copy
+
+
+def _prior_page(text: str) -> Transcript:
+    return Transcript(
+        id=uuid.uuid4(), source_id=uuid.uuid4(), source_label="web", raw_text=text
+    )
+
+
+def test_edited_page_keeps_fresh_text_and_offers_prior_summaries():
+    prior = _prior_page("old text")
+
+    session, reuse, copy = _run_web_extract(prior, "new text")
+
+    reuse.assert_not_called()
+    transcript = session.merge.call_args.args[0]
+    assert transcript.raw_text == "new text"
+    copy.assert_called_once_with(session, prior.id, transcript.id)
+
+
+def test_unchanged_page_reuses_prior_transcript():
+    prior = _prior_page("same text")
+
+    session, reuse, _ = _run_web_extract(prior, "same text")
+
+    reuse.assert_called_once()
+    session.merge.assert_not_called()
+
+
+def test_failed_fetch_falls_back_to_prior_transcript():
+    prior = _prior_page("old text")
+
+    _, reuse, _ = _run_web_extract(prior, ConnectionError("timed out"))
+
+    assert reuse.call_args.args[2] is prior
+
+    with pytest.raises(ConnectionError):
+        _run_web_extract(None, ConnectionError("timed out"))
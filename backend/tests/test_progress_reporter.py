@@ -0,0 +1,55 @@
+import uuid
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.services.progress import ProgressReporter
+
+
+@pytest.fixture
+def reporter():
+    r = ProgressReporter(uuid.uuid4(), debounce_sec=60)
+    r._write_row = MagicMock()
+    r._write_hot = MagicMock()
+    return r
+
+
+def test_rapid_updates_coalesce_into_one_write(reporter):
+    reporter.update(status="chunking", progress_json={"stage": "chunking", "percent": 30})
+    reporter._write_row.reset_mock()
+
+    reporter.update(progress_json={"stage": "chunking", "percent": 35})
+    reporter.update(status="mapping", progress_json={"stage": "mapping", "percent": 35})
+    assert reporter._write_row.call_count == 0
+
+    reporter.close()
+    reporter._write_row.assert_called_once_with(
+        {"status": "mapping", "progress_json": {"stage": "mapping", "percent": 35}}
+    )
+
+
+def test_terminal_status_is_written_immediately(reporter):
+    reporter.update(status="validating", progress_json={"stage": "validating", "percent": 85})
+    reporter._write_row.reset_mock()
+
+    reporter.update(status="approved", progress_json={"stage": "done", "percent": 100})
+    reporter._write_row.assert_called_once()
+    assert reporter._write_row.call_args.args[0]["status"] == "approved"
+
+
+def test_redis_backend_keeps_hot_progress_off_the_row(reporter):
+    reporter.use_redis = True
+    with patch("app.services.progress.get_redis") as mock_redis:
+        reporter.update(
+            status="mapping",
+            progress_json={"stage": "mapping", "percent": 35},
+            title="Video",
+        )
+        reporter._write_hot.assert_called_once_with(
+            {"status": "mapping", "progress_json": {"stage": "mapping", "percent": 35}}
+        )
+        reporter._write_row.assert_called_once_with({"title": "Video"})
+
+        reporter.update(status="failed", error_code="llm_error")
+        assert reporter._write_row.call_args.args[0]["status"] == "failed"
+        mock_redis.return_value.delete.assert_called_once()
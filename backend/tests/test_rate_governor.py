@@ -0,0 +1,110 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.providers.base_llm import pop_usage, record_usage
+from app.providers.governed_provider import (
+    ESTIMATED_COMPLETION_TOKENS,
+    GovernedLLMProvider,
+)
+from app.providers.rate_governor import RateGovernor
+
+
+def _governor(limits: dict) -> RateGovernor:
+    with patch("app.providers.rate_governor.get_redis") as get_redis:
+        get_redis.return_value.register_script.side_effect = lambda script: MagicMock()
+        return RateGovernor(limits)
+
+
+def _inner() -> MagicMock:
+    inner = MagicMock()
+    inner.name = "openai"
+    inner.temperature = 0.3
+    inner.json_temperature = 0.1
+    return inner
+
+
+class TestRateGovernor:
+    def test_unlisted_models_are_not_limited(self):
+        governor = _governor({"gpt-4o-mini": {"rpm": 60}})
+        assert governor.acquire("gpt-4o", 5000) == 0.0
+        governor._reserve.assert_not_called()
+
+    def test_reserves_request_and_tokens_per_model(self):
+        governor = _governor({"gpt-4o-mini": {"rpm": 60, "tpm": 6000}})
+        governor._reserve.return_value = "0"
+
+        assert governor.acquire("gpt-4o-mini", 100_000) == 0.0
+        governor._reserve.assert_called_once_with(
+            keys=["llm_governor:gpt-4o-mini:rpm", "llm_governor:gpt-4o-mini:tpm"],
+            # Oversized requests are capped at the bucket so they can run at all.
+            args=[1.0, 60, 1, 100.0, 6000, 6000],
+        )
+
+    def test_waits_for_its_reservation(self):
+        governor = _governor({"m": {"rpm": 60}})
+        governor._reserve.return_value = "1.5"
+        with patch("app.providers.rate_governor.time.sleep") as sleep:
+            assert governor.acquire("m", 10) == 1.5
+        sleep.assert_called_once_with(1.5)
+        governor._record_stats.assert_called_once_with(
+            keys=["llm_governor:stats:m"], args=["1.500000"]
+        )
+
+    def test_redis_outage_does_not_block_calls(self):
+        governor = _governor({"m": {"rpm": 60}})
+        governor._reserve.side_effect = ConnectionError("down")
+        with patch("app.providers.rate_governor.time.sleep") as sleep:
+            assert governor.acquire("m", 10) == 0.0
+        sleep.assert_not_called()
+
+
+class TestGovernedLLMProvider:
+    def test_reservation_is_corrected_with_actual_usage(self):
+        inner = _inner()
+
+        def _complete(system, user, model):
+            record_usage(model, MagicMock(usage=MagicMock(
+                prompt_tokens=40, completion_tokens=10, prompt_tokens_details=None,
+            )))
+            return "text"
+
+        inner.complete.side_effect = _complete
+        governor = MagicMock()
+        provider = GovernedLLMProvider(inner, governor)
+
+        assert provider.complete("s" * 30, "u" * 60, "m") == "text"
+
+        estimate = 90 // 3 + ESTIMATED_COMPLETION_TOKENS
+        governor.acquire.assert_called_once_with("m", estimate)
+        governor.adjust.assert_called_once_with("m", 50 - estimate)
+        # Usage stays available to the caller (reduce usage report).
+        assert pop_usage()["completion_tokens"] == 10
+
+    def test_stream_is_governed_once(self):
+        inner = _inner()
+        inner.complete_stream.return_value = iter(["a", "b"])
+        governor = MagicMock()
+        pop_usage()
+
+        provider = GovernedLLMProvider(inner, governor)
+        assert list(provider.complete_stream("s", "u", "m")) == ["a", "b"]
+        governor.acquire.assert_called_once()
+        governor.adjust.assert_not_called()
+
+    def test_failed_call_hands_back_its_reservation(self):
+        inner = _inner()
+        inner.complete.side_effect = RuntimeError("boom")
+        governor = MagicMock()
+        # Usage left over from an earlier call must not be settled against this one.
+        record_usage("m", MagicMock(usage=MagicMock(
+            prompt_tokens=4000, completion_tokens=1000, prompt_tokens_details=None,
+        )))
+
+        provider = GovernedLLMProvider(inner, governor)
+        with pytest.raises(RuntimeError):
+            provider.complete("s" * 30, "u" * 60, "m")
+
+        estimate = 90 // 3 + ESTIMATED_COMPLETION_TOKENS
+        governor.adjust.assert_called_once_with("m", -estimate)
+        assert pop_usage() is None
@@ -0,0 +1,106 @@
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from app.core.config import settings
+from app.providers.base_llm import pop_usage, record_usage
+from app.services.generator import CHANNEL_DEFS
+
+
+def _llm() -> MagicMock:
+    llm = MagicMock()
+
+    def _complete(system, user, model):
+        record_usage(
+            model,
+            SimpleNamespace(
+                usage=SimpleNamespace(
+                    prompt_tokens=1000,
+                    completion_tokens=100,
+                    prompt_tokens_details=SimpleNamespace(cached_tokens=800),
+                )
+            ),
+        )
+        return "text"
+
+    llm.complete.side_effect = _complete
+    llm.complete_json.side_effect = lambda s, u, m: {"scenes": []}
+    return llm
+
+
+def test_shared_prefix_layout_sends_identical_system_message(make_generator):
+    llm = _llm()
+
+    with patch.object(settings, "reduce_prompt_layout", "shared_prefix"):
+        make_generator(llm).reduce(["first summary", "second summary"])
+
+    calls = llm.complete.call_args_list + llm.complete_json.call_args_list
+    system_messages = {c.args[0] for c in calls}
+    user_messages = {c.args[1] for c in calls}
+    assert len(system_messages) == 1
+    assert "first summary" in system_messages.pop()
+    assert len(user_messages) == len(CHANNEL_DEFS)
+
+
+def test_shared_prefix_warms_the_cache_before_fanning_out(make_generator):
+    llm = _llm()
+    events = []
+    complete = llm.complete.side_effect
+
+    def _complete(system, user, model):
+        events.append(("start", user))
+        time.sleep(0.01)
+        events.append(("end", user))
+        return complete(system, user, model)
+
+    llm.complete.side_effect = _complete
+    llm.complete_json.side_effect = lambda s, u, m: events.append(("start", u)) or {}
+
+    with patch.object(settings, "reduce_prompt_layout", "shared_prefix"):
+        make_generator(llm).reduce(["summary"])
+
+    assert len(events) > 2
+    first = events[0][1]
+    # The first channel finishes before any other is sent.
+    assert events[1] == ("end", first)
+    assert all(user != first for _, user in events[2:])
+
+
+def test_channel_first_layout_keeps_summaries_in_user_message(make_generator):
+    llm = _llm()
+
+    with patch.object(settings, "reduce_prompt_layout", "channel_first"):
+        make_generator(llm).reduce(["first summary"])
+
+    calls = llm.complete.call_args_list + llm.complete_json.call_args_list
+    assert {c.args[1] for c in calls} == {"first summary"}
+
+
+def test_reduce_reports_cached_tokens(make_generator):
+    svc = make_generator(_llm())
+
+    with patch.object(settings, "reduce_prompt_layout", "shared_prefix"):
+        svc.reduce(["summary"])
+
+    usage = svc.last_reduce_usage
+    text_channels = sum(1 for *_, is_json in CHANNEL_DEFS if not is_json)
+    assert usage["layout"] == "shared_prefix"
+    assert usage["prompt_tokens"] == 1000 * text_channels
+    assert usage["cached_tokens"] == 800 * text_channels
+    assert usage["cached_ratio"] == 0.8
+    # The JSON channel's mock reports no usage (as on a cache hit).
+    assert usage["channels"]["banana_video_prompt"] is None
+
+
+def test_pop_usage_clears_the_thread_value():
+    record_usage("m", SimpleNamespace(usage=None))
+    assert pop_usage() is None
+
+    record_usage(
+        "m",
+        SimpleNamespace(
+            usage=SimpleNamespace(prompt_tokens=5, completion_tokens=1, prompt_tokens_details=None)
+        ),
+    )
+    assert pop_usage() == {"prompt_tokens": 5, "cached_tokens": 0, "completion_tokens": 1}
+    assert pop_usage() is None
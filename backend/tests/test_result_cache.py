@@ -0,0 +1,194 @@
+import uuid
+from unittest.mock import MagicMock, patch
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.db.models import (
+    ChunkSummary,
+    GeneratedContent,
+    PipelineCheckpoint,
+    Source,
+    Transcript,
+    Validation,
+)
+from app.workers.tasks import _clone_cached_result, _result_cache_key
+
+PAYLOAD = {"medium_text": "Article", "habr_text": "Статья"}
+REPORT = {"medium": {"passed": True}, "habr": {"passed": True}}
+
+
+def _video_id() -> str:
+    # A fresh video per test: committed rows are shared across tests.
+    return uuid.uuid4().hex[:11]
+
+
+async def _origin(db_session, yt_id: str, status: str = "approved") -> Source:
+    origin = Source(
+        url=f"https://www.youtube.com/watch?v={yt_id}",
+        source_type="youtube",
+        status=status,
+        title="Talk",
+    )
+    db_session.add(origin)
+    await db_session.flush()
+    transcript = Transcript(source_id=origin.id, source_label="captions", raw_text="Text")
+    db_session.add(transcript)
+    await db_session.flush()
+    db_session.add_all(
+        [
+            ChunkSummary(
+                transcript_id=transcript.id,
+                chunk_index=0,
+                chunk_hash="h" * 64,
+                map_model="map-model",
+                prompt_version="1",
+                summary="Summary",
+            ),
+            GeneratedContent(
+                source_id=origin.id,
+                content_payload=PAYLOAD,
+                result_key=_result_cache_key(origin),
+            ),
+            Validation(source_id=origin.id, overall_verdict="approved", report_json=REPORT),
+        ]
+    )
+    await db_session.commit()
+    return origin
+
+
+async def _submission(db_session, yt_id: str) -> Source:
+    source = Source(url=f"https://youtu.be/{yt_id}", source_type="youtube", status="extracting")
+    db_session.add(source)
+    await db_session.commit()
+    return source
+
+
+async def _clone(db_session, source: Source) -> tuple[bool, MagicMock]:
+    progress = MagicMock()
+    with patch("app.workers.tasks.cleanup_source_tmp"):
+        hit = await db_session.run_sync(
+            lambda session: _clone_cached_result(session, source, progress)
+        )
+    await db_session.commit()
+    return hit, progress
+
+
+def test_result_cache_key_covers_model_routing():
+    watch = Source(source_type="youtube", url="https://www.youtube.com/watch?v=dQw4w9WgXcQ")
+    short = Source(source_type="youtube", url="https://youtu.be/dQw4w9WgXcQ")
+    key = _result_cache_key(watch)
+    assert key == _result_cache_key(short)
+
+    with patch.object(settings, "reduce_model", "another-model"):
+        assert _result_cache_key(watch) != key
+    with patch("app.workers.tasks.GENERATOR_PROMPTS_DIGEST", "edited"):
+        assert _result_cache_key(watch) != key
+
+
+def test_result_cache_key_covers_pipeline_settings():
+    source = Source(source_type="youtube", url="https://www.youtube.com/watch?v=dQw4w9WgXcQ")
+    key = _result_cache_key(source)
+
+    with patch.object(settings, "reduce_token_budget", settings.reduce_token_budget + 1000):
+        assert _result_cache_key(source) != key
+    with patch.object(settings, "reduce_fan_in", settings.reduce_fan_in + 1):
+        assert _result_cache_key(source) != key
+    with patch.object(settings, "transcription_provider", "another-provider"):
+        assert _result_cache_key(source) != key
+    with patch("app.workers.tasks.MAP_CHUNK_SIZE", 1000):
+        assert _result_cache_key(source) != key
+
+
+@pytest.mark.asyncio
+async def test_hit_clones_payload_validation_and_transcript(db_session):
+    yt_id = _video_id()
+    origin = await _origin(db_session, yt_id)
+    source = await _submission(db_session, yt_id)
+
+    hit, _ = await _clone(db_session, source)
+
+    assert hit
+    content = await db_session.scalar(
+        select(GeneratedContent).where(GeneratedContent.source_id == source.id)
+    )
+    assert content.content_payload == PAYLOAD
+    assert content.cached_from == origin.id
+    assert content.result_key == _result_cache_key(origin)
+    validation = await db_session.scalar(
+        select(Validation).where(Validation.source_id == source.id)
+    )
+    assert validation.report_json == REPORT
+    transcript = await db_session.scalar(
+        select(Transcript).where(Transcript.source_id == source.id)
+    )
+    assert transcript.raw_text == "Text"
+    summaries = await db_session.scalar(
+        select(func.count(ChunkSummary.id)).where(ChunkSummary.transcript_id == transcript.id)
+    )
+    assert summaries == 1
+
+
+@pytest.mark.asyncio
+async def test_clone_is_approved_and_reported_as_cached(client: AsyncClient, db_session):
+    yt_id = _video_id()
+    origin = await _origin(db_session, yt_id)
+    source = await _submission(db_session, yt_id)
+
+    _, progress = await _clone(db_session, source)
+
+    update = progress.update.call_args.kwargs
+    assert update["status"] == "approved"
+    assert update["title"] == "Talk"
+    checkpoint = await db_session.scalar(
+        select(PipelineCheckpoint).where(PipelineCheckpoint.source_id == source.id)
+    )
+    assert checkpoint.stage == "extract"
+    assert checkpoint.payload == {"cached_from": str(origin.id)}
+
+    # What the ProgressReporter writes in the worker.
+    source.status = update["status"]
+    await db_session.commit()
+    resp = await client.get(f"/api/sources/{source.id}")
+    data = resp.json()
+    assert data["status"] == "approved"
+    assert data["from_cache"] is True
+    assert data["content_payload"] == PAYLOAD
+
+
+@pytest.mark.asyncio
+async def test_miss_when_prompts_or_model_routing_differ(db_session):
+    yt_id = _video_id()
+    await _origin(db_session, yt_id)
+    source = await _submission(db_session, yt_id)
+
+    with patch.object(settings, "reduce_model", "another-model"):
+        hit, progress = await _clone(db_session, source)
+    assert not hit
+    progress.update.assert_not_called()
+
+    with patch("app.workers.tasks.GENERATOR_PROMPTS_DIGEST", "edited"):
+        hit, _ = await _clone(db_session, source)
+    assert not hit
+
+    with patch.object(settings, "reduce_token_budget", settings.reduce_token_budget + 1000):
+        hit, _ = await _clone(db_session, source)
+    assert not hit
+
+
+@pytest.mark.asyncio
+async def test_needs_review_source_is_never_cloned(db_session):
+    yt_id = _video_id()
+    await _origin(db_session, yt_id, status="needs_review")
+    source = await _submission(db_session, yt_id)
+
+    hit, progress = await _clone(db_session, source)
+
+    assert not hit
+    progress.update.assert_not_called()
+    content = await db_session.scalar(
+        select(GeneratedContent).where(GeneratedContent.source_id == source.id)
+    )
+    assert content is None
@@ -0,0 +1,128 @@
+import uuid
+from datetime import UTC, datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+from celery.exceptions import Retry
+
+from app.core.config import settings
+from app.db.models import Source
+from app.workers.tasks import (
+    SINGLEFLIGHT_RECHECK_SEC,
+    _content_key,
+    _follow_in_flight,
+    _LeaderInFlight,
+    _run_stage,
+)
+
+
+def _source(**fields) -> Source:
+    return Source(id=uuid.uuid4(), **fields)
+
+
+def test_key_identifies_content_not_submission():
+    watch = _source(source_type="youtube", url="https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=42")
+    short = _source(source_type="youtube", url="https://youtu.be/dQw4w9WgXcQ")
+    assert _content_key(watch) == _content_key(short) == "youtube:dQw4w9WgXcQ"
+
+    page = _source(source_type="web", url="https://Example.com/post/?utm_source=x")
+    assert _content_key(page) == "url:https://example.com/post"
+
+    upload = _source(source_type="pdf", file_path="/tmp/a.pdf", content_digest="ab" * 32)
+    assert _content_key(upload) == "sha256:" + "ab" * 32
+
+
+def test_leader_does_the_work():
+    source = _source(source_type="youtube", url="https://youtu.be/dQw4w9WgXcQ")
+    with patch("app.workers.tasks.acquire_lease", return_value=str(source.id)):
+        assert _follow_in_flight(MagicMock(), source) is None
+
+
+def _follower(leader_id, status: str, map_checkpoint, waited_sec: float = 0):
+    source = _source(
+        source_type="youtube",
+        url="https://youtu.be/dQw4w9WgXcQ",
+        created_at=datetime.now(UTC) - timedelta(seconds=waited_sec),
+    )
+    session = MagicMock()
+    session.query.return_value.filter.return_value.scalar.return_value = status
+    patches = (
+        patch("app.workers.tasks.acquire_lease", return_value=str(leader_id)),
+        patch("app.workers.tasks.lease_holder", return_value=str(leader_id)),
+        patch("app.workers.tasks._load_checkpoint", return_value=map_checkpoint),
+    )
+    return source, session, patches
+
+
+def test_follower_requeues_while_leader_runs():
+    leader_id = uuid.uuid4()
+    source, session, (acquire, holder, checkpoint) = _follower(leader_id, "transcribing", None)
+
+    with acquire, holder, checkpoint, pytest.raises(_LeaderInFlight):
+        _follow_in_flight(session, source)
+
+
+def test_follower_reuses_leader_summaries():
+    leader_id = uuid.uuid4()
+    source, session, (acquire, holder, checkpoint) = _follower(
+        leader_id, "reducing", {"chunk_count": 3}
+    )
+
+    with acquire, holder, checkpoint:
+        assert _follow_in_flight(session, source) == leader_id
+
+
+def test_follower_proceeds_when_leader_fails():
+    leader_id = uuid.uuid4()
+    source, session, (acquire, holder, checkpoint) = _follower(leader_id, "failed", None)
+
+    with acquire, holder, checkpoint:
+        assert _follow_in_flight(session, source) is None
+
+
+def test_follower_stops_waiting_after_limit():
+    leader_id = uuid.uuid4()
+    source, session, (acquire, holder, checkpoint) = _follower(
+        leader_id, "transcribing", None, waited_sec=settings.singleflight_wait_sec + 1
+    )
+
+    with acquire, holder, checkpoint:
+        assert _follow_in_flight(session, source) is None
+
+
+def test_waiting_follower_is_requeued_without_using_a_retry():
+    source = _source(source_type="youtube", url="https://youtu.be/dQw4w9WgXcQ", status="queued")
+    session = MagicMock()
+    session.query.return_value.filter.return_value.first.return_value = source
+    task = MagicMock()
+    task.request.retries = 1
+
+    def body(*_):
+        raise _LeaderInFlight(uuid.uuid4())
+
+    with patch("app.workers.tasks.SyncSessionLocal", return_value=session), \
+            patch("app.workers.tasks.ProgressReporter"), \
+            patch("app.workers.tasks._load_checkpoint", return_value=None), \
+            patch("app.workers.tasks.renew_lease"), \
+            pytest.raises(Retry):
+        _run_stage(task, str(source.id), "extract", body)
+
+    task.signature_from_request.assert_called_once_with(countdown=SINGLEFLIGHT_RECHECK_SEC)
+    task.signature_from_request.return_value.apply_async.assert_called_once()
+    task.retry.assert_not_called()
+
+
+def test_leader_renews_its_lease_at_every_stage():
+    source = _source(source_type="youtube", url="https://youtu.be/dQw4w9WgXcQ", status="mapping")
+    session = MagicMock()
+    session.query.return_value.filter.return_value.first.return_value = source
+
+    with patch("app.workers.tasks.SyncSessionLocal", return_value=session), \
+            patch("app.workers.tasks.ProgressReporter"), \
+            patch("app.workers.tasks._load_checkpoint", return_value=None), \
+            patch("app.workers.tasks.renew_lease") as renew:
+        _run_stage(MagicMock(), str(source.id), "map", lambda *_: None)
+
+    renew.assert_called_once_with(
+        "youtube:dQw4w9WgXcQ", str(source.id), settings.singleflight_lease_sec
+    )
@@ -0,0 +1,89 @@
+import json
+import uuid
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.api.sources import _source_event_stream
+from app.schemas.source import ProgressInfo, SourceResponse
+
+SOURCE_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
+
+
+def _subscription(events: list):
+    @asynccontextmanager
+    async def _subscribe(source_id, idle_sec):
+        async def _iter():
+            for event in events:
+                yield event
+
+        yield _iter()
+
+    return _subscribe
+
+
+def _session_factory(status: str) -> MagicMock:
+    session = MagicMock()
+    session.get = AsyncMock()
+    session.scalar = AsyncMock(return_value=status)
+    factory = MagicMock()
+    factory.return_value.__aenter__ = AsyncMock(return_value=session)
+    factory.return_value.__aexit__ = AsyncMock(return_value=False)
+    return factory
+
+
+def _frames(raw: list[str]) -> list[dict]:
+    return [
+        json.loads(frame.split("data: ", 1)[1])
+        for frame in raw
+        if frame.startswith("event: source")
+    ]
+
+
+async def test_progress_events_are_applied_without_db_reads():
+    snapshots = [
+        SourceResponse(
+            source_id=SOURCE_ID, source_type="youtube", status="mapping",
+            progress=ProgressInfo(stage="mapping", percent=40),
+        ),
+        SourceResponse(
+            source_id=SOURCE_ID, source_type="youtube", status="approved",
+            content_payload={"medium_text": "done"},
+        ),
+    ]
+    events = [
+        {"status": "reducing", "progress_json": {"stage": "reducing", "percent": 60}},
+        None,
+        {"status": "approved"},
+    ]
+    source_response = AsyncMock(side_effect=snapshots)
+
+    with (
+        patch("app.api.sources.subscribe_progress", _subscription(events)),
+        patch("app.api.sources._source_response", source_response),
+        patch("app.api.sources.async_session_factory", _session_factory("reducing")),
+    ):
+        raw = [frame async for frame in _source_event_stream(SOURCE_ID)]
+
+    frames = _frames(raw)
+    assert [f["status"] for f in frames] == ["mapping", "reducing", "approved"]
+    assert frames[1]["progress"] == {"stage": "reducing", "percent": 60}
+    assert frames[-1]["content_payload"] == {"medium_text": "done"}
+    assert ": keep-alive\n\n" in raw
+    # Initial snapshot and the terminal read only.
+    assert source_response.await_count == 2
+
+
+async def test_idle_check_catches_a_missed_terminal_event():
+    snapshots = [
+        SourceResponse(source_id=SOURCE_ID, source_type="pdf", status="validating"),
+        SourceResponse(source_id=SOURCE_ID, source_type="pdf", status="failed"),
+    ]
+
+    with (
+        patch("app.api.sources.subscribe_progress", _subscription([None])),
+        patch("app.api.sources._source_response", AsyncMock(side_effect=snapshots)),
+        patch("app.api.sources.async_session_factory", _session_factory("failed")),
+    ):
+        raw = [frame async for frame in _source_event_stream(SOURCE_ID)]
+
+    assert [f["status"] for f in _frames(raw)] == ["validating", "failed"]
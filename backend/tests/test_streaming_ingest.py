@@ -0,0 +1,164 @@
+import subprocess
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.services.generator import IncrementalChunker, chunk_hash
+from app.services.streaming_ingest import StreamingAudioIngest
+
+
+def _batch_chunks(text: str, chunk_size: int, overlap: int) -> list[str]:
+    """The original one-shot sliding window over the whole transcript."""
+    tokens = list(text)
+    chunks, start = [], 0
+    while start < len(tokens):
+        end = start + chunk_size
+        chunks.append("".join(tokens[start:end]))
+        if end >= len(tokens):
+            break
+        start = end - overlap
+    return chunks
+
+
+def test_incremental_chunks_match_batch_chunking(char_encoding):
+    pieces = ["alpha beta gamma", "delta epsilon", "zeta eta theta iota", "kappa"]
+    expected = _batch_chunks(" ".join(pieces), chunk_size=10, overlap=3)
+
+    chunker = IncrementalChunker(char_encoding, chunk_size=10, overlap=3)
+    chunks = []
+    for piece in pieces:
+        chunks.extend(chunker.feed(piece))
+    chunks.extend(chunker.finish())
+
+    assert chunks == expected
+    assert chunker.emitted == len(expected)
+
+
+def test_closed_segments_skip_partial_and_seen_lines(tmp_path):
+    segment_list = tmp_path / "segments.csv"
+    segment_list.write_text(
+        "segment_000.ogg,0.0,600.0\nsegment_001.ogg,600.0,1200.0\nsegment_002.og"
+    )
+
+    paths = StreamingAudioIngest._closed_segments(str(segment_list), already_seen=1)
+
+    assert paths == [str(tmp_path / "segment_001.ogg")]
+
+
+def test_closed_segments_missing_list(tmp_path):
+    assert StreamingAudioIngest._closed_segments(str(tmp_path / "none.csv"), 0) == []
+
+
+def test_map_stream_returns_summaries_in_chunk_order(make_generator):
+    llm = MagicMock()
+
+    def _complete(system, chunk, model):
+        # Later chunks finish first.
+        time.sleep(0.01 * (3 - len(chunk) % 3))
+        return f"summary of {chunk}"
+
+    llm.complete.side_effect = _complete
+    pieces = ["alpha beta", "gamma delta", "epsilon zeta eta"]
+
+    chunks, summaries = make_generator(llm, chunk_size=6, overlap=2).map_stream(
+        iter(pieces), max_workers=4
+    )
+
+    assert chunks == _batch_chunks(" ".join(pieces), chunk_size=6, overlap=2)
+    assert len(chunks) > 3
+    assert summaries == [f"summary of {c}" for c in chunks]
+
+
+def test_map_stream_enforces_chunk_limit(make_generator):
+    llm = MagicMock()
+    llm.complete.return_value = "summary"
+    svc = make_generator(llm, chunk_size=4, overlap=1)
+
+    with pytest.raises(ValueError, match="too_many_chunks"):
+        svc.map_stream(iter(["a" * 40]), max_chunks=3)
+
+
+def test_map_stream_rejects_projected_oversize_before_mapping(make_generator):
+    llm = MagicMock()
+    llm.complete.return_value = "summary"
+    svc = make_generator(llm, chunk_size=4, overlap=1)
+
+    # 10 words on the first of 100 pages projects ~330 chunks of 4 words.
+    with pytest.raises(ValueError, match="too_many_chunks"):
+        svc.map_stream(iter(["word " * 10] * 100), max_chunks=20, expected_parts=100)
+    llm.complete.assert_not_called()
+
+
+def test_map_stream_stops_pulling_parts_after_map_failure(make_generator):
+    llm = MagicMock()
+    llm.complete.side_effect = RuntimeError("llm down")
+    svc = make_generator(llm, chunk_size=4, overlap=1)
+    pulled = []
+
+    def _parts():
+        for i in range(50):
+            pulled.append(i)
+            time.sleep(0.005)
+            yield "word " * 4
+
+    with pytest.raises(RuntimeError, match="llm down"):
+        svc.map_stream(_parts(), max_workers=2)
+    assert len(pulled) < 50
+
+
+def test_iter_texts_clears_previous_attempt_and_logs_stderr(tmp_path):
+    (tmp_path / "segments.csv").write_text("segment_000.ogg,0.0,600.0\n")
+    (tmp_path / "segment_000.ogg").write_bytes(b"stale")
+    transcriber = MagicMock()
+    seen_at_start = []
+
+    def _popen(args, **kwargs):
+        seen_at_start.append(sorted(p.name for p in tmp_path.glob("segment*")))
+        assert kwargs["stderr"] is not subprocess.PIPE
+        proc = MagicMock()
+        proc.poll.return_value = 0
+        proc.returncode = 0
+        return proc
+
+    with (
+        patch("app.services.streaming_ingest.subprocess.Popen", side_effect=_popen),
+        pytest.raises(ValueError, match="no segments"),
+    ):
+        list(StreamingAudioIngest(transcriber).iter_texts("https://example.com", str(tmp_path)))
+
+    assert seen_at_start == [[], []]
+    transcriber.transcribe.assert_not_called()
+
+
+def test_map_stream_does_not_remap_known_chunks(make_generator):
+    llm = MagicMock()
+    llm.complete.side_effect = lambda system, chunk, model: f"summary of {chunk}"
+    svc = make_generator(llm, chunk_size=4, overlap=1)
+    pieces = ["alpha beta gamma delta epsilon"]
+    chunks, _ = svc.map_stream(iter(pieces))
+    llm.complete.reset_mock()
+
+    mapped = {(0, chunk_hash(chunks[0])): "stored"}
+    _, summaries = svc.map_stream(iter(pieces), mapped=mapped)
+
+    assert summaries == ["stored"] + [f"summary of {c}" for c in chunks[1:]]
+    assert llm.complete.call_count == len(chunks) - 1
+    assert len(mapped) == len(chunks)
+
+
+def test_map_stream_keeps_finished_summaries_when_extraction_fails(make_generator):
+    llm = MagicMock()
+    llm.complete.side_effect = lambda system, chunk, model: f"summary of {chunk}"
+    mapped: dict = {}
+
+    def _parts():
+        yield "alpha beta gamma delta epsilon"
+        time.sleep(0.1)  # the queued chunks are mapped meanwhile
+        raise RuntimeError("extraction failed")
+
+    with pytest.raises(RuntimeError, match="extraction failed"):
+        make_generator(llm, chunk_size=4, overlap=1).map_stream(_parts(), mapped=mapped)
+
+    assert mapped
+    assert set(mapped.values()) == {f"summary of {c.args[1]}" for c in llm.complete.call_args_list}
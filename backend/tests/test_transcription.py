@@ -0,0 +1,110 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.core.config import settings
+from app.services.local_transcription import LocalWhisperTranscriptionService
+from app.services.transcription import (
+    TranscriptionService,
+    parse_silencedetect,
+    snap_boundaries,
+)
+from app.services.transcription_factory import get_transcription_service
+
+
+@pytest.fixture
+def svc():
+    with patch("app.services.transcription.OpenAI"):
+        service = TranscriptionService()
+    return service
+
+
+def test_chunks_are_reassembled_in_order(svc, tmp_path):
+    paths = []
+    for i in range(5):
+        p = tmp_path / f"chunk_{i}.mp3"
+        p.write_bytes(b"x")
+        paths.append(str(p))
+
+    def fake_create(model, file):
+        return MagicMock(text=f"text-{file.name.rsplit('_', 1)[-1].split('.')[0]}")
+
+    svc.client.audio.transcriptions.create.side_effect = fake_create
+    with patch.object(svc, "_split_if_needed", return_value=paths):
+        text, meta = svc.transcribe(paths[0])
+
+    assert text == "text-0 text-1 text-2 text-3 text-4"
+    assert meta["whisper_chunks"] == 5
+
+
+def test_failing_chunk_is_retried_alone(svc, tmp_path):
+    p = tmp_path / "chunk_0.mp3"
+    p.write_bytes(b"x")
+    svc.client.audio.transcriptions.create.side_effect = [
+        RuntimeError("502 Bad Gateway"),
+        MagicMock(text="recovered"),
+    ]
+
+    with patch("app.services.transcription.time.sleep"):
+        assert svc._transcribe_chunk(0, str(p), 1) == "recovered"
+    assert svc.client.audio.transcriptions.create.call_count == 2
+
+
+def test_chunk_gives_up_after_max_retries(svc, tmp_path):
+    p = tmp_path / "chunk_0.mp3"
+    p.write_bytes(b"x")
+    svc.client.audio.transcriptions.create.side_effect = RuntimeError("boom")
+
+    with patch("app.services.transcription.time.sleep"), pytest.raises(RuntimeError):
+        svc._transcribe_chunk(0, str(p), 1)
+
+
+def test_parse_silencedetect_output():
+    stderr = (
+        "[silencedetect @ 0x55] silence_start: 98.2\n"
+        "[silencedetect @ 0x55] silence_end: 99.0 | silence_duration: 0.8\n"
+        "size=N/A time=00:05:50.00 bitrate=N/A speed= 900x\n"
+        "[silencedetect @ 0x55] silence_start: 190.5\n"
+        "[silencedetect @ 0x55] silence_end: 191.5 | silence_duration: 1\n"
+    )
+    assert parse_silencedetect(stderr) == [(98.2, 99.0), (190.5, 191.5)]
+
+
+def test_boundaries_snap_back_to_silence():
+    silences = [(98.2, 99.0), (190.5, 191.5)]
+    windows = []
+
+    def silences_between(start, end):
+        windows.append((start, end))
+        return silences
+
+    assert snap_boundaries(350, 100, silences_between) == [98.6, 191.0, 291.0]
+    # Only the stretch before each planned cut is scanned.
+    assert windows == [(85.0, 100.0), (183.6, 198.6), (276.0, 291.0)]
+
+
+def test_boundaries_ignore_silence_outside_window():
+    # 50s before the target is outside the 15% window, so the cut stays put.
+    assert snap_boundaries(250, 100, lambda start, end: [(49.0, 51.0)]) == [100, 200]
+
+
+class TestTranscriptionFactory:
+    def test_openai_is_default(self):
+        with patch("app.services.transcription.OpenAI"):
+            assert isinstance(get_transcription_service(), TranscriptionService)
+
+    def test_local_whisper(self):
+        with patch.object(settings, "transcription_provider", "local_whisper"):
+            svc = get_transcription_service()
+        assert isinstance(svc, LocalWhisperTranscriptionService)
+
+    def test_local_whisper_without_faster_whisper_explains_the_install(self):
+        svc = LocalWhisperTranscriptionService()
+        with patch.dict("sys.modules", {"faster_whisper": None}), \
+                pytest.raises(RuntimeError, match="pip install faster-whisper"):
+            svc.transcribe("audio.ogg")
+
+    def test_unknown_provider_raises(self):
+        with patch.object(settings, "transcription_provider", "nope"), \
+                pytest.raises(ValueError, match="TRANSCRIPTION_PROVIDER"):
+            get_transcription_service()
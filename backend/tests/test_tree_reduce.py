@@ -0,0 +1,78 @@
+from unittest.mock import MagicMock, patch
+
+from app.core.config import settings
+from app.services.generator import SUMMARY_SEPARATOR
+
+
+def test_summaries_within_budget_are_not_merged(make_generator):
+    llm = MagicMock()
+    summaries = ["a" * 10, "b" * 10]
+
+    with patch.object(settings, "reduce_token_budget", 1000):
+        assert make_generator(llm).collapse_summaries(summaries) == summaries
+    llm.complete.assert_not_called()
+
+
+def test_summaries_merge_level_by_level_until_they_fit(make_generator):
+    llm = MagicMock()
+    llm.complete.side_effect = lambda system, user, model: "m" * 20
+    merges = []
+
+    def _merge(level, groups):
+        merges.append((level, len(groups)))
+        return [llm.complete("", g, "") for g in groups]
+
+    summaries = ["s" * 100] * 9
+    with (
+        patch.object(settings, "reduce_token_budget", 50),
+        patch.object(settings, "reduce_fan_in", 3),
+    ):
+        result = make_generator(llm).collapse_summaries(summaries, merge=_merge)
+
+    # 9 -> 3 summaries (still 3*20 + separators > 50) -> 1
+    assert merges == [(1, 3), (2, 1)]
+    assert result == ["m" * 20]
+
+
+def test_merge_groups_keep_neighbouring_summaries_together(make_generator):
+    llm = MagicMock()
+    llm.complete.side_effect = lambda system, user, model: "x"
+    summaries = ["one", "two", "three", "four", "five"]
+
+    with (
+        patch.object(settings, "reduce_token_budget", 5),
+        patch.object(settings, "reduce_fan_in", 2),
+    ):
+        make_generator(llm).collapse_summaries(summaries)
+
+    first_level = [c.args[1] for c in llm.complete.call_args_list[:2]]
+    assert sorted(first_level) == sorted(
+        [SUMMARY_SEPARATOR.join(["one", "two"]), SUMMARY_SEPARATOR.join(["three", "four"])]
+    )
+
+
+def test_single_summary_group_is_carried_up_unchanged(make_generator):
+    merges = []
+
+    def _merge(level, groups):
+        merges.append(groups)
+        return [f"merged {level}.{i}" for i in range(len(groups))]
+
+    summaries = ["one", "two", "three"]
+    with (
+        patch.object(settings, "reduce_token_budget", 24),
+        patch.object(settings, "reduce_fan_in", 2),
+    ):
+        result = make_generator(MagicMock()).collapse_summaries(summaries, merge=_merge)
+
+    assert merges[0] == [SUMMARY_SEPARATOR.join(["one", "two"])]
+    assert result == ["merged 1.0", "three"]
+
+
+def test_zero_budget_disables_tree_reduce(make_generator):
+    llm = MagicMock()
+    summaries = ["s" * 100] * 4
+
+    with patch.object(settings, "reduce_token_budget", 0):
+        assert make_generator(llm).collapse_summaries(summaries) == summaries
+    llm.complete.assert_not_called()
@@ -0,0 +1,161 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.core.config import settings
+from app.services.youtube import YouTubeService, choose_caption_track
+
+URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+YT_ID = "dQw4w9WgXcQ"
+
+
+def _ydl_mock(info: dict) -> MagicMock:
+    ydl = MagicMock()
+    ydl.__enter__.return_value = ydl
+    ydl.__exit__.return_value = False
+    ydl.extract_info.return_value = info
+    ydl.sanitize_info.side_effect = lambda i: i
+    return ydl
+
+
+class TestProbe:
+    def test_probe_is_cached_by_video_id(self):
+        redis = MagicMock()
+        redis.get.return_value = None
+        ydl = _ydl_mock({"title": "T", "duration": 60, "subtitles": {"en": []}, "thumbnails": []})
+
+        with patch("app.services.youtube.get_redis", return_value=redis), \
+                patch("yt_dlp.YoutubeDL", return_value=ydl):
+            info = YouTubeService()._probe(URL, YT_ID)
+
+        assert info["title"] == "T"
+        assert info["_has_captions"] is True
+        assert "thumbnails" not in info
+        key, payload = redis.set.call_args.args
+        assert key == f"yt_meta:{YT_ID}"
+        assert json.loads(payload) == info
+
+    def test_cached_probe_skips_yt_dlp(self):
+        redis = MagicMock()
+        redis.get.return_value = json.dumps({"title": "Cached", "_has_captions": False})
+
+        with patch("app.services.youtube.get_redis", return_value=redis), \
+                patch("yt_dlp.YoutubeDL") as ydl_cls:
+            info = YouTubeService()._probe(URL, YT_ID)
+
+        assert info["title"] == "Cached"
+        ydl_cls.assert_not_called()
+
+
+class TestDownloadAudio:
+    def test_download_reuses_probed_info(self, tmp_path):
+        info = {"title": "T", "duration": 60, "language": "en"}
+        ydl = _ydl_mock(info)
+
+        def fake_download(i, download):
+            (tmp_path / "src-1" / "audio.webm").write_bytes(b"audio")
+            return i
+
+        ydl.process_ie_result.side_effect = fake_download
+
+        with patch.object(settings, "tmp_dir", str(tmp_path)), \
+                patch.object(settings, "audio_normalize", False), \
+                patch("yt_dlp.YoutubeDL", return_value=ydl):
+            result = YouTubeService()._download_audio(URL, YT_ID, "src-1", info)
+
+        ydl.process_ie_result.assert_called_once()
+        ydl.extract_info.assert_not_called()
+        assert result["audio_path"].endswith("audio.webm")
+        assert result["meta"]["title"] == "T"
+
+    def test_normalize_keeps_best_fallback_container(self, tmp_path):
+        info = {"title": "T", "duration": 60, "language": "en"}
+        ydl = _ydl_mock(info)
+
+        def fake_download(i, download):
+            # No audio-only format: "best" writes the muxed video container.
+            (tmp_path / "src-1" / "audio.mp4").write_bytes(b"video")
+            return i
+
+        ydl.process_ie_result.side_effect = fake_download
+
+        with patch.object(settings, "tmp_dir", str(tmp_path)), \
+                patch.object(settings, "audio_normalize", True), \
+                patch("yt_dlp.YoutubeDL", return_value=ydl), \
+                patch(
+                    "app.services.youtube.normalize_speech_audio",
+                    side_effect=lambda path: (path, {}),
+                ) as normalize:
+            result = YouTubeService()._download_audio(URL, YT_ID, "src-1", info)
+
+        assert normalize.call_args.args[0].endswith("audio.mp4")
+        assert result["audio_path"].endswith("audio.mp4")
+
+    def test_too_long_video_fails_before_download(self, tmp_path):
+        info = {"title": "T", "duration": settings.max_video_duration + 1}
+
+        with patch.object(settings, "tmp_dir", str(tmp_path)), \
+                patch("yt_dlp.YoutubeDL") as ydl_cls, \
+                pytest.raises(ValueError, match="video_too_long"):
+            YouTubeService()._download_audio(URL, YT_ID, "src-1", info)
+        ydl_cls.assert_not_called()
+
+
+def _track(code: str, generated: bool, translatable_to: tuple[str, ...] = ()) -> MagicMock:
+    track = MagicMock()
+    track.language_code = code
+    track.is_generated = generated
+    track.is_translatable = bool(translatable_to)
+    track.translation_languages = [MagicMock(language_code=c) for c in translatable_to]
+    track.translate.side_effect = lambda lang: f"{code}->{lang}"
+    return track
+
+
+class TestChooseCaptionTrack:
+    def test_manual_beats_generated(self):
+        manual_en = _track("en", generated=False)
+        tracks = [_track("ru", generated=True), manual_en]
+        track, choice = choose_caption_track(tracks, ["ru", "en"])
+        assert track is manual_en
+        assert choice == {"kind": "manual", "language": "en"}
+
+    def test_generated_in_preferred_language(self):
+        generated_ru = _track("ru", generated=True)
+        track, choice = choose_caption_track([_track("de", False), generated_ru], ["ru", "en"])
+        assert track is generated_ru
+        assert choice["kind"] == "generated"
+
+    def test_translated_track(self):
+        track, choice = choose_caption_track([_track("de", False, ("en", "fr"))], ["ru", "en"])
+        assert track == "de->en"
+        assert choice == {
+            "kind": "translated",
+            "language": "en",
+            "from_language": "de",
+            "generated": False,
+        }
+
+    def test_any_track_as_last_resort(self):
+        german = _track("de", True)
+        track, choice = choose_caption_track([german], ["ru", "en"])
+        assert track is german
+        assert choice == {"kind": "generated", "language": "de"}
+
+    def test_no_tracks(self):
+        assert choose_caption_track([], ["ru", "en"]) == (None, {"kind": "none"})
+
+
+def test_captions_listed_once_and_recorded_in_meta():
+    api = MagicMock()
+    ru = _track("ru", generated=False)
+    ru.fetch.return_value = [MagicMock(text="привет"), MagicMock(text="мир")]
+    api.list.return_value = [ru]
+
+    with patch("youtube_transcript_api.YouTubeTranscriptApi", return_value=api):
+        text, meta = YouTubeService()._try_captions(YT_ID, {"title": "T", "_has_captions": True})
+
+    api.list.assert_called_once_with(YT_ID)
+    assert text == "привет мир"
+    assert meta["caption_choice"] == {"kind": "manual", "language": "ru"}
+    assert meta["title"] == "T"
@@ -1,10 +1,11 @@
 "use client";
 
 import Link from "next/link";
-import { useSourcePolling } from "@/lib/use-polling";
+import { useSourceEvents } from "@/lib/use-source-events";
+import { useLiveReduce } from "@/lib/use-live-reduce";
 import { StatusTracker } from "@/components/status-tracker";
 import { ChannelTabs } from "@/components/result-tabs";
-import { HIDDEN_PAYLOAD_KEYS } from "@/lib/constants";
+import { HIDDEN_PAYLOAD_KEYS, TERMINAL_STATUSES } from "@/lib/constants";
 
 const PLATFORM_TO_PAYLOAD: Record<string, string> = {
   medium: "medium_text",
@@ -48,7 +49,12 @@ export default function SourcePage({
   params: { id: string };
 }) {
   const { id } = params;
-  const { source, error, isPolling } = useSourcePolling(id);
+  const { source, error, isLive } = useSourceEvents(id);
+  const drafts = useLiveReduce(id, source?.status === "reducing");
+  const showDrafts =
+    !!source &&
+    !TERMINAL_STATUSES.includes(source.status as (typeof TERMINAL_STATUSES)[number]) &&
+    Object.keys(drafts).length > 0;
 
   const passedPayload =
     source?.status === "needs_review" &&
@@ -111,6 +117,15 @@ export default function SourcePage({
               />
             )}
 
+            {showDrafts && (
+              <div className="space-y-3">
+                <p className="text-sm text-zinc-500">
+                  Черновик — тексты появляются по мере генерации
+                </p>
+                <ChannelTabs contentPayload={drafts} />
+              </div>
+            )}
+
             {source.status === "approved" && source.content_payload && (
               <>
                 <div className="rounded-2xl border border-emerald-500/30 bg-emerald-500/10 p-6">
@@ -123,6 +138,11 @@ export default function SourcePage({
                     <h3 className="text-lg font-semibold text-emerald-400">
                       Готово
                     </h3>
+                    {source.from_cache && (
+                      <span className="ml-auto text-xs text-emerald-300/70">
+                        Из кэша — этот материал уже обрабатывался
+                      </span>
+                    )}
                   </div>
                 </div>
                 <ChannelTabs contentPayload={source.content_payload} />
@@ -133,9 +153,9 @@ export default function SourcePage({
               <ChannelTabs contentPayload={passedPayload} />
             )}
 
-            {isPolling && (
+            {isLive && (
               <p className="text-center text-sm text-zinc-600">
-                Автообновление каждые 3 секунды
+                Статус обновляется в реальном времени
               </p>
             )}
           </div>
@@ -66,7 +66,7 @@ export function HistoryFeed() {
   const router = useRouter();
 
   useEffect(() => {
-    listSources(20, 0)
+    listSources(20)
       .then((res) => setItems(res.items))
       .catch(() => {})
       .finally(() => setLoading(false));
@@ -215,7 +215,7 @@ export function SourceForm() {
                   для выбора
                 </p>
               )}
-              <p className="text-xs text-zinc-600 mt-1">Максимум 10 MB</p>
+              <p className="text-xs text-zinc-600 mt-1">Максимум 100 MB</p>
               <input
                 ref={fileInputRef}
                 type="file"
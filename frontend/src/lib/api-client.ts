@@ -64,9 +64,9 @@ export async function regenerateSource(
 
 export async function listSources(
   limit = 20,
-  offset = 0,
+  cursor: string | null = null,
 ): Promise<SourceListResponse> {
-  return request<SourceListResponse>(
-    `/api/sources?limit=${limit}&offset=${offset}`,
-  );
+  const params = new URLSearchParams({ limit: String(limit), count: "none" });
+  if (cursor) params.set("cursor", cursor);
+  return request<SourceListResponse>(`/api/sources?${params}`);
 }
@@ -0,0 +1,43 @@
+"use client";
+
+import { useEffect, useState } from "react";
+import { API_BASE } from "./constants";
+
+/**
+ * Follows the reduce output of a source as it is generated
+ * (GET /api/sources/{id}/stream) while ``active`` is true.
+ * Returns the text produced so far per channel key. A ``start`` event
+ * (e.g. after regeneration) clears it; after network errors the browser
+ * reconnects with Last-Event-ID and the server resends what was missed.
+ */
+export function useLiveReduce(sourceId: string | null, active: boolean) {
+  const [drafts, setDrafts] = useState<Record<string, string>>({});
+
+  useEffect(() => {
+    if (!sourceId || !active) return;
+
+    const events = new EventSource(`${API_BASE}/api/sources/${sourceId}/stream`);
+
+    events.addEventListener("start", () => setDrafts({}));
+
+    events.addEventListener("delta", (e) => {
+      const { channel, text } = JSON.parse((e as MessageEvent).data) as {
+        channel: string;
+        text: string;
+      };
+      setDrafts((prev) => ({ ...prev, [channel]: (prev[channel] ?? "") + text }));
+    });
+
+    events.addEventListener("end", () => events.close());
+
+    events.addEventListener("error", (e) => {
+      // Server-sent error: the live stream is unavailable, the final
+      // result still arrives through the source events.
+      if ((e as MessageEvent).data) events.close();
+    });
+
+    return () => events.close();
+  }, [sourceId, active]);
+
+  return drafts;
+}
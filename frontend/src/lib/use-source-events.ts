@@ -0,0 +1,60 @@
+"use client";
+
+import { useEffect, useState } from "react";
+import { API_BASE, TERMINAL_STATUSES } from "./constants";
+import type { SourceResponse } from "@/types/video";
+
+function isTerminal(status: string): boolean {
+  return TERMINAL_STATUSES.includes(status as (typeof TERMINAL_STATUSES)[number]);
+}
+
+/**
+ * Follows a source over Server-Sent Events (GET /api/sources/{id}/events).
+ * The server pushes the current state, then every stage transition, and the
+ * full result once the source is terminal, after which the stream closes.
+ * The browser reconnects by itself after network errors and the server
+ * resends the current state.
+ */
+export function useSourceEvents(sourceId: string | null) {
+  const [source, setSource] = useState<SourceResponse | null>(null);
+  const [error, setError] = useState<string | null>(null);
+  const [isLive, setIsLive] = useState(false);
+
+  useEffect(() => {
+    if (!sourceId) {
+      setIsLive(false);
+      return;
+    }
+
+    const events = new EventSource(`${API_BASE}/api/sources/${sourceId}/events`);
+    setIsLive(true);
+
+    const stop = () => {
+      events.close();
+      setIsLive(false);
+    };
+
+    events.addEventListener("source", (e) => {
+      const data = JSON.parse((e as MessageEvent).data) as SourceResponse;
+      setSource(data);
+      setError(null);
+      if (isTerminal(data.status)) stop();
+    });
+
+    events.addEventListener("error", (e) => {
+      const payload = (e as MessageEvent).data;
+      if (payload) {
+        // Error event sent by the server.
+        setError(JSON.parse(payload).message ?? "Произошла ошибка");
+        stop();
+      } else if (events.readyState === EventSource.CLOSED) {
+        setError("Соединение с сервером потеряно");
+        setIsLive(false);
+      }
+    });
+
+    return stop;
+  }, [sourceId]);
+
+  return { source, error, isLive };
+}
@@ -30,6 +30,7 @@ export interface SourceResponse {
   error: ErrorInfo | null;
   content_payload: Record<string, unknown> | null;
   validation_report: Record<string, unknown> | null;
+  from_cache: boolean;
 }
 
 export interface CreateSourceResponse {
@@ -53,5 +54,7 @@ export interface SourceListItem {
 
 export interface SourceListResponse {
   items: SourceListItem[];
-  total: number;
+  next_cursor: string | null;
+  total: number | null;
+  total_is_estimate: boolean;
 }